@@ -1,3 +1,5 @@
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel
 
 
@@ -19,3 +21,28 @@ class BreedDTO(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BulkItemResultDTO(BaseModel):
+    index: int  # позиция элемента в запросе
+    status: str  # created, updated, deleted, duplicate, invalid или not_found
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResultDTO(BaseModel):
+    succeeded: int
+    failed: int
+    duplicates: int = 0  # повторы id в одном запросе, считаются один раз
+    items: List[BulkItemResultDTO]
+
+
+class BulkDeleteDTO(BaseModel):
+    ids: List[int]
+
+
+class CatPageDTO(BaseModel):
+    # Только поля из fields= (id — всегда); без fields — все поля CatDTO
+    items: List[Dict[str, Any]]
+    # Передать в after= за следующей страницей; None — страниц больше нет
+    next_cursor: Optional[str] = None
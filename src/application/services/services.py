@@ -1,7 +1,16 @@
-from typing import List, Dict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
 
 from src.domain.repositories.repository import AbstractCatRepository
-from src.application.dto.dto import CatDTO, BreedDTO
+from src.application.dto.dto import (
+    BreedDTO,
+    BulkItemResultDTO,
+    BulkResultDTO,
+    CatDTO,
+    CatPageDTO,
+)
 from src.application.exceptions.exceptions import (
     AppError,
     DatabaseError,
@@ -14,221 +23,419 @@ from src.domain.events.cat_event import (
     CatDeletedEvent,
 )
 from src.for_logs.logging_config import setup_logger
+from src.for_logs.error_reporting import tag_error
+from src.infrastructure.database.config import database_settings
+from src.utils.cursor.cursor import decode_cursor, encode_cursor
 
 app_logger = setup_logger()
 
 
 class CatService:
+    """
+    Проверки, разбор ответов репозитория, логи и перевод ошибок — в помощниках
+    этого класса: AsyncCatService пользуется ими же и отличается только await
+    """
+
+    # Текст AppError для непредвиденных ошибок каждого метода
+    ERROR_MESSAGES = {
+        "get_one": "Ошибка получения кошки",
+        "get_page": "Ошибка получения страницы кошек",
+        "get_all": "Неизвестная ошибка в методе get_all",
+        "reg_new": "Ошибка регистрации кошки",
+        "update_one": "Ошибка обновления кошки",
+        "delete_cat": "Ошибка удаления кошки",
+        "reg_many": "Ошибка пакетной регистрации кошек",
+        "update_many": "Ошибка пакетного обновления кошек",
+        "delete_many": "Ошибка пакетного удаления кошек",
+        "add_breed": "Ошибка добавления породы",
+        "breed_list": "Ошибка получения списка пород",
+    }
+
     def __init__(self, repository: AbstractCatRepository):
         self.repository = repository
 
-    def _log_error(
+    def _tag_error(
         self,
         exc: Exception,
         method_name: str,
         error_type: str = "UnknownError",
         details: dict = None,
-    ):
-        summary = f"Ошибка {error_type}: {str(exc)}"
-        err_class = getattr(exc, "ErrClass", self.__class__.__name__)
-        err_method = getattr(exc, "ErrMethod", method_name)
-
-        app_logger.warning(
-            logger_class=self.__class__.__name__,
-            event=error_type,
-            message=str(exc),
-            summary=summary,
-            params={
-                "method": method_name,
-                "class": self.__class__.__name__,
-                "error_type": error_type,
-                "error_message": str(exc),
-                "details": details or {},
-            },
-            ErrClass=err_class,
-            ErrMethod=err_method,
+    ) -> Exception:
+        """
+        Добавляет к исключению контекст сервиса. В лог оно попадёт один раз —
+        через report_error в декораторе роута, с request_id запроса.
+        """
+        return tag_error(
+            exc,
+            self.__class__.__name__,
+            method_name,
+            error_type=error_type,
+            details=details,
         )
 
-    def get_one(self, id: int) -> CatDTO:
+    @contextmanager
+    def _errors(self, method_name: str, details: dict = None) -> Iterator[None]:
+        """
+        Перевод ошибок метода, общий для sync и async: NotFoundError и ValidationError
+        помечаются и пробрасываются как есть, отказ соединения с БД становится
+        DatabaseError, остальное — AppError с текстом из ERROR_MESSAGES
+        """
         try:
-            cat = self.repository.get_by_id(id)
-            if not cat:
-                raise NotFoundError(f"Кошка с id={id} не найдена", details={"id": id})
-            return CatDTO.model_validate(cat)
-        except NotFoundError as e:
-            self._log_error(
-                e, "get_one", error_type="NotFoundError", details={"id": id}
+            yield
+        except (NotFoundError, ValidationError) as e:
+            self._tag_error(
+                e, method_name, error_type=e.__class__.__name__, details=e.details
             )
             raise
+        except ConnectionRefusedError as e:
+            raise self._tag_error(
+                DatabaseError(
+                    "Connection to DB failed", details={"method": method_name}
+                ).set_context(self.__class__.__name__, method_name),
+                method_name,
+                error_type="DatabaseError",
+                details={"reason": "Connection refused"},
+            ) from e
         except Exception as e:
-            self._log_error(
-                e,
-                "get_one",
+            raise self._tag_error(
+                AppError(f"{self.ERROR_MESSAGES[method_name]}: {e}").set_context(
+                    self.__class__.__name__, method_name
+                ),
+                method_name,
                 error_type="ServerError",
-                details={"exception": str(e)},
-            )
-            raise AppError(
-                f"Ошибка в сервисе {self.__class__.__name__}, метод: get_one — {e}"
-            ).set_context(self.__class__.__name__, "get_one") from e
-
-    def reg_new(self, dto: CatDTO) -> CatDTO:
-        try:
-            if dto.age <= 0:
-                raise ValidationError(
-                    "Возраст должен быть положительным числом",
-                    details=dto.model_dump(),
-                )
+                details={**(details or {}), "exception": str(e)},
+            ) from e
 
-            created_cat = self.repository.create(dto)
-            result_dto = CatDTO.model_validate(created_cat)
-            self.event = CatCreatedEvent.from_dto(result_dto)
+    def _log_success(self, method_name: str, event: str, message: str, summary: str, params: dict):
+        # Метод указывается явно: помощник вызывается и из sync, и из async-методов
+        app_logger.info(
+            logger_class=self.__class__.__name__,
+            event=event,
+            message=message,
+            summary=summary,
+            params=params,
+            ErrClass=self.__class__.__name__,
+            ErrMethod=method_name,
+        )
 
-            app_logger.info(
-                logger_class=self.__class__.__name__,
-                event="CatCreated",
-                message=f"Кошка создана с id={result_dto.id}",
-                summary="Кошка успешно зарегистрирована",
-                params=result_dto.model_dump(),
-            )
-            print(f"🎯 [CatService] Event set: {self.event}")
-            return result_dto
+    @staticmethod
+    def _require(cat: Any, id: int) -> Any:
+        if not cat:
+            raise NotFoundError(f"Кошка с id={id} не найдена", details={"id": id})
+        return cat
 
-        except ValidationError as e:
-            self._log_error(
-                e, "reg_new", error_type="ValidationError", details=e.details
-            )
-            raise
-        except Exception as e:
-            self._log_error(
-                e,
-                "reg_new",
-                error_type="ServerError",
+    @staticmethod
+    def _check_new(dto: CatDTO):
+        if dto.age <= 0:
+            raise ValidationError(
+                "Возраст должен быть положительным числом",
                 details=dto.model_dump(),
             )
-            raise AppError(f"Ошибка регистрации кошки: {e}").set_context(
-                self.__class__.__name__, "reg_new"
-            ) from e
 
-    def update_one(self, dto: CatDTO) -> CatDTO:
-        try:
-            updated_cat = self.repository.update(dto)
-            result_dto = CatDTO.model_validate(updated_cat)
-            self.event = CatUpdatedEvent.from_dto(updated_cat)
-
-            app_logger.info(
-                logger_class=self.__class__.__name__,
-                event="CatUpdated",
-                message=f"Кошка обновлена с id={result_dto.id}",
-                summary="Кошка успешно обновлена",
-                params=result_dto.model_dump(),
-            )
+    def _created(self, created_cat: Any) -> CatDTO:
+        result_dto = CatDTO.model_validate(created_cat)
+        # Репозиторий с outbox уже записал событие в той же транзакции
+        if not self.repository.writes_outbox:
+            self.event = CatCreatedEvent.from_dto(result_dto)
             print(f"🎯 [CatService] Event set: {self.event}")
-            return result_dto
 
-        except Exception as e:
-            self._log_error(
-                e,
-                "update_one",
-                error_type="ServerError",
-                details=dto.model_dump(),
-            )
-            raise AppError(f"Ошибка обновления кошки: {e}").set_context(
-                self.__class__.__name__, "update_one"
-            ) from e
+        self._log_success(
+            "reg_new",
+            "CatCreated",
+            f"Кошка создана с id={result_dto.id}",
+            "Кошка успешно зарегистрирована",
+            result_dto.model_dump(),
+        )
+        return result_dto
 
-    def delete_cat(self, id: int) -> Dict[str, str]:
-        try:
-            cat = self.repository.get_by_id(id)
-            if not cat:
-                raise NotFoundError(f"Кошка с id={id} не найдена", details={"id": id})
-            result = self.repository.delete(id)
-            if not result:
-                raise NotFoundError(f"Кошка с id={id} не найдена", details={"id": id})
+    def _updated(self, updated_cat: Any) -> CatDTO:
+        result_dto = CatDTO.model_validate(updated_cat)
+        if not self.repository.writes_outbox:
+            self.event = CatUpdatedEvent.from_dto(result_dto)
+            print(f"🎯 [CatService] Event set: {self.event}")
+
+        self._log_success(
+            "update_one",
+            "CatUpdated",
+            f"Кошка обновлена с id={result_dto.id}",
+            "Кошка успешно обновлена",
+            result_dto.model_dump(),
+        )
+        return result_dto
 
+    def _deleted(self, id: int, result: bool) -> Dict[str, str]:
+        if not result:
+            raise NotFoundError(f"Кошка с id={id} не найдена", details={"id": id})
+        if not self.repository.writes_outbox:
             self.event = CatDeletedEvent(cat_id=id)
+            print(f"🎯 [CatService] Event set: {self.event}")
+
+        self._log_success(
+            "delete_cat",
+            "CatDeleted",
+            f"Кошка удалена с id={id}",
+            "Кошка успешно удалена",
+            {"id": id},
+        )
+        return {"result": "deleted"}
+
+    @staticmethod
+    def _listed(cats: List[Any]) -> List[CatDTO]:
+        if not cats:
+            raise NotFoundError("Список кошек пуст", details={"method": "get_all"})
+        return [CatDTO.model_validate(cat) for cat in cats]
+
+    @staticmethod
+    def _breeds(breeds: List[Any]) -> List[BreedDTO]:
+        if not breeds:
+            raise NotFoundError("Список пород пуст", details={"method": "breed_list"})
+        return [BreedDTO.model_validate(breed) for breed in breeds]
+
+    def _page_params(self, after: Optional[str], fields: Optional[str]) -> Tuple[Optional[int], List[str]]:
+        """Разбирает курсор after= и список fields=; ошибки — ValidationError (422)"""
+        try:
+            after_id = decode_cursor(after) if after else None
+        except ValueError as e:
+            raise ValidationError(str(e), details={"after": after}) from e
+        if not fields:
+            return after_id, list(CatDTO.model_fields)
 
-            app_logger.info(
-                logger_class=self.__class__.__name__,
-                event="CatDeleted",
-                message=f"Кошка удалена с id={id}",
-                summary="Кошка успешно удалена",
-                params={"id": id},
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in CatDTO.model_fields]
+        if unknown:
+            raise ValidationError(
+                f"Неизвестные поля: {', '.join(unknown)}",
+                details={"fields": fields, "allowed": list(CatDTO.model_fields)},
             )
-            print(f"🎯 [CatService] Event set: {self.event}")
-            return {"result": "deleted"}
+        # id нужен для курсора, поэтому отдаётся всегда
+        return after_id, ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
 
-        except NotFoundError as e:
-            self._log_error(
-                e, "delete_cat", error_type="NotFoundError", details={"id": id}
+    @staticmethod
+    def _page(rows: List[Dict[str, Any]], limit: int, after_id: Optional[int]) -> CatPageDTO:
+        if not rows and after_id is None:
+            raise NotFoundError("Список кошек пуст", details={"method": "get_page"})
+        # У репозитория просится limit + 1 строка: лишняя значит, что есть следующая страница
+        items = rows[:limit]
+        next_cursor = encode_cursor(items[-1]["id"]) if len(rows) > limit else None
+        return CatPageDTO(items=items, next_cursor=next_cursor)
+
+    def _check_bulk_size(self, count: int):
+        if count > database_settings.bulk_max_items:
+            raise ValidationError(
+                f"Слишком много элементов в запросе: {count}, максимум {database_settings.bulk_max_items}",
+                details={"count": count, "max": database_settings.bulk_max_items},
             )
-            raise
-        except Exception as e:
-            self._log_error(
-                e,
-                "delete_cat",
-                error_type="ServerError",
-                details={"id": id, "exception": str(e)},
+
+    def _validate_bulk(
+        self, items: List[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[int, CatDTO]], List[BulkItemResultDTO]]:
+        """
+        Проверяет элементы по одному: невалидный элемент попадает в результат
+        со статусом invalid и не мешает записать остальные
+        """
+        self._check_bulk_size(len(items))
+        valid, rejected = [], []
+        for index, item in enumerate(items):
+            try:
+                dto = CatDTO.model_validate(item)
+            except PydanticValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+                    for err in e.errors()
+                )
+                rejected.append(BulkItemResultDTO(index=index, status="invalid", error=error))
+                continue
+            try:
+                self._check_new(dto)
+            except ValidationError as e:
+                rejected.append(
+                    BulkItemResultDTO(index=index, status="invalid", id=dto.id, error=e.message)
+                )
+                continue
+            valid.append((index, dto))
+        return valid, rejected
+
+    def _bulk_result(
+        self, method_name: str, items: List[BulkItemResultDTO], event: str, summary: str
+    ) -> BulkResultDTO:
+        items.sort(key=lambda item: item.index)
+        failed = sum(1 for item in items if item.error is not None)
+        duplicates = sum(1 for item in items if item.status == "duplicate")
+        result = BulkResultDTO(
+            succeeded=len(items) - failed - duplicates,
+            failed=failed,
+            duplicates=duplicates,
+            items=items,
+        )
+        self._log_success(
+            method_name,
+            event,
+            f"Успешно: {result.succeeded}, с ошибкой: {result.failed}, повторов: {result.duplicates}",
+            summary,
+            {"succeeded": result.succeeded, "failed": result.failed, "duplicates": result.duplicates},
+        )
+        return result
+
+    @staticmethod
+    def _created_items(valid: List[Tuple[int, CatDTO]], created: List[CatDTO]) -> List[BulkItemResultDTO]:
+        return [
+            BulkItemResultDTO(index=index, status="created", id=cat.id)
+            for (index, _), cat in zip(valid, created)
+        ]
+
+    @staticmethod
+    def _updated_items(valid: List[Tuple[int, CatDTO]], updated: List[CatDTO]) -> List[BulkItemResultDTO]:
+        updated_ids = {cat.id for cat in updated}
+        return [
+            BulkItemResultDTO(index=index, status="updated", id=dto.id)
+            if dto.id in updated_ids
+            else BulkItemResultDTO(
+                index=index, status="not_found", id=dto.id, error=f"Кошка с id={dto.id} не найдена"
             )
-            raise AppError(f"Ошибка удаления кошки с id={id}: {e}").set_context(
-                self.__class__.__name__, "delete_cat"
-            ) from e
+            for index, dto in valid
+        ]
+
+    @staticmethod
+    def _deleted_items(ids: List[int], deleted: List[int]) -> List[BulkItemResultDTO]:
+        """Каждый id учитывается один раз: повторы получают статус duplicate"""
+        deleted_ids = set(deleted)
+        seen = set()
+        items = []
+        for index, id in enumerate(ids):
+            if id in seen:
+                items.append(BulkItemResultDTO(index=index, status="duplicate", id=id))
+            elif id in deleted_ids:
+                items.append(BulkItemResultDTO(index=index, status="deleted", id=id))
+            else:
+                items.append(
+                    BulkItemResultDTO(
+                        index=index, status="not_found", id=id, error=f"Кошка с id={id} не найдена"
+                    )
+                )
+            seen.add(id)
+        return items
+
+    def get_one(self, id: int) -> CatDTO:
+        with self._errors("get_one", {"id": id}):
+            return CatDTO.model_validate(self._require(self.repository.get_by_id(id), id))
+
+    def get_page(self, limit: int, after: Optional[str] = None, fields: Optional[str] = None) -> CatPageDTO:
+        """
+        Страница кошек по id после курсора after. Строки отдаются словарями
+        только с запрошенными колонками, без CatDTO на каждую строку
+        """
+        with self._errors("get_page", {"limit": limit, "after": after, "fields": fields}):
+            after_id, columns = self._page_params(after, fields)
+            return self._page(self.repository.get_page(limit + 1, after_id, columns), limit, after_id)
+
+    def reg_new(self, dto: CatDTO) -> CatDTO:
+        with self._errors("reg_new", dto.model_dump()):
+            self._check_new(dto)
+            return self._created(self.repository.create(dto))
+
+    def update_one(self, dto: CatDTO) -> CatDTO:
+        with self._errors("update_one", dto.model_dump()):
+            return self._updated(self.repository.update(dto))
+
+    def delete_cat(self, id: int) -> Dict[str, str]:
+        with self._errors("delete_cat", {"id": id}):
+            self._require(self.repository.get_by_id(id), id)
+            return self._deleted(id, self.repository.delete(id))
+
+    # Пакетные методы: события пишет в outbox сам репозиторий, self.event не используется
+
+    def reg_many(self, items: List[Dict[str, Any]]) -> BulkResultDTO:
+        with self._errors("reg_many", {"count": len(items)}):
+            valid, results = self._validate_bulk(items)
+            created = self.repository.create_many([dto for _, dto in valid]) if valid else []
+            results += self._created_items(valid, created)
+            return self._bulk_result("reg_many", results, "CatsCreated", "Пакетная регистрация кошек")
+
+    def update_many(self, items: List[Dict[str, Any]]) -> BulkResultDTO:
+        with self._errors("update_many", {"count": len(items)}):
+            valid, results = self._validate_bulk(items)
+            updated = self.repository.update_many([dto for _, dto in valid]) if valid else []
+            results += self._updated_items(valid, updated)
+            return self._bulk_result("update_many", results, "CatsUpdated", "Пакетное обновление кошек")
+
+    def delete_many(self, ids: List[int]) -> BulkResultDTO:
+        with self._errors("delete_many", {"count": len(ids)}):
+            self._check_bulk_size(len(ids))
+            deleted = self.repository.delete_many(list(dict.fromkeys(ids))) if ids else []
+            results = self._deleted_items(ids, deleted)
+            return self._bulk_result("delete_many", results, "CatsDeleted", "Пакетное удаление кошек")
 
     def get_all(self) -> List[CatDTO]:
-        try:
-            cats = self.repository.get_all()
-            if not cats:
-                raise NotFoundError("Список кошек пуст", details={"method": "get_all"})
-            return [CatDTO.model_validate(cat) for cat in cats]
-        except ConnectionRefusedError as e:
-            self._log_error(
-                e,
-                "get_all",
-                error_type="DatabaseError",
-                details={"reason": "Connection refused"},
-            )
-            raise DatabaseError(
-                "Connection to DB failed", details={"method": "get_all"}
-            ).set_context(self.__class__.__name__, "get_all") from e
-        except Exception as e:
-            self._log_error(
-                e,
-                "get_all",
-                error_type="ServerError",
-                details={"exception": str(e)},
-            )
-            raise AppError(f"Неизвестная ошибка в методе get_all: {e}").set_context(
-                self.__class__.__name__, "get_all"
-            ) from e
+        with self._errors("get_all", {"method": "get_all"}):
+            return self._listed(self.repository.get_all())
 
     def add_breed(self, breed_dto: BreedDTO) -> BreedDTO:
-        try:
+        with self._errors("add_breed", breed_dto.model_dump()):
             return self.repository.add_breed(breed_dto)
-        except Exception as e:
-            self._log_error(
-                e,
-                "add_breed",
-                error_type="ServerError",
-                details=breed_dto.model_dump(),
-            )
-            raise AppError(f"Ошибка добавления породы: {e}").set_context(
-                self.__class__.__name__, "add_breed"
-            ) from e
 
     def breed_list(self) -> List[BreedDTO]:
-        try:
-            breeds = self.repository.breed_list()
-            if not breeds:
-                raise NotFoundError(
-                    "Список пород пуст", details={"method": "breed_list"}
-                )
-            return [BreedDTO.model_validate(breed) for breed in breeds]
-        except Exception as e:
-            self._log_error(
-                e,
-                "breed_list",
-                error_type="ServerError",
-                details={"exception": str(e)},
-            )
-            raise AppError(f"Ошибка получения списка пород: {e}").set_context(
-                self.__class__.__name__, "breed_list"
-            ) from e
+        with self._errors("breed_list", {"method": "breed_list"}):
+            return self._breeds(self.repository.breed_list())
+
+
+class AsyncCatService(CatService):
+    """
+    CatService для AsyncCatRepository: проверки, ошибки и логи — помощники
+    CatService, здесь только await вызовов репозитория
+    """
+
+    async def get_one(self, id: int) -> CatDTO:
+        with self._errors("get_one", {"id": id}):
+            return CatDTO.model_validate(self._require(await self.repository.get_by_id(id), id))
+
+    async def get_page(self, limit: int, after: Optional[str] = None, fields: Optional[str] = None) -> CatPageDTO:
+        with self._errors("get_page", {"limit": limit, "after": after, "fields": fields}):
+            after_id, columns = self._page_params(after, fields)
+            return self._page(await self.repository.get_page(limit + 1, after_id, columns), limit, after_id)
+
+    async def reg_new(self, dto: CatDTO) -> CatDTO:
+        with self._errors("reg_new", dto.model_dump()):
+            self._check_new(dto)
+            return self._created(await self.repository.create(dto))
+
+    async def update_one(self, dto: CatDTO) -> CatDTO:
+        with self._errors("update_one", dto.model_dump()):
+            return self._updated(await self.repository.update(dto))
+
+    async def delete_cat(self, id: int) -> Dict[str, str]:
+        with self._errors("delete_cat", {"id": id}):
+            self._require(await self.repository.get_by_id(id), id)
+            return self._deleted(id, await self.repository.delete(id))
+
+    async def reg_many(self, items: List[Dict[str, Any]]) -> BulkResultDTO:
+        with self._errors("reg_many", {"count": len(items)}):
+            valid, results = self._validate_bulk(items)
+            created = await self.repository.create_many([dto for _, dto in valid]) if valid else []
+            results += self._created_items(valid, created)
+            return self._bulk_result("reg_many", results, "CatsCreated", "Пакетная регистрация кошек")
+
+    async def update_many(self, items: List[Dict[str, Any]]) -> BulkResultDTO:
+        with self._errors("update_many", {"count": len(items)}):
+            valid, results = self._validate_bulk(items)
+            updated = await self.repository.update_many([dto for _, dto in valid]) if valid else []
+            results += self._updated_items(valid, updated)
+            return self._bulk_result("update_many", results, "CatsUpdated", "Пакетное обновление кошек")
+
+    async def delete_many(self, ids: List[int]) -> BulkResultDTO:
+        with self._errors("delete_many", {"count": len(ids)}):
+            self._check_bulk_size(len(ids))
+            deleted = await self.repository.delete_many(list(dict.fromkeys(ids))) if ids else []
+            results = self._deleted_items(ids, deleted)
+            return self._bulk_result("delete_many", results, "CatsDeleted", "Пакетное удаление кошек")
+
+    async def get_all(self) -> List[CatDTO]:
+        with self._errors("get_all", {"method": "get_all"}):
+            return self._listed(await self.repository.get_all())
+
+    async def add_breed(self, breed_dto: BreedDTO) -> BreedDTO:
+        with self._errors("add_breed", breed_dto.model_dump()):
+            return await self.repository.add_breed(breed_dto)
+
+    async def breed_list(self) -> List[BreedDTO]:
+        with self._errors("breed_list", {"method": "breed_list"}):
+            return self._breeds(await self.repository.breed_list())
@@ -0,0 +1,25 @@
+from pydantic_settings import BaseSettings
+
+
+class ConsumerSettings(BaseSettings):
+    # Отложенная обработка событий (колесо таймеров)
+    delay_seconds: float = 2.0  # через сколько показывать созданного кота
+    delay_tick: float = 0.05  # шаг колеса, точность задержки
+    delay_slots: int = 512  # ячеек в колесе: один оборот = tick * slots секунд
+    delay_max_pending: int = 100_000  # больше — консьюмер ждёт, сообщения не подтверждаются
+    delay_max_running: int = 256  # сколько отложенных обработчиков выполняется одновременно
+    # memory — колесо таймеров в процессе (теряется при рестарте);
+    # broker — очереди задержки RabbitMQ с TTL (переживают рестарт консьюмера)
+    delay_mode: str = "memory"
+
+    # Дедупликация повторных доставок по event_id: memory или sqlite
+    dedup_backend: str = "memory"
+    dedup_ttl_seconds: float = 3600.0  # сколько помнить обработанное событие
+    dedup_max_size: int = 100_000  # сверх — вытесняются самые старые
+    dedup_sqlite_path: str = "./consumer_dedup.db"
+
+    class Config:
+        env_prefix = "CONSUMER_"
+
+
+consumer_settings = ConsumerSettings()
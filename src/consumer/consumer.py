@@ -1,18 +1,111 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict
+import asyncio
+from typing import Dict, List
 
 from faststream import FastStream
-from faststream.rabbit import RabbitBroker, RabbitQueue, RabbitExchange
-from src.domain.events.cat_event import CatCreatedEvent
+from faststream.rabbit import Channel, RabbitBroker, RabbitQueue, RabbitExchange
+from src.domain.events.cat_event import (
+    CatCreatedEvent,
+    CatUpdatedEvent,
+    CatDeletedEvent,
+)
+from src.domain.events.registry import event_from_dict
+from src.infrastructure.rabbit_and_celery.message_broker.codecs import (
+    SCHEMA_VERSION_HEADER,
+    decode_dead_letter,
+    decode_event,
+    event_payload,
+    get_codec,
+)
 from src.for_logs.logging_config import setup_logger
-from src.infrastructure.rabbit_and_celery.scheduler.scheduler import scheduler
-from src.infrastructure.rabbit_and_celery.message_broker.config import rabbitmq_settings
+from src.consumer.config import consumer_settings
+from src.utils.timing_wheel.timing_wheel import TimingWheel
+from src.utils.batcher.batcher import MessageBatcher
+from src.utils.dedup.dedup import get_dedup_store
+from src.infrastructure.rabbit_and_celery.message_broker.config import (
+    DELAY_EXCHANGE,
+    DELAY_HEADER,
+    delay_ms_for,
+    delay_queue_arguments,
+    delay_queue_name,
+    rabbitmq_settings,
+)
 
 logger = setup_logger()
 
 broker = RabbitBroker(
-    url=f"amqp://{rabbitmq_settings.username}:{rabbitmq_settings.password}@{rabbitmq_settings.host}:{rabbitmq_settings.port}/",
+    url=rabbitmq_settings.url,
+)
+
+# Отложенные задачи консьюмера: колесо таймеров на том же event loop
+delay_queue = TimingWheel(
+    tick=consumer_settings.delay_tick,
+    slots=consumer_settings.delay_slots,
+    max_pending=consumer_settings.delay_max_pending,
+    max_running=consumer_settings.delay_max_running,
+)
+
+# id уже обработанных событий: повторная доставка стоит одного поиска
+dedup_store = get_dedup_store(
+    consumer_settings.dedup_backend,
+    ttl=consumer_settings.dedup_ttl_seconds,
+    max_size=consumer_settings.dedup_max_size,
+    path=consumer_settings.dedup_sqlite_path,
+)
+# События, которые обрабатываются прямо сейчас: event_id -> future, завершается вместе
+# с обработкой. dedup_store узнаёт о событии только после обработки, поэтому
+# одновременные копии (concurrency, одна пачка) ждут первую доставку
+in_flight_events: Dict[str, asyncio.Future] = {}
+
+# Пропускная способность: prefetch ограничивает число неподтверждённых сообщений,
+# семафор — число одновременно работающих обработчиков. В режиме пачек prefetch
+# не меньше размера пачки, иначе пачка всегда собиралась бы по таймауту
+batch_mode = rabbitmq_settings.consumer_batch_size > 1
+consume_channel = Channel(
+    prefetch_count=max(rabbitmq_settings.consumer_prefetch, rabbitmq_settings.consumer_batch_size)
 )
+handler_slots = asyncio.Semaphore(rabbitmq_settings.consumer_concurrency)
+
+# Отложенная доставка средствами брокера: сообщение ждёт в очереди-накопителе
+# с TTL и возвращается в основной exchange с ключом "<event_type>.delayed",
+# который не совпадает с "cat.*" основной очереди — повторной задержки не будет
+DELAYED_SUFFIX = ".delayed"
+delay_exchange = RabbitExchange(name=DELAY_EXCHANGE, type="headers", durable=True)
+_delay_topology_declared = False
+
+
+async def ensure_delay_topology():
+    """Объявляет exchange и очереди задержки один раз на процесс"""
+    global _delay_topology_declared
+    if _delay_topology_declared:
+        return
+    exchange = await broker.declare_exchange(delay_exchange)
+    for delay_ms in rabbitmq_settings.delay_queues_ms:
+        holding = await broker.declare_queue(
+            RabbitQueue(
+                name=delay_queue_name(delay_ms),
+                durable=True,
+                arguments=delay_queue_arguments(delay_ms),
+            )
+        )
+        await holding.bind(exchange, arguments={"x-match": "all", DELAY_HEADER: delay_ms})
+    _delay_topology_declared = True
+
+
+async def publish_delayed(event, delay_seconds: float):
+    """Кладёт событие в очередь задержки брокера"""
+    delay_ms = delay_ms_for(delay_seconds)
+    await ensure_delay_topology()
+    codec = get_codec()
+    payload, schema_version = event_payload(event)
+    await broker.publish(
+        codec.encode(payload),
+        exchange=delay_exchange,
+        routing_key=f"{event.event_type}{DELAYED_SUFFIX}",
+        headers={SCHEMA_VERSION_HEADER: schema_version, DELAY_HEADER: delay_ms},
+        content_type=codec.content_type,
+        persist=True,
+    )
+
 
 class Consumer:
     def __init__(self):
@@ -39,6 +132,41 @@ class Consumer:
             print(f"[Consumer] Ошибка в отложенной обработке: {e}")
 
 
+    async def on_cat_created(cat_event: CatCreatedEvent):
+        if consumer_settings.delay_mode == "broker":
+            await publish_delayed(cat_event, consumer_settings.delay_seconds)
+            print(f"[FastStream] Отложено через брокер отображение кота: {cat_event.name}")
+            return
+
+        # Повторное событие о том же коте заменяет ещё не сработавший таймер
+        await delay_queue.schedule(
+            consumer_settings.delay_seconds,
+            Consumer.handle_cat_created_event,
+            cat_event.to_dict(),
+            key=f"cat_created_delay_{cat_event.cat_id}",
+        )
+
+        print(f"[FastStream] Отложено отображение кота: {cat_event.name}")
+
+    def on_cat_updated(cat_event: CatUpdatedEvent):
+        print(f"[FastStream] Кот обновлён: ID={cat_event.cat_id}, '{cat_event.name}'")
+
+    def on_cat_deleted(cat_event: CatDeletedEvent):
+        print(f"[FastStream] Кот удалён: ID={cat_event.cat_id}")
+
+    # Таблица обработчиков: event_type -> функция
+    event_handlers = {
+        CatCreatedEvent.event_type: on_cat_created,
+        CatUpdatedEvent.event_type: on_cat_updated,
+        CatDeletedEvent.event_type: on_cat_deleted,
+    }
+
+    # Обработчики событий, вернувшихся из очередей задержки
+    delayed_handlers = {
+        CatCreatedEvent.event_type: handle_cat_created_event,
+    }
+
+
     # === Очереди ===
 
     # Основная очередь
@@ -48,6 +176,13 @@ class Consumer:
         routing_key=rabbitmq_settings.routing_key,
     )
 
+    # Очередь событий, вернувшихся из очередей задержки
+    delayed_queue = RabbitQueue(
+        name=f"{rabbitmq_settings.queue_name}{DELAYED_SUFFIX}",
+        durable=True,
+        routing_key=f"cat.*{DELAYED_SUFFIX}",
+    )
+
     # Мертвая очередь (обычно именуется как dlq.<queue_name>)
     dlq_queue = RabbitQueue(
         name=f"dlq.{rabbitmq_settings.queue_name}",
@@ -64,60 +199,97 @@ class Consumer:
 
     # === Обработчики ===
 
-
-    @broker.subscriber(queue=main_queue, exchange=exchange)
-    async def consume_cat_event(message: Dict):
+    async def dispatch(message: Dict):
         """
-        Обработка сообщений из основной очереди
-        Ожидается JSON с event_type = 'cat.created'
+        Событие восстанавливается по event_type через реестр событий,
+        обработчик выбирается по таблице Consumer.event_handlers.
+        Уже обработанное событие (тот же event_id) пропускается; id запоминается
+        только после успешной обработки, чтобы упавшее сообщение пришло снова.
+        Копия события, которое ещё обрабатывается, ждёт первую доставку: после
+        успеха пропускается, после ошибки обрабатывает событие сама
         """
+        event_id = message.get("event_id")
+        if event_id is not None:
+            while event_id in in_flight_events:
+                await asyncio.shield(in_flight_events[event_id])
+            # Регистрируемся до первого await, чтобы копия не прошла проверку параллельно
+            in_flight_events[event_id] = asyncio.get_running_loop().create_future()
+
         try:
-            print("🔍 [FastStream] Получено сообщение из основной очереди")
+            if event_id is not None and await dedup_store.seen(event_id):
+                print(f"[FastStream] Повторная доставка пропущена: {event_id}")
+                return
 
             event_type = message.get("event_type")
-            if event_type == "cat.created":
-                created_at = message["created_at"]
-                if isinstance(created_at, str):
-                    if created_at.endswith("Z"):
-                        created_at = created_at.replace("Z", "+00:00")
-                    created_at = datetime.fromisoformat(created_at)
-
-                cat_event = CatCreatedEvent(
-                    cat_id=message["cat_id"],
-                    name=message["name"],
-                    age=message["age"],
-                    breed=message["breed"],
-                    breed_id=message["breed_id"],
-                    color=message["color"],
-                    created_at=created_at,
-                )
-
-                job_id = f"cat_created_delay_{cat_event.cat_id}"
-
-                scheduler.add_job(
-                    func=Consumer.handle_cat_created_event,
-                    trigger="date",
-                    run_date=datetime.now(timezone.utc) + timedelta(seconds=2),
-                    args=[cat_event.to_dict()],
-                    id=job_id,
-                    replace_existing=True,
-                )
-
-                print(f"[FastStream] Отложено отображение кота: {cat_event.name}")
-
-            else:
+            handler = Consumer.event_handlers.get(event_type)
+            if handler is None:
                 print(f"[FastStream] Неизвестный тип события: {event_type}")
+                return
 
-        except Exception as e:
-            print(f"[FastStream] Ошибка при обработке основного сообщения: {e}")
-            raise
+            result = handler(event_from_dict(message))
+            if asyncio.iscoroutine(result):
+                await result
+            if event_id is not None:
+                await dedup_store.mark(event_id)
+        finally:
+            if event_id is not None:
+                in_flight_events.pop(event_id).set_result(None)
+
+    async def handle_batch(messages: List[Dict]) -> List:
+        """Обрабатывает пачку; ошибка одного сообщения не проваливает остальные"""
+        print(f"🔍 [FastStream] Получена пачка из {len(messages)} сообщений")
+        return await asyncio.gather(
+            *(Consumer.dispatch(message) for message in messages), return_exceptions=True
+        )
+
+
+    # Тело декодируется по content_type: JSON или msgpack
+    if batch_mode:
+        @broker.subscriber(
+            queue=main_queue, exchange=exchange, channel=consume_channel, decoder=decode_event
+        )
+        async def consume_cat_batch(message: Dict):
+            """
+            Обработка сообщений из основной очереди пачками.
+            Сообщение ждёт, пока обработается его пачка, и подтверждается вместе с ней
+            """
+            try:
+                await cat_batcher.add(message)
+            except Exception as e:
+                print(f"[FastStream] Ошибка при обработке сообщения из пачки: {e}")
+                raise
+    else:
+        @broker.subscriber(
+            queue=main_queue, exchange=exchange, channel=consume_channel, decoder=decode_event
+        )
+        async def consume_cat_event(message: Dict):
+            """Обработка сообщений из основной очереди по одному"""
+            try:
+                print("🔍 [FastStream] Получено сообщение из основной очереди")
+                async with handler_slots:
+                    await Consumer.dispatch(message)
+
+            except Exception as e:
+                print(f"[FastStream] Ошибка при обработке основного сообщения: {e}")
+                raise
 
 
-    @broker.subscriber(queue=dlq_queue)
+    @broker.subscriber(queue=delayed_queue, exchange=exchange, decoder=decode_event)
+    async def consume_delayed_event(message: Dict):
+        """Событие, отлежавшее TTL в очереди задержки брокера"""
+        event_type = message.get("event_type")
+        handler = Consumer.delayed_handlers.get(event_type)
+        if handler is None:
+            print(f"[FastStream] Нет отложенного обработчика для: {event_type}")
+            return
+        handler(event_from_dict(message).to_dict())
+
+
+    @broker.subscriber(queue=dlq_queue, decoder=decode_dead_letter)
     async def consume_dlq_message(body: str):
         """
         Обработка сообщений из мертвой очереди.
-        Выводим как строку — без парсинга.
+        Выводим как строку: события JSON/msgpack — в виде JSON, остальное — как текст.
         """
         print(f"💀 [FastStream DLQ] Получено сообщение из мертвой очереди:\n{body}")
 
@@ -134,4 +306,16 @@ class Consumer:
         print("🚀 Запускаем  consumer...")
 
     async def stop(self):
+        await cat_batcher.stop()
+        await delay_queue.stop()
+        dedup_store.close()
         print("consumer stopped")
+
+
+# Пачки основной очереди (используются при RABBITMQ_CONSUMER_BATCH_SIZE > 1)
+cat_batcher = MessageBatcher(
+    Consumer.handle_batch,
+    size=rabbitmq_settings.consumer_batch_size,
+    timeout=rabbitmq_settings.consumer_batch_timeout_ms / 1000,
+    concurrency=rabbitmq_settings.consumer_concurrency,
+)
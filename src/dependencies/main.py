@@ -1,15 +1,25 @@
 from fastapi import Depends, Request
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.infrastructure.database.database import get_db
-from src.application.services.services import CatService
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.database import get_async_db, get_db
+from src.infrastructure.database.group_commit import db_writer
+from src.application.services.services import AsyncCatService, CatService
 from src.domain.adapter.adapter import CatRepository
+from src.domain.adapter.async_adapter import AsyncCatRepository
 
 
 def get_service(request: Request, db: Session = Depends(get_db)):
     if not hasattr(request.state, "cat_service"):
-        repo = CatRepository(db)
+        repo = CatRepository(db, db_writer if database_settings.group_commit else None)
         service = CatService(repo)
         request.state.cat_service = service
     return request.state.cat_service
+
+
+async def get_async_service(request: Request, db: AsyncSession = Depends(get_async_db)):
+    if not hasattr(request.state, "cat_service"):
+        request.state.cat_service = AsyncCatService(AsyncCatRepository(db))
+    return request.state.cat_service
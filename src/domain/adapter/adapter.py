@@ -1,14 +1,67 @@
+import json
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from src.domain.entitites.cat import Cat
+from src.domain.events.cat_event import (
+    CatCreatedEvent,
+    CatUpdatedEvent,
+    CatDeletedEvent,
+)
 from src.domain.repositories.repository import AbstractCatRepository
-from src.infrastructure.database.models.model import CatModel
-from src.application.dto.dto import BreedDTO
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.group_commit import GroupCommitWriter
+from src.infrastructure.database.models.model import CatModel, OutboxModel
+from src.application.dto.dto import BreedDTO, CatDTO
 
 
 class CatRepository(AbstractCatRepository):
-    def __init__(self, db: Session):
+    writes_outbox = True
+
+    def __init__(self, db: Session, writer: Optional[GroupCommitWriter] = None):
         self.db = db
+        # С writer изменения коммитятся группами в потоке-писателе, без него — сессией запроса
+        self.writer = writer
+
+    @staticmethod
+    def _outbox_row(event: Any) -> dict:
+        return {
+            "event_type": type(event).__name__,
+            "routing_key": event.routing_key,
+            "payload": json.dumps(event.to_dict(), default=str),
+            "schema_version": event.schema_version,
+        }
+
+    @staticmethod
+    def _add_to_outbox(db: Session, event: Any):
+        """Кладёт событие в outbox; коммитится вместе с изменением кошки"""
+        db.add(OutboxModel(**CatRepository._outbox_row(event)))
+
+    @staticmethod
+    def _cat_row(cat: Cat) -> dict:
+        return {
+            "name": cat.name,
+            "age": cat.age,
+            "color": cat.color,
+            "breed": cat.breed,
+            "breed_id": cat.breed_id,
+        }
+
+    @staticmethod
+    def _chunks(items: List[Any]) -> Iterator[List[Any]]:
+        size = database_settings.bulk_chunk_size
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    def _write(self, mutation: Callable[[Session], Any]) -> Any:
+        if self.writer is not None:
+            return self.writer.submit(mutation)
+        result = mutation(self.db)
+        self.db.commit()
+        if isinstance(result, CatModel):
+            self.db.refresh(result)
+        return result
 
     def get_by_id(self, id: int) -> Optional[Cat]:
         cat_model = self.db.query(CatModel).filter(CatModel.id == id).first()
@@ -18,7 +71,37 @@ class CatRepository(AbstractCatRepository):
         cats = self.db.query(CatModel).all()
         return [c for c in cats]
 
+    @staticmethod
+    def _page_query(limit: int, after: Optional[int], fields: List[str]):
+        # Выбираются только запрошенные колонки, по индексу первичного ключа без OFFSET
+        query = select(*(getattr(CatModel, name) for name in fields)).order_by(CatModel.id).limit(limit)
+        if after is not None:
+            query = query.where(CatModel.id > after)
+        return query
+
+    def get_page(self, limit: int, after: Optional[int], fields: List[str]) -> List[Dict[str, Any]]:
+        rows = self.db.execute(self._page_query(limit, after, fields))
+        return [dict(row._mapping) for row in rows]
+
     def create(self, cat: Cat) -> Cat:
+        return self._write(partial(self._create, cat=cat))
+
+    def update(self, cat: Cat) -> Cat:
+        return self._write(partial(self._update, cat=cat))
+
+    def delete(self, id: int) -> bool:
+        return self._write(partial(self._delete, id=id))
+
+    def create_many(self, cats: List[Cat]) -> List[CatDTO]:
+        return self._write(partial(self._create_many, cats=cats))
+
+    def update_many(self, cats: List[Cat]) -> List[CatDTO]:
+        return self._write(partial(self._update_many, cats=cats))
+
+    def delete_many(self, ids: List[int]) -> List[int]:
+        return self._write(partial(self._delete_many, ids=ids))
+
+    def _create(self, db: Session, cat: Cat) -> CatModel:
         cat_model = CatModel(
             name=cat.name,
             age=cat.age,
@@ -26,29 +109,74 @@ class CatRepository(AbstractCatRepository):
             breed=cat.breed,
             breed_id=cat.breed_id,
         )
-        self.db.add(cat_model)
-        self.db.commit()
-        self.db.refresh(cat_model)
+        db.add(cat_model)
+        db.flush()  # нужен id для события
+        self._add_to_outbox(db, CatCreatedEvent.from_dto(CatDTO.model_validate(cat_model)))
         return cat_model
 
-    def update(self, cat: Cat) -> Cat:
-        cat_model = self.db.query(CatModel).filter(CatModel.id == cat.id).first()
+    def _update(self, db: Session, cat: Cat) -> CatModel:
+        cat_model = db.query(CatModel).filter(CatModel.id == cat.id).first()
         cat_model.name = cat.name
         cat_model.age = cat.age
         cat_model.color = cat.color
         cat_model.breed = cat.breed
         cat_model.breed_id = cat.breed_id
-
-        self.db.commit()
-        self.db.refresh(cat_model)
+        self._add_to_outbox(db, CatUpdatedEvent.from_dto(CatDTO.model_validate(cat_model)))
         return cat_model
 
-    def delete(self, id: int) -> bool:
-        cat_model = self.db.query(CatModel).filter(CatModel.id == id).first()
-        self.db.delete(cat_model)
-        self.db.commit()
+    def _delete(self, db: Session, id: int) -> bool:
+        cat_model = db.query(CatModel).filter(CatModel.id == id).first()
+        db.delete(cat_model)
+        self._add_to_outbox(db, CatDeletedEvent(cat_id=id))
         return True
 
+    # Пакетные изменения: на кусок — один executemany по кошкам и один по outbox.
+    # События куска лежат в outbox подряд, relay забирает их своими пачками
+
+    def _create_many(self, db: Session, cats: List[Cat]) -> List[CatDTO]:
+        created = []
+        for chunk in self._chunks(cats):
+            rows = [self._cat_row(cat) for cat in chunk]
+            ids = db.scalars(
+                insert(CatModel).returning(CatModel.id, sort_by_parameter_order=True), rows
+            ).all()
+            chunk_created = [CatDTO(id=id, **row) for id, row in zip(ids, rows)]
+            db.execute(
+                insert(OutboxModel),
+                [self._outbox_row(CatCreatedEvent.from_dto(cat)) for cat in chunk_created],
+            )
+            created.extend(chunk_created)
+        return created
+
+    def _update_many(self, db: Session, cats: List[Cat]) -> List[CatDTO]:
+        updated = []
+        for chunk in self._chunks(cats):
+            existing = set(db.scalars(select(CatModel.id).where(CatModel.id.in_([cat.id for cat in chunk]))))
+            chunk_updated = [CatDTO(id=cat.id, **self._cat_row(cat)) for cat in chunk if cat.id in existing]
+            if not chunk_updated:
+                continue
+            db.execute(update(CatModel), [cat.model_dump() for cat in chunk_updated])
+            db.execute(
+                insert(OutboxModel),
+                [self._outbox_row(CatUpdatedEvent.from_dto(cat)) for cat in chunk_updated],
+            )
+            updated.extend(chunk_updated)
+        return updated
+
+    def _delete_many(self, db: Session, ids: List[int]) -> List[int]:
+        deleted = []
+        for chunk in self._chunks(ids):
+            existing = list(db.scalars(select(CatModel.id).where(CatModel.id.in_(chunk))))
+            if not existing:
+                continue
+            db.execute(delete(CatModel).where(CatModel.id.in_(existing)))
+            db.execute(
+                insert(OutboxModel),
+                [self._outbox_row(CatDeletedEvent(cat_id=id)) for id in existing],
+            )
+            deleted.extend(existing)
+        return deleted
+
     def breed_list(self) -> list[BreedDTO]:
         breeds = (
             self.db.query(CatModel.breed, CatModel.breed_id)
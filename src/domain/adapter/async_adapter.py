@@ -0,0 +1,138 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from src.domain.entitites.cat import Cat
+from src.domain.events.cat_event import (
+    CatCreatedEvent,
+    CatUpdatedEvent,
+    CatDeletedEvent,
+)
+from src.domain.adapter.adapter import CatRepository
+from src.domain.repositories.repository import AbstractCatRepository
+from src.infrastructure.database.models.model import CatModel, OutboxModel
+from src.application.dto.dto import BreedDTO, CatDTO
+
+
+class AsyncCatRepository(AbstractCatRepository):
+    """
+    CatRepository на AsyncSession (aiosqlite): запросы не занимают поток
+    threadpool, пока ждут SQLite. Методы — корутины, события, как и в
+    синхронной версии, пишутся в outbox в транзакции изменения.
+    """
+
+    writes_outbox = True
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, id: int) -> Optional[Cat]:
+        return await self.db.get(CatModel, id)
+
+    async def get_all(self) -> List[Cat]:
+        result = await self.db.scalars(select(CatModel))
+        return list(result)
+
+    async def get_page(self, limit: int, after: Optional[int], fields: List[str]) -> List[Dict[str, Any]]:
+        rows = await self.db.execute(CatRepository._page_query(limit, after, fields))
+        return [dict(row._mapping) for row in rows]
+
+    async def create(self, cat: Cat) -> Cat:
+        cat_model = CatModel(
+            name=cat.name,
+            age=cat.age,
+            color=cat.color,
+            breed=cat.breed,
+            breed_id=cat.breed_id,
+        )
+        self.db.add(cat_model)
+        await self.db.flush()  # нужен id для события
+        CatRepository._add_to_outbox(self.db, CatCreatedEvent.from_dto(CatDTO.model_validate(cat_model)))
+        await self.db.commit()
+        return cat_model
+
+    async def update(self, cat: Cat) -> Cat:
+        cat_model = await self.db.get(CatModel, cat.id)
+        cat_model.name = cat.name
+        cat_model.age = cat.age
+        cat_model.color = cat.color
+        cat_model.breed = cat.breed
+        cat_model.breed_id = cat.breed_id
+        CatRepository._add_to_outbox(self.db, CatUpdatedEvent.from_dto(CatDTO.model_validate(cat_model)))
+        await self.db.commit()
+        return cat_model
+
+    async def delete(self, id: int) -> bool:
+        cat_model = await self.db.get(CatModel, id)
+        await self.db.delete(cat_model)
+        CatRepository._add_to_outbox(self.db, CatDeletedEvent(cat_id=id))
+        await self.db.commit()
+        return True
+
+    # Пакетные изменения — как в CatRepository: executemany кусками и коммит в конце
+
+    async def create_many(self, cats: List[Cat]) -> List[CatDTO]:
+        created = []
+        for chunk in CatRepository._chunks(cats):
+            rows = [CatRepository._cat_row(cat) for cat in chunk]
+            ids = (
+                await self.db.scalars(
+                    insert(CatModel).returning(CatModel.id, sort_by_parameter_order=True), rows
+                )
+            ).all()
+            chunk_created = [CatDTO(id=id, **row) for id, row in zip(ids, rows)]
+            await self.db.execute(
+                insert(OutboxModel),
+                [CatRepository._outbox_row(CatCreatedEvent.from_dto(cat)) for cat in chunk_created],
+            )
+            created.extend(chunk_created)
+        await self.db.commit()
+        return created
+
+    async def update_many(self, cats: List[Cat]) -> List[CatDTO]:
+        updated = []
+        for chunk in CatRepository._chunks(cats):
+            existing = set(
+                await self.db.scalars(select(CatModel.id).where(CatModel.id.in_([cat.id for cat in chunk])))
+            )
+            chunk_updated = [
+                CatDTO(id=cat.id, **CatRepository._cat_row(cat)) for cat in chunk if cat.id in existing
+            ]
+            if not chunk_updated:
+                continue
+            await self.db.execute(update(CatModel), [cat.model_dump() for cat in chunk_updated])
+            await self.db.execute(
+                insert(OutboxModel),
+                [CatRepository._outbox_row(CatUpdatedEvent.from_dto(cat)) for cat in chunk_updated],
+            )
+            updated.extend(chunk_updated)
+        await self.db.commit()
+        return updated
+
+    async def delete_many(self, ids: List[int]) -> List[int]:
+        deleted = []
+        for chunk in CatRepository._chunks(ids):
+            existing = list(await self.db.scalars(select(CatModel.id).where(CatModel.id.in_(chunk))))
+            if not existing:
+                continue
+            await self.db.execute(delete(CatModel).where(CatModel.id.in_(existing)))
+            await self.db.execute(
+                insert(OutboxModel),
+                [CatRepository._outbox_row(CatDeletedEvent(cat_id=id)) for id in existing],
+            )
+            deleted.extend(existing)
+        await self.db.commit()
+        return deleted
+
+    async def breed_list(self) -> list[BreedDTO]:
+        result = await self.db.execute(
+            select(CatModel.breed, CatModel.breed_id)
+            .where(CatModel.breed_id.isnot(None))
+            .distinct()
+        )
+        return [BreedDTO(breed=b[0], breed_id=b[1]) for b in result.all()]
+
+    async def add_breed(self, breed_dto: BreedDTO) -> BreedDTO:
+        existing_breed = await self.db.scalar(
+            select(CatModel).where(CatModel.breed == breed_dto.breed).limit(1)
+        )
+        return BreedDTO(breed=existing_breed.breed, breed_id=existing_breed.breed_id)
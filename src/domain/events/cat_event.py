@@ -1,10 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional
 from src.application.dto.dto import CatDTO
+from src.domain.events.registry import new_event_id, register_event
 
+# to_dict/from_dict, event_type и routing_key добавляет register_event
 
-@dataclass
+
+@register_event("cat.created")
+@dataclass(slots=True)
 class CatCreatedEvent:
     cat_id: int
     name: str
@@ -13,6 +17,7 @@ class CatCreatedEvent:
     breed: str
     breed_id: Optional[int]
     created_at: datetime
+    event_id: str = field(default_factory=new_event_id)
 
     @classmethod
     def from_dto(cls, cat_dto: CatDTO) -> "CatCreatedEvent":
@@ -26,21 +31,9 @@ class CatCreatedEvent:
             created_at=datetime.utcnow(),
         )
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "event_type": "cat.created",
-            "cat_id": self.cat_id,
-            "name": self.name,
-            "age": self.age,
-            "color": self.color,
-            "breed": self.breed,
-            "breed_id": self.breed_id,
-            "created_at": self.created_at.isoformat(),
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-
 
-@dataclass
+@register_event("cat.updated")
+@dataclass(slots=True)
 class CatUpdatedEvent:
     cat_id: int
     name: str
@@ -48,6 +41,7 @@ class CatUpdatedEvent:
     color: str
     breed_id: Optional[int]
     updated_at: datetime
+    event_id: str = field(default_factory=new_event_id)
 
     @classmethod
     def from_dto(cls, cat_dto: CatDTO) -> "CatUpdatedEvent":
@@ -55,28 +49,14 @@ class CatUpdatedEvent:
             cat_id=cat_dto.id,
             name=cat_dto.name,
             age=cat_dto.age,
+            color=cat_dto.color,
             breed_id=cat_dto.breed_id,
             updated_at=datetime.utcnow(),
         )
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "event_type": "cat.updated",
-            "cat_id": self.cat_id,
-            "name": self.name,
-            "age": self.age,
-            "breed_id": self.breed_id,
-            "updated_at": self.updated_at.isoformat(),
-            "timestamp": datetime.utcnow().isoformat(),
-        }
 
-
-@dataclass
+@register_event("cat.deleted")
+@dataclass(slots=True)
 class CatDeletedEvent:
     cat_id: int
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "event_type": "cat.deleted",
-            "cat_id": self.cat_id,
-        }
+    event_id: str = field(default_factory=new_event_id)
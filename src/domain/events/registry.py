@@ -0,0 +1,152 @@
+from dataclasses import MISSING, dataclass, fields
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple, Union, get_args, get_origin
+from uuid import uuid4
+
+# Реестр событий: для каждого класса заранее известны event_type и routing_key,
+# а to_dict/from_dict генерируются один раз при регистрации, без рефлексии на вызов
+
+
+@dataclass(frozen=True, slots=True)
+class EventSpec:
+    cls: type
+    event_type: str  # код события в payload
+    routing_key: str  # ключ маршрутизации в RabbitMQ
+    schema_version: int  # версия набора полей, уходит в заголовок сообщения
+    datetime_fields: Tuple[str, ...] = ()  # поля, которые to_dict пишет ISO-строками
+
+
+EVENTS_BY_TYPE: Dict[str, EventSpec] = {}
+EVENTS_BY_CLASS: Dict[type, EventSpec] = {}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, int):
+        # Бинарные кодеки передают время как микросекунды от эпохи (UTC)
+        return _EPOCH + timedelta(microseconds=value)
+    if isinstance(value, str):
+        if value.endswith("Z"):
+            value = value.replace("Z", "+00:00")
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _is_datetime(annotation: Any) -> bool:
+    if annotation is datetime:
+        return True
+    # Optional[datetime]
+    return get_origin(annotation) is Union and datetime in get_args(annotation)
+
+
+def _is_optional(annotation: Any) -> bool:
+    return get_origin(annotation) is Union and type(None) in get_args(annotation)
+
+
+def _compile(name: str, source: str, namespace: Dict[str, Any]) -> Callable:
+    exec(compile(source, f"<event_registry {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _make_to_dict(cls: type, event_type: str) -> Callable:
+    items = [f"        'event_type': {event_type!r},"]
+    for f in fields(cls):
+        if _is_datetime(f.type):
+            value = f"self.{f.name}.isoformat()"
+            if _is_optional(f.type):
+                value = f"(None if self.{f.name} is None else {value})"
+        else:
+            value = f"self.{f.name}"
+        items.append(f"        {f.name!r}: {value},")
+    items.append("        'timestamp': _utcnow().isoformat(),")
+    source = "def to_dict(self):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    return _compile("to_dict", source, {"_utcnow": datetime.utcnow})
+
+
+def _make_to_payload(cls: type, event_type: str) -> Callable:
+    """Как to_dict, но datetime остаются объектами — их переводит кодек"""
+    items = [f"        'event_type': {event_type!r},"]
+    items += [f"        {f.name!r}: self.{f.name}," for f in fields(cls)]
+    items.append("        'timestamp': _utcnow(),")
+    source = "def to_payload(self):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    return _compile("to_payload", source, {"_utcnow": datetime.utcnow})
+
+
+def _make_from_dict(cls: type) -> Callable:
+    namespace: Dict[str, Any] = {"_parse_datetime": _parse_datetime}
+    args = []
+    for f in fields(cls):
+        if f.default_factory is not MISSING:
+            # Поле, которого нет в старых сообщениях: берём значение по умолчанию
+            namespace[f"_factory_{f.name}"] = f.default_factory
+            value = f"data.get({f.name!r}) or _factory_{f.name}()"
+        elif f.default is not MISSING:
+            namespace[f"_default_{f.name}"] = f.default
+            value = f"data.get({f.name!r}, _default_{f.name})"
+        elif _is_optional(f.type):
+            value = f"data.get({f.name!r})"
+        else:
+            value = f"data[{f.name!r}]"
+        if _is_datetime(f.type):
+            value = f"_parse_datetime({value})"
+        args.append(f"        {f.name}={value},")
+    source = "def from_dict(cls, data):\n    return cls(\n" + "\n".join(args) + "\n    )\n"
+    return classmethod(_compile("from_dict", source, namespace))
+
+
+def register_event(event_type: str, routing_key: Optional[str] = None, schema_version: int = 1):
+    """
+    Декоратор для dataclass-события: регистрирует его в реестре и добавляет
+    event_type, routing_key, schema_version, to_dict, to_payload и from_dict
+    """
+
+    def decorator(cls: type) -> type:
+        spec = EventSpec(
+            cls=cls,
+            event_type=event_type,
+            routing_key=routing_key or event_type,
+            schema_version=schema_version,
+            datetime_fields=tuple(f.name for f in fields(cls) if _is_datetime(f.type)) + ("timestamp",),
+        )
+        cls.event_type = spec.event_type
+        cls.routing_key = spec.routing_key
+        cls.schema_version = spec.schema_version
+        cls.to_dict = _make_to_dict(cls, spec.event_type)
+        cls.to_payload = _make_to_payload(cls, spec.event_type)
+        cls.from_dict = _make_from_dict(cls)
+        EVENTS_BY_TYPE[spec.event_type] = spec
+        EVENTS_BY_CLASS[cls] = spec
+        return cls
+
+    return decorator
+
+
+def routing_key_for(event: Any) -> Optional[str]:
+    spec = EVENTS_BY_CLASS.get(type(event))
+    return spec.routing_key if spec is not None else None
+
+
+def event_from_dict(data: Dict[str, Any]) -> Any:
+    """Восстанавливает событие по полю event_type; KeyError — тип не зарегистрирован"""
+    return EVENTS_BY_TYPE[data["event_type"]].cls.from_dict(data)
+
+
+def payload_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Обратное to_dict для сохранённых событий (outbox, спул): payload как у
+    to_payload — datetime снова объекты, event_id и timestamp прежние
+    """
+    spec = EVENTS_BY_TYPE.get(data.get("event_type"))
+    if spec is None:
+        return data
+    payload = dict(data)
+    for name in spec.datetime_fields:
+        if payload.get(name) is not None:
+            payload[name] = _parse_datetime(payload[name])
+    return payload
+
+
+def new_event_id() -> str:
+    """Уникальный id события: по нему консьюмер отбрасывает повторные доставки"""
+    return uuid4().hex
@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
 from src.domain.entitites.cat import Cat
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class AbstractCatRepository(ABC):
+    # True — репозиторий сам пишет события в outbox в транзакции изменения,
+    # и сервису не нужно отдавать их миддлвэйру через self.event
+    writes_outbox: bool = False
+
     @abstractmethod
     def get_by_id(self, id: int) -> Optional[Cat]: ...
 
     @abstractmethod
     def get_all(self) -> List[Cat]: ...
 
+    # Keyset-страница: до limit записей с id > after по возрастанию id, только колонки fields
+    @abstractmethod
+    def get_page(self, limit: int, after: Optional[int], fields: List[str]) -> List[Dict[str, Any]]: ...
+
     @abstractmethod
     def create(self, cat: Cat) -> Cat: ...
 
@@ -19,6 +27,18 @@ class AbstractCatRepository(ABC):
     @abstractmethod
     def delete(self, id: int) -> bool: ...
 
+    # Пакетные методы пишут всё одной транзакцией; события кладут в outbox сами
+    @abstractmethod
+    def create_many(self, cats: List[Cat]) -> List[Cat]: ...
+
+    # Возвращает только найденные и обновлённые кошки
+    @abstractmethod
+    def update_many(self, cats: List[Cat]) -> List[Cat]: ...
+
+    # Возвращает id, которые нашлись и удалены
+    @abstractmethod
+    def delete_many(self, ids: List[int]) -> List[int]: ...
+
     @abstractmethod
     def breed_list(self) -> List[str]: ...
 
@@ -0,0 +1,135 @@
+import threading
+from typing import Any, Iterable
+
+from src.for_logs.config import logging_settings
+
+PRIMITIVES = (int, float, bool, type(None))
+
+
+class LogBudget:
+    """
+    Ограничивает размер лог-документа до сериализации:
+    - строки длиннее max_field_chars обрезаются,
+    - списки и словари — до max_items элементов, вложенность — до max_depth,
+    - из словарей "headers" остаются только разрешённые заголовки,
+    - документ больше max_doc_bytes после сериализации заменяется заглушкой.
+    Счётчики показывают, сколько байт удалось не отправить.
+    """
+
+    def __init__(
+        self,
+        max_field_chars: int,
+        max_items: int,
+        max_depth: int,
+        max_doc_bytes: int,
+        header_allowlist: Iterable[str],
+    ):
+        self.max_field_chars = max_field_chars
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.max_doc_bytes = max_doc_bytes
+        self.header_allowlist = frozenset(h.lower() for h in header_allowlist)
+        self.lock = threading.Lock()
+
+        self.bytes_saved = 0
+        self.truncated_fields = 0
+        self.dropped_headers = 0
+        self.capped_docs = 0
+
+    def apply(self, params: dict) -> dict:
+        if not params:
+            return {}
+        saved = [0, 0, 0]  # байты, обрезанные поля, выкинутые заголовки
+        result = self._walk(params, 0, saved)
+        if any(saved):
+            with self.lock:
+                self.bytes_saved += saved[0]
+                self.truncated_fields += saved[1]
+                self.dropped_headers += saved[2]
+        return result
+
+    def _walk(self, value: Any, depth: int, saved: list) -> Any:
+        if isinstance(value, PRIMITIVES):
+            return value
+        if isinstance(value, str):
+            return self._truncate(value, saved)
+        if depth >= self.max_depth:
+            return self._truncate(str(value), saved)
+
+        if isinstance(value, dict):
+            result = {}
+            for i, (k, v) in enumerate(value.items()):
+                if i >= self.max_items:
+                    saved[1] += len(value) - i
+                    result["_truncated_items"] = len(value) - i
+                    break
+                if k == "headers" and isinstance(v, dict):
+                    result[k] = self._filter_headers(v, saved)
+                else:
+                    result[k] = self._walk(v, depth + 1, saved)
+            return result
+
+        if isinstance(value, (list, tuple, set)):
+            items = list(value)
+            result = [self._walk(v, depth + 1, saved) for v in items[: self.max_items]]
+            if len(items) > self.max_items:
+                saved[1] += len(items) - self.max_items
+                result.append(f"...{len(items) - self.max_items} more")
+            return result
+
+        # DTO раскладываем в словарь, прочие объекты логируем строкой, как и раньше
+        if hasattr(value, "model_dump"):
+            return self._walk(value.model_dump(), depth, saved)
+        return self._truncate(str(value), saved)
+
+    def _truncate(self, value: str, saved: list) -> str:
+        if len(value) <= self.max_field_chars:
+            return value
+        cut = len(value) - self.max_field_chars
+        saved[0] += cut
+        saved[1] += 1
+        return f"{value[: self.max_field_chars]}...[+{cut}]"
+
+    def _filter_headers(self, headers: dict, saved: list) -> dict:
+        kept = {}
+        for k, v in headers.items():
+            if k.lower() in self.header_allowlist:
+                kept[k] = self._truncate(str(v), saved)
+            else:
+                saved[0] += len(k) + len(str(v))
+                saved[2] += 1
+        return kept
+
+    def cap(self, doc: dict, encoded: bytes, encode) -> bytes:
+        """Если документ всё равно больше max_doc_bytes — вместо params пишем заглушку"""
+        if len(encoded) <= self.max_doc_bytes:
+            return encoded
+        capped = {
+            **doc,
+            "message": self._truncate(str(doc.get("message", "")), [0, 0, 0]),
+            "summary": self._truncate(str(doc.get("summary", "")), [0, 0, 0]),
+            "params": {"_capped": True, "_original_bytes": len(encoded)},
+        }
+        result = encode(capped)
+        with self.lock:
+            self.capped_docs += 1
+            self.bytes_saved += len(encoded) - len(result)
+        return result
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "bytes_saved": self.bytes_saved,
+                "truncated_fields": self.truncated_fields,
+                "dropped_headers": self.dropped_headers,
+                "capped_docs": self.capped_docs,
+            }
+
+
+log_budget = LogBudget(
+    max_field_chars=logging_settings.max_field_chars,
+    max_items=logging_settings.max_items,
+    max_depth=logging_settings.max_depth,
+    max_doc_bytes=logging_settings.max_doc_bytes,
+    header_allowlist=logging_settings.header_allowlist,
+)
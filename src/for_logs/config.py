@@ -0,0 +1,50 @@
+from typing import Dict, List
+
+from pydantic_settings import BaseSettings
+
+
+class LoggingSettings(BaseSettings):
+    elastic_url: str = "http://localhost:9200"
+    elastic_index: str = "koshki-logs"
+
+    # Буфер и фоновая отправка через _bulk
+    queue_size: int = 10000  # максимум документов в памяти
+    bulk_size: int = 500  # документов в одном _bulk-запросе
+    flush_interval: float = 1.0  # секунд между принудительными отправками
+    drop_policy: str = "drop_new"  # drop_new | drop_oldest | block
+    block_timeout: float = 0.05  # сколько ждать места в буфере при drop_policy=block
+    shutdown_timeout: float = 5.0  # сколько ждать дослива буфера при остановке
+    request_timeout: float = 2.0  # таймаут одного запроса к Elasticsearch
+
+    # Спул на диске на время недоступности Elasticsearch
+    spool_dir: str = "./spool/logs"
+    spool_segment_bytes: int = 8 * 1024 * 1024
+    spool_max_bytes: int = 512 * 1024 * 1024  # старые сегменты сверх лимита удаляются
+
+    # Circuit breaker перед Elasticsearch
+    breaker_failure_threshold: int = 3
+    breaker_reset_timeout: float = 30.0
+
+    # Сэмплирование и лимиты, например LOG_SAMPLE_RATES='{"IncomingRequest": 0.01}'
+    sample_rates: Dict[str, float] = {}  # доля записей по событию или уровню
+    rate_limits: Dict[str, float] = {}  # записей в секунду по событию
+    suppressed_summary_interval: float = 10.0  # как часто писать сводку подавленных
+
+    # Бюджет размера документа
+    max_field_chars: int = 1024  # длиннее — обрезаем строку
+    max_items: int = 50  # элементов в списке/словаре
+    max_depth: int = 5  # вложенность params
+    max_doc_bytes: int = 16 * 1024  # больше — params заменяются заглушкой
+    header_allowlist: List[str] = [
+        "host",
+        "user-agent",
+        "content-type",
+        "content-length",
+        "x-request-id",
+    ]
+
+    class Config:
+        env_prefix = "LOG_"
+
+
+logging_settings = LoggingSettings()
@@ -0,0 +1,87 @@
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+# Контекст текущего запроса. Хранится изменяемый dict, чтобы отметка
+# "ошибка уже залогирована" из потока threadpool была видна миддлвэйру.
+request_context: ContextVar[Optional[dict]] = ContextVar("request_context", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+def start_request(request_id: Optional[str] = None) -> dict:
+    """Открывает контекст запроса с correlation ID (из заголовка или новым)"""
+    ctx = {"request_id": request_id or uuid.uuid4().hex, "error_reported": False}
+    request_context.set(ctx)
+    return ctx
+
+
+def get_request_id() -> Optional[str]:
+    ctx = request_context.get()
+    return ctx["request_id"] if ctx else None
+
+
+def error_already_reported() -> bool:
+    ctx = request_context.get()
+    return bool(ctx and ctx["error_reported"])
+
+
+def tag_error(
+    exc: Exception,
+    err_class: str,
+    err_method: str,
+    error_type: str = "UnknownError",
+    details: dict = None,
+) -> Exception:
+    """
+    Помечает исключение контекстом вместо немедленного логирования.
+    Документ в лог пишет один раз report_error на границе запроса.
+    """
+    if getattr(exc, "ErrClass", "UnknownClass") == "UnknownClass":
+        exc.ErrClass = err_class
+    if getattr(exc, "ErrMethod", "unknown_method") == "unknown_method":
+        exc.ErrMethod = err_method
+    if getattr(exc, "error_type", None) is None:
+        exc.error_type = error_type
+    # В log_details кладём то, что нужно только в логе, а не в ответе клиенту
+    exc.log_details = {**getattr(exc, "log_details", {}), **(details or {})}
+    return exc
+
+
+def report_error(app_logger, exc: Exception, logger_class: str, params: dict = None):
+    """Пишет ровно один обогащённый документ на ошибку (повторные вызовы игнорируются)"""
+    if getattr(exc, "reported", False):
+        return
+    ctx = request_context.get()
+    if ctx and ctx["error_reported"]:
+        return
+
+    error_type = getattr(exc, "error_type", None) or exc.__class__.__name__
+    err_class = getattr(exc, "ErrClass", logger_class)
+    err_method = getattr(exc, "ErrMethod", "unknown_method")
+    cause = exc.__cause__
+
+    app_logger.warning(
+        logger_class=logger_class,
+        event=error_type,
+        message=str(exc),
+        summary=f"Ошибка {error_type} в {err_class}.{err_method}: {exc}",
+        params={
+            "error_type": error_type,
+            "error_class": exc.__class__.__name__,
+            "error_message": str(exc),
+            "details": getattr(exc, "details", {}),
+            "log_details": getattr(exc, "log_details", {}),
+            "cause": repr(cause) if cause is not None else None,
+            **(params or {}),
+        },
+        ErrClass=err_class,
+        ErrMethod=err_method,
+    )
+
+    try:
+        exc.reported = True
+    except AttributeError:
+        pass
+    if ctx:
+        ctx["error_reported"] = True
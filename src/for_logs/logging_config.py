@@ -1,38 +1,322 @@
 import logging
-import json
+import sys
+import threading
+from collections import deque
 from datetime import datetime
 from elasticsearch import Elasticsearch
-import inspect
+import orjson
 
-ELASTIC_URL = "http://localhost:9200"
-ELASTIC_INDEX = "koshki-logs"
+from src.for_logs.config import logging_settings
+from src.for_logs.sampling import LogSampler, log_sampler
+from src.for_logs.budget import log_budget
+from src.for_logs.error_reporting import request_context
+from src.utils.circuit_breaker.circuit_breaker import CircuitBreaker
+from src.utils.spool.spool import DiskSpool
+
+ELASTIC_URL = logging_settings.elastic_url
+ELASTIC_INDEX = logging_settings.elastic_index
+
+# Один клиент (и один пул соединений) на процесс, создаётся при первой отправке
+_es_client = None
+_es_client_lock = threading.Lock()
+
+# Реестр логгеров: повторный setup_logger с тем же именем возвращает тот же объект
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+DROP_NEW = "drop_new"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class LogEntry:
+    """
+    Готовый лог-документ. Сериализуется один раз при первом обращении
+    к encoded, результат переиспользуют и Elasticsearch, и консоль.
+    """
+
+    __slots__ = ("doc", "_encoded")
+
+    def __init__(self, doc: dict):
+        self.doc = doc
+        self._encoded = None
+
+    @property
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            self._encoded = log_budget.cap(self.doc, _dumps(self.doc), _dumps)
+        return self._encoded
+
+    def __str__(self):
+        return self.encoded.decode("utf-8")
+
+
+def _dumps(doc: dict) -> bytes:
+    # Несериализуемые значения приводятся к str, как раньше в safe_params
+    return orjson.dumps(doc, default=str, option=ORJSON_OPTIONS)
+
+
+def encode_doc(msg) -> bytes:
+    if isinstance(msg, LogEntry):
+        return msg.encoded
+    if isinstance(msg, dict):
+        doc = msg
+    else:
+        doc = orjson.loads(msg)
+    if "@timestamp" not in doc:
+        doc["@timestamp"] = datetime.utcnow().isoformat() + "Z"
+    return _dumps(doc)
 
 
 class ElasticsearchHandler(logging.Handler):
-    def __init__(self, es_client, index):
+    """
+    Неблокирующий хэндлер: emit только кладёт документ в ограниченный буфер,
+    а фоновый поток отправляет накопленное через _bulk по размеру пачки
+    или по истечении flush_interval.
+
+    Если Elasticsearch недоступен, circuit breaker размыкается и пачки
+    пишутся в спул на диске без попыток подключения. Когда кластер
+    снова отвечает, спул переотправляется в порядке записи.
+
+    Клиент Elasticsearch, спул и фоновый поток создаются лениво при первом
+    emit, поэтому импорт модулей, которые логируют, ничего не открывает.
+    """
+
+    def __init__(
+        self,
+        es_client,
+        index,
+        queue_size: int = logging_settings.queue_size,
+        bulk_size: int = logging_settings.bulk_size,
+        flush_interval: float = logging_settings.flush_interval,
+        drop_policy: str = logging_settings.drop_policy,
+        spool: DiskSpool = None,
+        breaker: CircuitBreaker = None,
+    ):
         super().__init__()
-        self.es = es_client
+        if drop_policy not in (DROP_NEW, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Неизвестная политика переполнения: {drop_policy}")
+
+        self.es_client = es_client
         self.index = index
+        self.action_line = orjson.dumps({"index": {"_index": index}}) + b"\n"
+        self.queue_size = queue_size
+        self.bulk_size = bulk_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.spool = spool
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=logging_settings.breaker_failure_threshold,
+            reset_timeout=logging_settings.breaker_reset_timeout,
+        )
+        self.spool_pending = False
+
+        self.buffer = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        # flush(): номер последнего запроса и последнего выполненного
+        self.flush_requested = 0
+        self.flush_done = 0
+
+        # Счётчики для диагностики
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spooled = 0
+
+        self.flusher = None
+
+    @property
+    def es(self):
+        if self.es_client is None:
+            self.es_client = get_es_client()
+        return self.es_client
+
+    def _start(self):
+        """Открывает спул и запускает фоновый поток (вызывается под self.cond)"""
+        if self.spool is None:
+            self.spool = DiskSpool(
+                logging_settings.spool_dir,
+                prefix="logs",
+                segment_bytes=logging_settings.spool_segment_bytes,
+                max_bytes=logging_settings.spool_max_bytes,
+            )
+        # Остались ли недоотправленные логи с прошлого запуска
+        self.spool_pending = self.spool.has_pending()
+
+        self.flusher = threading.Thread(
+            target=self._flush_loop, name="es-log-flusher", daemon=True
+        )
+        self.flusher.start()
 
     def emit(self, record):
         try:
-            if isinstance(record.msg, dict):
-                doc = record.msg
-            else:
-                doc = json.loads(record.msg)
+            self._enqueue(encode_doc(record.msg))
+        except Exception as e:
+            print(f"[ERROR] Не удалось поставить лог в очередь Elasticsearch: {e}")
+
+    def _enqueue(self, doc):
+        with self.cond:
+            if self.closed:
+                self.dropped += 1
+                return
+            if self.flusher is None:
+                self._start()
+
+            if len(self.buffer) >= self.queue_size:
+                if self.drop_policy == BLOCK:
+                    self.cond.wait_for(
+                        lambda: len(self.buffer) < self.queue_size or self.closed,
+                        timeout=logging_settings.block_timeout,
+                    )
+                if self.drop_policy == DROP_OLDEST and self.buffer:
+                    self.buffer.popleft()
+                    self.dropped += 1
+                elif len(self.buffer) >= self.queue_size or self.closed:
+                    self.dropped += 1
+                    return
+
+            self.buffer.append(doc)
+            if len(self.buffer) >= self.bulk_size:
+                self.cond.notify_all()
 
-            if "@timestamp" not in doc:
-                doc["@timestamp"] = datetime.utcnow().isoformat() + "Z"
+    def _take_batch(self):
+        batch = []
+        while self.buffer and len(batch) < self.bulk_size:
+            batch.append(self.buffer.popleft())
+        # Освобождаем ожидающих при drop_policy=block
+        self.cond.notify_all()
+        return batch
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(
+                    lambda: len(self.buffer) >= self.bulk_size
+                    or self.closed
+                    or self.flush_done < self.flush_requested,
+                    timeout=self.flush_interval,
+                )
+                batch = self._take_batch()
+                finished = self.closed and not self.buffer
+                # Запрос flush выполнен, когда отправлена последняя пачка буфера
+                flushed = self.flush_requested if not self.buffer else self.flush_done
+
+            if batch:
+                self._ship(batch)
+            if self.spool_pending:
+                self._replay_spool()
+            if flushed > self.flush_done:
+                with self.cond:
+                    self.flush_done = flushed
+                    self.cond.notify_all()
+            if finished:
+                return
+
+    def _ship(self, batch):
+        if not self.breaker.allow_request():
+            self._spool(batch)
+            return
+
+        try:
+            self._send_bulk(batch)
+        except Exception as e:
+            self.breaker.record_failure()
+            self._spool(batch)
+            print(f"[ERROR] Elasticsearch недоступен, {len(batch)} логов ушли в спул: {e}")
+        else:
+            self.breaker.record_success()
 
-            response = self.es.index(index=self.index, document=doc)
-            log_id = response.get("_id")
-            print(f"[Elasticsearch] Лог записан с ID: {log_id}")
+    def _spool(self, batch):
+        try:
+            self.spooled += self.spool.append_lines(batch)
+            self.spool_pending = True
         except Exception as e:
-            print(f"[ERROR] Не удалось отправить лог в Elasticsearch: {e}")
+            self.dropped += len(batch)
+            print(f"[ERROR] Не удалось записать {len(batch)} логов в спул: {e}")
+
+    def _replay_spool(self):
+        """Переотправляет закрытые сегменты спула пачками, пока кластер отвечает"""
+        if not self.breaker.allow_request():
+            return
+
+        self.spool.seal()
+        for segment in self.spool.sealed_segments():
+            docs = self.spool.read_lines(segment)
+            for start in range(0, len(docs), self.bulk_size):
+                # Первая пачка — проба после half_open, дальше breaker уже закрыт
+                if start and not self.breaker.allow_request():
+                    return
+                try:
+                    self._send_bulk(docs[start : start + self.bulk_size])
+                except Exception as e:
+                    # Сегмент останется на диске и будет отправлен целиком позже
+                    self.breaker.record_failure()
+                    print(f"[ERROR] Не удалось переотправить спул логов: {e}")
+                    return
+                self.breaker.record_success()
+            self.spool.remove(segment)
+
+        self.spool_pending = False
+
+    def _send_bulk(self, batch):
+        # Документы уже сериализованы, тело _bulk собирается склейкой байтов
+        operations = b"".join(self.action_line + doc + b"\n" for doc in batch)
+
+        # Ошибки соединения пробрасываются наверх — их обрабатывает breaker
+        response = self.es.bulk(operations=operations)
+        if response.get("errors"):
+            # Документы, отклонённые самим кластером, не переотправляем
+            failed = sum(
+                1
+                for item in response.get("items", [])
+                if item.get("index", {}).get("error")
+            )
+            self.failed += failed
+            self.sent += len(batch) - failed
+            print(f"[ERROR] Elasticsearch отклонил {failed} из {len(batch)} логов")
+        else:
+            self.sent += len(batch)
+
+    def flush(self):
+        """Будит фоновый поток и ждёт (не дольше shutdown_timeout), пока он отправит всё накопленное"""
+        with self.cond:
+            if self.flusher is None or self.closed:
+                return
+            self.flush_requested += 1
+            request = self.flush_requested
+            self.cond.notify_all()
+            if self.flusher is not threading.current_thread():
+                self.cond.wait_for(
+                    lambda: self.flush_done >= request or self.closed,
+                    timeout=logging_settings.shutdown_timeout,
+                )
+
+    def close(self):
+        """Досылает буфер и останавливает фоновый поток (вызывается и из logging.shutdown)"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if (
+            self.flusher is not None
+            and self.flusher.is_alive()
+            and self.flusher is not threading.current_thread()
+        ):
+            self.flusher.join(timeout=logging_settings.shutdown_timeout)
+        super().close()
 
 
 class AppLogger:
-    def __init__(self, name: str, es_client: Elasticsearch, index: str):
+    def __init__(
+        self,
+        name: str,
+        es_client: Elasticsearch = None,
+        index: str = ELASTIC_INDEX,
+        sampler: LogSampler = log_sampler,
+    ):
+        self.sampler = sampler
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         self.logger.propagate = False
@@ -47,6 +331,21 @@ class AppLogger:
             console_handler.setFormatter(formatter)
             self.logger.addHandler(console_handler)
 
+    def _caller(self, logger_class):
+        """
+        Класс и метод того, кто вызвал info/warning/error.
+        Берём co_qualname кадра (без inspect и f_locals): "CatService.reg_new".
+        """
+        try:
+            code = sys._getframe(4).f_code
+        except ValueError:
+            return logger_class, "unknown_method"
+        qualname = getattr(code, "co_qualname", code.co_name)
+        class_name, _, method_name = qualname.rpartition(".")
+        if not class_name or "<locals>" in class_name:
+            class_name = logger_class
+        return class_name, method_name
+
     def _make_log_entry(
         self,
         level,
@@ -57,40 +356,16 @@ class AppLogger:
         summary=None,
         ErrClass=None,
         ErrMethod=None,
-    ):
+    ) -> LogEntry:
         if ErrClass is None or ErrMethod is None:
-            frame = inspect.currentframe()
-            try:
-                outer_frame = frame.f_back.f_back
-                method_name = outer_frame.f_code.co_name
-                self_obj = outer_frame.f_locals.get("self")
-                class_name = self_obj.__class__.__name__ if self_obj else logger_class
-            finally:
-                del frame
+            class_name, method_name = self._caller(logger_class)
         else:
             class_name = ErrClass
             method_name = ErrMethod
-        safe_params = {}
-        for k, v in (params or {}).items():
-            try:
-                json.dumps(v)
-                safe_params[k] = v
-            except TypeError:
-                safe_params[k] = str(v)
-
-        return {
-            "@timestamp": datetime.utcnow().isoformat() + "Z",
-            "level": level,
-            "logger_class": logger_class,
-            "event": event,
-            "message": message,
-            "summary": summary or "No summary provided",
-            "ErrClass": class_name,
-            "ErrMethod": method_name,
-            "params": safe_params,
-        }
 
-        return {
+        # Параметры не проверяем json.dumps по одному: несериализуемые значения
+        # превратятся в str при единственной сериализации в LogEntry.encoded
+        doc = {
             "@timestamp": datetime.utcnow().isoformat() + "Z",
             "level": level,
             "logger_class": logger_class,
@@ -99,19 +374,92 @@ class AppLogger:
             "summary": summary or "No summary provided",
             "ErrClass": class_name,
             "ErrMethod": method_name,
-            "params": params or {},
+            "params": log_budget.apply(params),
         }
+        ctx = request_context.get()
+        if ctx is not None:
+            doc["request_id"] = ctx["request_id"]
+        return LogEntry(doc)
+
+    def _log(
+        self,
+        levelno,
+        level,
+        logger_class,
+        event,
+        message,
+        params=None,
+        summary=None,
+        ErrClass=None,
+        ErrMethod=None,
+    ):
+        # Если уровень выключен — не собираем документ вообще
+        if not self.logger.isEnabledFor(levelno):
+            return
+        if self.sampler.enabled:
+            if not self.sampler.allow(level, event):
+                return
+            self._log_suppressed_summary()
 
-    def info(self, logger_class, event, message, params=None, summary=None):
+        entry = self._make_log_entry(
+            level,
+            logger_class,
+            event,
+            message,
+            params=params,
+            summary=summary,
+            ErrClass=ErrClass,
+            ErrMethod=ErrMethod,
+        )
+        # makeRecord напрямую: logging.Logger.log ещё раз ходил бы по стеку (findCaller)
+        record = self.logger.makeRecord(
+            self.logger.name, levelno, "(unknown file)", 0, entry, None, None
+        )
+        self.logger.handle(record)
+
+    def _log_suppressed_summary(self):
+        suppressed = self.sampler.take_summary()
+        if suppressed is None:
+            return
         entry = self._make_log_entry(
+            "INFO",
+            self.__class__.__name__,
+            "LogsSuppressed",
+            f"Подавлено записей: {sum(suppressed.values())}",
+            params={
+                "suppressed": suppressed,
+                "interval": self.sampler.summary_interval,
+            },
+            summary="Сводка записей, отброшенных сэмплированием и лимитами",
+            ErrClass=self.__class__.__name__,
+            ErrMethod="_log_suppressed_summary",
+        )
+        record = self.logger.makeRecord(
+            self.logger.name, logging.INFO, "(unknown file)", 0, entry, None, None
+        )
+        self.logger.handle(record)
+
+    def info(
+        self,
+        logger_class,
+        event,
+        message,
+        params=None,
+        summary=None,
+        ErrClass=None,
+        ErrMethod=None,
+    ):
+        self._log(
+            logging.INFO,
             "INFO",
             logger_class,
             event,
             message,
             params=params,
             summary=summary,
+            ErrClass=ErrClass,
+            ErrMethod=ErrMethod,
         )
-        self.logger.info(entry)
 
     def error(
         self,
@@ -123,7 +471,8 @@ class AppLogger:
         ErrClass=None,
         ErrMethod=None,
     ):
-        self._make_log_entry(
+        self._log(
+            logging.ERROR,
             "ERROR",
             logger_class,
             event,
@@ -144,7 +493,8 @@ class AppLogger:
         ErrClass=None,
         ErrMethod=None,
     ):
-        entry = self._make_log_entry(
+        self._log(
+            logging.WARNING,
             "WARNING",
             logger_class,
             event,
@@ -154,9 +504,27 @@ class AppLogger:
             ErrClass=ErrClass,
             ErrMethod=ErrMethod,
         )
-        self.logger.warning(entry)
+
+
+def get_es_client() -> Elasticsearch:
+    """Общий для процесса клиент Elasticsearch, создаётся при первом обращении"""
+    global _es_client
+    if _es_client is None:
+        with _es_client_lock:
+            if _es_client is None:
+                _es_client = Elasticsearch(
+                    ELASTIC_URL, request_timeout=logging_settings.request_timeout
+                )
+    return _es_client
 
 
 def setup_logger(name: str = "app_logger") -> AppLogger:
-    es_client = Elasticsearch(ELASTIC_URL)
-    return AppLogger(name, es_client, ELASTIC_INDEX)
+    """Возвращает логгер из реестра, создавая его при первом вызове"""
+    app_logger = _loggers.get(name)
+    if app_logger is None:
+        with _loggers_lock:
+            app_logger = _loggers.get(name)
+            if app_logger is None:
+                app_logger = AppLogger(name, index=ELASTIC_INDEX)
+                _loggers[name] = app_logger
+    return app_logger
@@ -1,66 +1,108 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response, JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.for_logs.logging_config import setup_logger
+from src.for_logs.error_reporting import (
+    REQUEST_ID_HEADER,
+    error_already_reported,
+    report_error,
+    start_request,
+)
 from src.application.exceptions.exceptions import AppError, NotFoundError
 
 
 app_logger = setup_logger()
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Миддлвэйр для логирования действий юзера в фастапи"""
+class LoggingMiddleware:
+    """
+    Миддлвэйр для логирования действий юзера в фастапи.
+    Чистый ASGI: без задач и перекладывания тела ответа через поток,
+    как это делает BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        request_headers = Headers(scope=scope)
+
+        # Correlation ID: берём из заголовка клиента или генерируем
+        ctx = start_request(request_headers.get(REQUEST_ID_HEADER))
 
-    async def dispatch(self, request: Request, call_next):
         app_logger.info(
             logger_class="LoggingMiddleware",
             event="IncomingRequest",
             message="Received HTTP request",
             params={
-                "method": request.method,
-                "path": request.url.path,
-                "headers": dict(request.headers),
-                "action": request.method,
+                "method": method,
+                "path": path,
+                "headers": dict(request_headers),
+                "action": method,
             },
         )
 
-        try:
-            response = await call_next(request)
+        response_started = False
 
-            status_code = response.status_code
-            app_logger.info(
-                logger_class="LoggingMiddleware",
-                event="OutgoingResponse",
-                message="Sent HTTP response",
-                params={
-                    "status_code": status_code,
-                    "headers": dict(response.headers),
-                    "action": request.method,
-                    "result": status_code,
-                },
-            )
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                response_headers[REQUEST_ID_HEADER] = ctx["request_id"]
 
-            if 500 <= status_code < 600:
-                app_logger.warning(
+                app_logger.info(
                     logger_class="LoggingMiddleware",
-                    event="ServerErrorDetected",
-                    message=f"Server error response sent: {status_code}",
-                    summary=f"Ошибка на уровне сервера: код {status_code}",
+                    event="OutgoingResponse",
+                    message="Sent HTTP response",
                     params={
                         "status_code": status_code,
-                        "method": request.method,
-                        "path": request.url.path,
-                        "action": request.method,
+                        "headers": dict(response_headers),
+                        "action": method,
                         "result": status_code,
                     },
-                    ErrClass="Request",
-                    ErrMethod="dispatch",
                 )
 
-            return response
+                # Если ошибку уже описал report_error — второй документ не пишем
+                if 500 <= status_code < 600 and not error_already_reported():
+                    app_logger.warning(
+                        logger_class="LoggingMiddleware",
+                        event="ServerErrorDetected",
+                        message=f"Server error response sent: {status_code}",
+                        summary=f"Ошибка на уровне сервера: код {status_code}",
+                        params={
+                            "status_code": status_code,
+                            "method": method,
+                            "path": path,
+                            "action": method,
+                            "result": status_code,
+                        },
+                        ErrClass="Request",
+                        ErrMethod="dispatch",
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
 
         except AppError as e:
+            # Ответ уже ушёл клиенту — подменить его нельзя
+            if response_started:
+                raise
             status_code = 404 if isinstance(e, NotFoundError) else 500
+            report_error(
+                app_logger,
+                e,
+                logger_class="LoggingMiddleware",
+                params={"method": method, "path": path},
+            )
 
             response = JSONResponse(
                 status_code=status_code,
@@ -69,25 +111,27 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                     "message": e.message,
                     "details": e.details,
                 },
+                headers={REQUEST_ID_HEADER: ctx["request_id"]},
             )
-
-            return response
+            await response(scope, receive, send)
 
         except Exception as e:
-            app_logger.warning(
+            if response_started:
+                raise
+            report_error(
+                app_logger,
+                e,
                 logger_class="LoggingMiddleware",
-                event="ServerError",
-                message=f"Unhandled exception: {str(e)}",
-                summary=f"Неизвестная ошибка: {str(e)}",
                 params={
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "method": request.method,
-                    "path": request.url.path,
-                    "action": request.method,
+                    "method": method,
+                    "path": path,
+                    "action": method,
                     "result": 500,
                 },
-                ErrClass="UnknownClass",
-                ErrMethod="UnknownMethod",
             )
-            return Response(content="Internal Server Error", status_code=500)
+            response = Response(
+                content="Internal Server Error",
+                status_code=500,
+                headers={REQUEST_ID_HEADER: ctx["request_id"]},
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,98 @@
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from src.for_logs.config import logging_settings
+
+UNSAMPLED_LEVELS = ("WARNING", "ERROR")
+
+
+class TokenBucket:
+    """Token bucket: rate записей в секунду, всплеск до capacity"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class LogSampler:
+    """
+    Решает, писать ли запись, до того как собран документ.
+    sample_rates — доля записей по имени события или уровню. Правило уровня
+    важнее правила события, а WARNING и ERROR по событиям не сэмплируются,
+    так что "1% IncomingRequest" не срежет предупреждения.
+    rate_limits — не больше N записей в секунду по имени события.
+    Подавленные записи считаются и раз в summary_interval отдаются сводкой.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Dict[str, float],
+        rate_limits: Dict[str, float],
+        summary_interval: float,
+    ):
+        self.sample_rates = sample_rates
+        self.buckets = {
+            event: TokenBucket(rate, max(rate, 1.0)) for event, rate in rate_limits.items()
+        }
+        self.summary_interval = summary_interval
+        self.suppressed: Dict[str, int] = {}
+        self.last_summary = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sample_rates or self.buckets)
+
+    def allow(self, level: str, event: str) -> bool:
+        rate = self.sample_rates.get(level)
+        if rate is None:
+            rate = 1.0 if level in UNSAMPLED_LEVELS else self.sample_rates.get(event, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self._suppress(event)
+            return False
+
+        bucket = self.buckets.get(event)
+        if bucket is not None:
+            with self.lock:
+                allowed = bucket.take(time.monotonic())
+            if not allowed:
+                self._suppress(event)
+                return False
+        return True
+
+    def _suppress(self, event: str):
+        with self.lock:
+            self.suppressed[event] = self.suppressed.get(event, 0) + 1
+
+    def take_summary(self) -> Optional[Dict[str, int]]:
+        """Счётчики подавленных записей за прошедший интервал (или None, если рано/нечего)"""
+        now = time.monotonic()
+        if now - self.last_summary < self.summary_interval:
+            return None
+        with self.lock:
+            if now - self.last_summary < self.summary_interval:
+                return None
+            self.last_summary = now
+            suppressed, self.suppressed = self.suppressed, {}
+        return suppressed or None
+
+
+log_sampler = LogSampler(
+    sample_rates=logging_settings.sample_rates,
+    rate_limits=logging_settings.rate_limits,
+    summary_interval=logging_settings.suppressed_summary_interval,
+)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Any, List, Optional
+
+from src.application.dto.dto import BreedDTO, BulkDeleteDTO, BulkResultDTO, CatDTO, CatPageDTO
+from src.application.services.services import AsyncCatService
+from src.for_logs.logging_config import setup_logger
+from src.infrastructure.database.config import database_settings
+from src.utils.decorators.decorators import log_service
+from src.dependencies.main import get_async_service
+
+# Те же роуты, что в routes.py, но async def на AsyncCatService:
+# выполняются в event loop, а не в threadpool Starlette
+
+app_logger = setup_logger()
+router = APIRouter()
+
+
+@router.get("/cats", response_model=CatPageDTO)
+@log_service
+async def get_all_cats(
+    limit: int = Query(database_settings.page_default_limit, ge=1, le=database_settings.page_max_limit),
+    after: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    fields: Optional[str] = Query(None, description="Поля через запятую, например name,age"),
+    service: AsyncCatService = Depends(get_async_service),
+):
+    return await service.get_page(limit=limit, after=after, fields=fields)
+
+
+# Пакетные роуты объявлены до /cats/{id}, иначе PUT /cats/bulk попадёт в update_cat.
+# Элементы проверяются по одному в сервисе: ошибка одного не отклоняет весь запрос
+
+
+@router.post("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+async def reg_many(items: List[Any], service: AsyncCatService = Depends(get_async_service)):
+    return await service.reg_many(items)
+
+
+@router.put("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+async def update_many(items: List[Any], service: AsyncCatService = Depends(get_async_service)):
+    return await service.update_many(items)
+
+
+@router.delete("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+async def remove_many(body: BulkDeleteDTO, service: AsyncCatService = Depends(get_async_service)):
+    return await service.delete_many(body.ids)
+
+
+@router.get("/cats/{id}", response_model=CatDTO)
+@log_service
+async def get_one_cat(id: int, service: AsyncCatService = Depends(get_async_service)):
+    return await service.get_one(id=id)
+
+
+@router.post("/cats", response_model=CatDTO)
+@log_service
+async def reg_new(cat_dto: CatDTO, service: AsyncCatService = Depends(get_async_service)):
+    return await service.reg_new(cat_dto)
+
+
+@router.put("/cats/{id}", response_model=CatDTO)
+@log_service
+async def update_cat(id: int, cat_dto: CatDTO, service: AsyncCatService = Depends(get_async_service)):
+    cat_dto.id = id
+    return await service.update_one(cat_dto)
+
+
+@router.delete("/cats/", response_model=dict)
+@log_service
+async def remove_cat(id: int, service: AsyncCatService = Depends(get_async_service)):
+    await service.delete_cat(id=id)
+    return {"status": "deleted"}
+
+
+@router.get("/breeds", response_model=List[BreedDTO])
+@log_service
+async def list_breeds(service: AsyncCatService = Depends(get_async_service)):
+    return await service.breed_list()
+
+
+@router.post("/breeds", response_model=BreedDTO)
+@log_service
+async def add_breed(breed_dto: BreedDTO, service: AsyncCatService = Depends(get_async_service)):
+    return await service.add_breed(breed_dto)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query
+from typing import Any, List, Optional
 
-from src.application.dto.dto import CatDTO, BreedDTO
+from src.application.dto.dto import BreedDTO, BulkDeleteDTO, BulkResultDTO, CatDTO, CatPageDTO
 from src.application.services.services import CatService
 from src.for_logs.logging_config import setup_logger
+from src.infrastructure.database.config import database_settings
 from src.utils.decorators.decorators import log_service
 from src.dependencies.main import get_service
 
@@ -11,10 +12,37 @@ app_logger = setup_logger()
 router = APIRouter()
 
 
-@router.get("/cats")
+@router.get("/cats", response_model=CatPageDTO)
 @log_service
-def get_all_cats(service: CatService = Depends(get_service)):
-    return service.get_all()
+def get_all_cats(
+    limit: int = Query(database_settings.page_default_limit, ge=1, le=database_settings.page_max_limit),
+    after: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    fields: Optional[str] = Query(None, description="Поля через запятую, например name,age"),
+    service: CatService = Depends(get_service),
+):
+    return service.get_page(limit=limit, after=after, fields=fields)
+
+
+# Пакетные роуты объявлены до /cats/{id}, иначе PUT /cats/bulk попадёт в update_cat.
+# Элементы проверяются по одному в сервисе: ошибка одного не отклоняет весь запрос
+
+
+@router.post("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+def reg_many(items: List[Any], service: CatService = Depends(get_service)):
+    return service.reg_many(items)
+
+
+@router.put("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+def update_many(items: List[Any], service: CatService = Depends(get_service)):
+    return service.update_many(items)
+
+
+@router.delete("/cats/bulk", response_model=BulkResultDTO)
+@log_service
+def remove_many(body: BulkDeleteDTO, service: CatService = Depends(get_service)):
+    return service.delete_many(body.ids)
 
 
 @router.get("/cats/{id}", response_model=CatDTO)
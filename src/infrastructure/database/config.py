@@ -0,0 +1,28 @@
+from pydantic_settings import BaseSettings
+
+
+class DatabaseSettings(BaseSettings):
+    url: str = "sqlite:///./animal.db"
+    # Профиль хранения (storage_profile.py): wal, wal_durable или legacy (как было раньше)
+    profile: str = "wal"
+    # true — async-роуты и AsyncCatRepository на aiosqlite вместо синхронного Session в threadpool
+    async_mode: bool = False
+
+    # Запись через один поток-писатель с групповым коммитом (group_commit.py)
+    group_commit: bool = True
+    group_commit_max_batch: int = 256  # сколько изменений максимум в одной транзакции
+    group_commit_max_wait_ms: float = 0.0  # сколько подождать попутчиков; 0 — группа из того, что уже в очереди
+
+    # Пакетные /cats/bulk: строки и события outbox пишутся executemany кусками по bulk_chunk_size
+    bulk_chunk_size: int = 256
+    bulk_max_items: int = 10_000  # больше элементов в одном запросе — 422
+
+    # GET /cats отдаёт страницы по id (keyset), а не всю таблицу
+    page_default_limit: int = 100
+    page_max_limit: int = 1000
+
+    class Config:
+        env_prefix = "DATABASE_"
+
+
+database_settings = DatabaseSettings()
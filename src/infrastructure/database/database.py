@@ -1,29 +1,56 @@
-from sqlalchemy import create_engine
+import anyio
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(
-    "sqlite:///./animal.db",
-    connect_args={
-        "check_same_thread": False,  # разрешаем доступ из разных потоков
-        "timeout": 20,  # время ожидания разблокировки БД (в секундах)
-    },
-    pool_size=500,
-    max_overflow=500,
-    pool_timeout=1,
-    pool_pre_ping=True,
-    pool_recycle=20,
-    echo=False,
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.storage_profile import (
+    PROFILES,
+    create_async_storage_engine,
+    create_storage_engine,
 )
+
+engine = create_storage_engine(database_settings.url, database_settings.profile)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async-путь (DATABASE_ASYNC_MODE): соединения создаются только при первом запросе
+async_engine = create_async_storage_engine(database_settings.url, database_settings.profile)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Сессий запросов одновременно не больше, чем соединений в пуле. Запрос держит
+# соединение, пока FastAPI сериализует ответ в следующем потоке threadpool; если бы
+# ожидание соединения тоже занимало поток, все потоки могли бы ждать друг друга.
+# Поэтому слот ждём здесь, в event loop, а получившему слот соединение выдаётся сразу
+request_limiter = anyio.CapacityLimiter(PROFILES[database_settings.profile].pool_size)
+
+
+async def get_db():
+    async with request_limiter:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def dispose_async_engine():
+    """Закрывает соединения aiosqlite: их потоки не daemon и не дают процессу завершиться"""
+    await async_engine.dispose()
 
 
 Base = declarative_base()
+
+
+def upgrade_schema(bind):
+    """create_all не добавляет колонки в уже существующие таблицы — новые дописываются здесь"""
+    columns = {column["name"] for column in inspect(bind).get_columns("outbox")}
+    if "schema_version" not in columns:
+        with bind.begin() as connection:
+            connection.execute(text("ALTER TABLE outbox ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1"))
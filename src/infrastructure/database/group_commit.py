@@ -0,0 +1,140 @@
+import queue
+import threading
+from concurrent.futures import Future
+from time import monotonic
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.database import SessionLocal
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Единственный писатель в SQLite. Запросы кладут изменения в очередь и ждут
+    результат; поток-писатель забирает всё, что накопилось (до max_batch),
+    выполняет каждое изменение в своём SAVEPOINT и коммитит группу одной
+    транзакцией — один fsync на группу вместо одного на запрос и без борьбы
+    за блокировку записи. Ошибка одного изменения откатывает только его
+    SAVEPOINT, остальные изменения группы коммитятся.
+    """
+
+    def __init__(self, session_factory: sessionmaker, max_batch: int = 256, max_wait: float = 0.0):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: "queue.Queue[Any]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+        # Метрики
+        self.groups = 0
+        self.writes = 0
+        self.failed = 0
+        self.max_group = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+            self.thread.start()
+
+    def submit(self, mutation: Callable[[Session], Any]) -> Any:
+        """
+        Выполняет mutation(session) в потоке-писателе и возвращает её результат
+        после коммита группы. ORM-объекты в результате отсоединены от сессии,
+        их атрибуты уже загружены.
+        """
+        if self.thread is None:
+            self.start()
+        future: Future = Future()
+        self.queue.put((mutation, future))
+        return future.result()
+
+    def _collect(self, first: Tuple[Callable, Future]) -> Tuple[List[Tuple[Callable, Future]], bool]:
+        group = [first]
+        deadline = monotonic() + self.max_wait
+        while len(group) < self.max_batch:
+            try:
+                timeout = deadline - monotonic()
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        return group, False
+
+    def _run(self):
+        # expire_on_commit=False: результат читается в потоке запроса уже после коммита
+        session = self.session_factory(expire_on_commit=False)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _STOP:
+                    return
+                group, stop = self._collect(item)
+                self._apply(session, group)
+                if stop:
+                    return
+        finally:
+            session.close()
+
+    def _apply(self, session: Session, group: List[Tuple[Callable, Future]]):
+        outcomes = []
+        for mutation, future in group:
+            try:
+                with session.begin_nested():
+                    outcomes.append((future, mutation(session), None))
+            except Exception as e:
+                outcomes.append((future, None, e))
+
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.failed += len(group)
+            for future, _, _ in outcomes:
+                future.set_exception(e)
+            return
+        session.expunge_all()
+
+        self.groups += 1
+        self.writes += len(group)
+        self.max_group = max(self.max_group, len(group))
+        for future, result, error in outcomes:
+            if error is not None:
+                self.failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stop(self):
+        """Дописывает очередь и останавливает поток-писатель"""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        self.queue.put(_STOP)
+        thread.join()
+
+    def metrics(self) -> dict:
+        return {
+            "groups": self.groups,
+            "writes": self.writes,
+            "avg_group": round(self.writes / self.groups, 1) if self.groups else 0,
+            "max_group": self.max_group,
+            "failed": self.failed,
+            "queued": self.queue.qsize(),
+        }
+
+
+db_writer = GroupCommitWriter(
+    SessionLocal,
+    max_batch=database_settings.group_commit_max_batch,
+    max_wait=database_settings.group_commit_max_wait_ms / 1000,
+)
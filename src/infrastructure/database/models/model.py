@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
 from src.infrastructure.database.database import Base
 
 
@@ -10,3 +12,17 @@ class CatModel(Base):
     color = Column(String)
     breed = Column(String)
     breed_id = Column(Integer)
+
+
+class OutboxModel(Base):
+    """Событие, записанное в той же транзакции, что и изменение кошки"""
+
+    __tablename__ = "outbox"
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String, nullable=False)
+    routing_key = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON из event.to_dict()
+    schema_version = Column(Integer, default=1, server_default="1", nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True, index=True)  # NULL — ещё не опубликовано
+    attempts = Column(Integer, default=0, nullable=False)
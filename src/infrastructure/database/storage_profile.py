@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from functools import partial
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+@dataclass(frozen=True, slots=True)
+class StorageProfile:
+    """Pragma SQLite, которые ставятся на каждое новое соединение, и настройки пула"""
+
+    journal_mode: str
+    synchronous: str
+    cache_size_kib: int  # кеш страниц на соединение
+    mmap_size: int  # байт файла БД, читаемых через mmap; 0 — выключено
+    busy_timeout: float  # сколько ждать блокировку записи, секунды
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_pre_ping: bool
+    pool_recycle: int
+
+
+PROFILES = {
+    # WAL: читатели не блокируют писателя и друг друга, писатель всегда один.
+    # pool_size — соединения для запросов: столько сессий запросов одновременно
+    # пропускает request_limiter (database.py), остальные ждут в event loop, не занимая
+    # поток threadpool (40). max_overflow — запас для фоновых сессий: писатель, outbox.
+    # Соединения с файлом не рвутся, поэтому ни ping при выдаче, ни recycle не нужны
+    "wal": StorageProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",  # в WAL не теряет целостность, fsync только на checkpoint
+        cache_size_kib=64 * 1024,
+        mmap_size=256 * 1024 * 1024,
+        busy_timeout=5.0,
+        pool_size=32,
+        max_overflow=8,
+        pool_timeout=10.0,
+        pool_pre_ping=False,
+        pool_recycle=-1,
+    ),
+    # То же, но fsync на каждый коммит: коммит переживает и отключение питания
+    "wal_durable": StorageProfile(
+        journal_mode="WAL",
+        synchronous="FULL",
+        cache_size_kib=64 * 1024,
+        mmap_size=256 * 1024 * 1024,
+        busy_timeout=5.0,
+        pool_size=32,
+        max_overflow=8,
+        pool_timeout=10.0,
+        pool_pre_ping=False,
+        pool_recycle=-1,
+    ),
+    # Прежние настройки: rollback journal, пул на 1000 соединений, ping и recycle
+    "legacy": StorageProfile(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        cache_size_kib=2 * 1024,
+        mmap_size=0,
+        busy_timeout=20.0,
+        pool_size=500,
+        max_overflow=500,
+        pool_timeout=1.0,
+        pool_pre_ping=True,
+        pool_recycle=20,
+    ),
+}
+
+
+def _apply_pragmas(profile: StorageProfile, dbapi_connection, connection_record):
+    # Транзакциями управляет SQLAlchemy (_begin), а не драйвер sqlite3: иначе SAVEPOINT
+    # открывает транзакцию сам, и его RELEASE коммитит всю группу записей раньше времени
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={profile.synchronous}")
+    cursor.execute(f"PRAGMA cache_size=-{profile.cache_size_kib}")
+    cursor.execute(f"PRAGMA mmap_size={profile.mmap_size}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+def _get_profile(profile_name: str) -> StorageProfile:
+    try:
+        return PROFILES[profile_name]
+    except KeyError:
+        raise ValueError(f"Неизвестный профиль хранения: {profile_name}, доступны: {list(PROFILES)}")
+
+
+def _engine_options(profile: StorageProfile) -> dict:
+    return dict(
+        connect_args={
+            "check_same_thread": False,  # разрешаем доступ из разных потоков
+            "timeout": profile.busy_timeout,  # время ожидания разблокировки БД (в секундах)
+        },
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout,
+        pool_pre_ping=profile.pool_pre_ping,
+        pool_recycle=profile.pool_recycle,
+        echo=False,
+    )
+
+
+def _listen(engine: Engine, profile: StorageProfile):
+    event.listen(engine, "connect", partial(_apply_pragmas, profile))
+    event.listen(engine, "begin", _begin)
+
+
+def create_storage_engine(url: str, profile_name: str) -> Engine:
+    """Engine SQLite с пулом и pragma выбранного профиля"""
+    profile = _get_profile(profile_name)
+    engine = create_engine(url, **_engine_options(profile))
+    _listen(engine, profile)
+    return engine
+
+
+def async_url(url: str) -> str:
+    """sqlite:///./animal.db -> sqlite+aiosqlite:///./animal.db"""
+    return url.replace("sqlite://", "sqlite+aiosqlite://", 1) if url.startswith("sqlite://") else url
+
+
+def create_async_storage_engine(url: str, profile_name: str) -> AsyncEngine:
+    """Async engine (aiosqlite) с теми же pragma; пул без соединений сверх pool_size"""
+    profile = _get_profile(profile_name)
+    options = _engine_options(profile)
+    # Здесь предел соединений жёсткий: сессия закрывается и ответ сериализуется
+    # в event loop, и запрос, ждущий соединение, не занимает поток
+    options["max_overflow"] = 0
+    engine = create_async_engine(async_url(url), **options)
+    # События соединения живут на синхронном engine внутри async-обёртки
+    _listen(engine.sync_engine, profile)
+    return engine
@@ -1,25 +1,40 @@
-from fastapi import Request
-from src.infrastructure.rabbit_and_celery.message_broker.rabbitmq_pusher import (
-    RabbitMQPublisher,
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.infrastructure.rabbit_and_celery.message_broker.resilient_publisher import (
+    event_publisher,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.outbound_queue import (
+    OutboundEventQueue,
 )
 
-publisher = RabbitMQPublisher()
+publisher = event_publisher
+outbound_queue = OutboundEventQueue(publisher)
 
 
-async def event_handler_middleware(request: Request, call_next):
-    response = await call_next(request)
+class EventHandlerMiddleware:
+    """
+    Передаёт событие сервиса в очередь исходящих событий после того,
+    как ответ отправлен клиенту. Сама публикация идёт в фоне.
+    Сервис кладётся в request.state (то есть в scope["state"]) зависимостью get_service.
+    """
 
-    if hasattr(request.state, "cat_service"):
-        service = request.state.cat_service
-        if hasattr(service, "event") and service.event is not None:
-            event = service.event
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-            try:
-                publisher.publish(event, routing_key="cat.created")
-                print(f"[MIDDLEWARE] Событие отправлено: {event}")
-                service.event = None
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            except Exception as e:
-                print(f"[MIDDLEWARE] Ошибка публикации: {e}")
+        # Тот же dict, что потом увидит request.state в роуте
+        state = scope.setdefault("state", {})
+        await self.app(scope, receive, send)
 
-    return response
+        service = state.get("cat_service")
+        if service is not None:
+            if hasattr(service, "event") and service.event is not None:
+                event = service.event
+
+                routing_key = getattr(event, "routing_key", None)
+                if await outbound_queue.enqueue(event, routing_key=routing_key):
+                    print(f"[MIDDLEWARE] Событие поставлено в очередь: {event}")
+                service.event = None
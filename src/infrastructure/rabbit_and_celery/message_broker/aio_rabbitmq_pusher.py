@@ -0,0 +1,383 @@
+import asyncio
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Iterable, List, Optional, Tuple
+
+import aio_pika
+from aio_pika.abc import AbstractExchange, AbstractRobustChannel, AbstractRobustConnection
+from aio_pika.exceptions import AMQPConnectionError, ChannelInvalidStateError, DeliveryError
+from pamqp.commands import Basic
+
+from src.domain.repositories.event_repository import AbstractEventPublisher
+from src.infrastructure.rabbit_and_celery.message_broker.config import (
+    DELAY_EXCHANGE,
+    DELAY_HEADER,
+    DLQ_QUEUE,
+    DLX_EXCHANGE,
+    delay_ms_for,
+    delay_queue_arguments,
+    delay_queue_name,
+    rabbitmq_settings,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.codecs import (
+    SCHEMA_VERSION_HEADER,
+    event_payload,
+    get_codec,
+    payload_text,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.confirm_tracker import ConfirmTracker
+from src.infrastructure.rabbit_and_celery.message_broker.rabbitmq_pusher import RabbitMQPublisher
+from src.for_logs.logging_config import setup_logger
+from src.application.exceptions.exceptions import AppError
+
+app_logger = setup_logger()
+
+
+class AioRabbitMQPublisher(AbstractEventPublisher):
+    """
+    Асинхронный publisher на aio-pika с той же топологией, что у RabbitMQPublisher.
+    Одно robust-соединение и один канал с подтверждениями живут весь процесс
+    и переподключаются сами; вызывается прямо из event loop FastAPI.
+    """
+
+    def __init__(self):
+        self.connection: Optional[AbstractRobustConnection] = None
+        self.channel: Optional[AbstractRobustChannel] = None
+        self.exchange: Optional[AbstractExchange] = None
+        self.dlx_exchange: Optional[AbstractExchange] = None
+        self.delay_exchange: Optional[AbstractExchange] = None
+        self.exchange_name = rabbitmq_settings.exchange_name
+        self.queue_name = rabbitmq_settings.queue_name
+        self.routing_key = rabbitmq_settings.routing_key
+        self.codec = get_codec()
+        self.lock = asyncio.Lock()
+
+        # Метрики
+        self.published = 0
+        self.sent_to_dlq = 0
+        self.failed = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return self.channel is not None and not self.channel.is_closed
+
+    async def connect(self):
+        """Подключение и настройка exchange, очереди и DLQ (один раз на процесс)"""
+        async with self.lock:
+            if self.is_connected:
+                return
+            try:
+                self.connection = await aio_pika.connect_robust(rabbitmq_settings.url)
+                # on_return_raises: немаршрутизируемое сообщение вернётся как DeliveryError
+                self.channel = await self.connection.channel(
+                    publisher_confirms=True, on_return_raises=True
+                )
+
+                # Объявляем основной exchange
+                self.exchange = await self.channel.declare_exchange(
+                    self.exchange_name, aio_pika.ExchangeType.TOPIC, durable=True
+                )
+
+                # Объявляем основную очередь с DLX
+                queue = await self.channel.declare_queue(
+                    self.queue_name,
+                    durable=True,
+                    arguments={
+                        "x-dead-letter-exchange": DLX_EXCHANGE,
+                        "x-dead-letter-routing-key": DLQ_QUEUE,
+                    },
+                )
+                await queue.bind(self.exchange, routing_key=self.routing_key)
+
+                # === Настраиваем DLX и DLQ ===
+                self.dlx_exchange = await self.channel.declare_exchange(
+                    DLX_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+                )
+                dlq = await self.channel.declare_queue(DLQ_QUEUE, durable=True)
+                await dlq.bind(self.dlx_exchange, routing_key=DLQ_QUEUE)
+
+                # === Очереди задержки ===
+                self.delay_exchange = await self.channel.declare_exchange(
+                    DELAY_EXCHANGE, aio_pika.ExchangeType.HEADERS, durable=True
+                )
+                for delay_ms in rabbitmq_settings.delay_queues_ms:
+                    holding = await self.channel.declare_queue(
+                        delay_queue_name(delay_ms),
+                        durable=True,
+                        arguments=delay_queue_arguments(delay_ms),
+                    )
+                    await holding.bind(
+                        self.delay_exchange,
+                        arguments={"x-match": "all", DELAY_HEADER: delay_ms},
+                    )
+                print(f"[✓] aio-pika: exchange '{self.exchange_name}', DLX, DLQ и очереди задержки готовы")
+
+            except Exception as e:
+                app_logger.error(
+                    logger_class=self.__class__.__name__,
+                    event="ConnectionFailed",
+                    message=str(e),
+                    summary="Не удалось подключиться к RabbitMQ",
+                    ErrClass=self.__class__.__name__,
+                    ErrMethod="connect",
+                )
+                raise
+
+    async def disconnect(self):
+        try:
+            if self.connection and not self.connection.is_closed:
+                await self.connection.close()
+                app_logger.info(
+                    logger_class=self.__class__.__name__,
+                    event="Disconnected",
+                    message="RabbitMQ connection closed",
+                )
+        except Exception as e:
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="DisconnectError",
+                message=str(e),
+                summary="Ошибка при закрытии соединения",
+                ErrClass=self.__class__.__name__,
+                ErrMethod="disconnect",
+            )
+        finally:
+            self.connection = None
+            self.channel = None
+
+    async def _send_to_dlq(self, bad_payload: str, error_reason: str, original_routing_key: str):
+        """Отправляет 'битое' сообщение в мертвую очередь как строку"""
+        try:
+            if not self.is_connected:
+                await self.connect()
+            await self.dlx_exchange.publish(
+                aio_pika.Message(
+                    body=bad_payload.encode("utf-8"),
+                    content_type="text/plain",
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    headers={
+                        "x-error-reason": error_reason,
+                        "original-routing-key": original_routing_key,
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                ),
+                routing_key=DLQ_QUEUE,
+            )
+            app_logger.warning(
+                logger_class=self.__class__.__name__,
+                event="SentToDLQ",
+                message="Сообщение отправлено в DLQ",
+                summary="Некорректное сообщение перенаправлено в мертвую очередь",
+                params={
+                    "dlq_exchange": DLX_EXCHANGE,
+                    "dlq_routing_key": DLQ_QUEUE,
+                    "error": error_reason,
+                    "original_payload_preview": bad_payload[:500],
+                },
+            )
+        except Exception as e:
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="DLQSendFailed",
+                message="Не удалось отправить в DLQ",
+                summary=f"Критическая ошибка: {e}",
+                params={"payload": bad_payload[:300], "error": str(e)},
+            )
+
+    async def _prepare(self, event: Any, routing_key: str) -> Optional[Tuple[dict, bytes, int]]:
+        """
+        Кодирует событие выбранным кодеком: (payload, тело, версия схемы).
+        Некорректное событие сразу уходит в DLQ и даёт None.
+        """
+        if not hasattr(event, "to_dict") or not callable(getattr(event, "to_dict")):
+            raw_repr = repr(event)
+            await self._send_to_dlq(
+                bad_payload=raw_repr,
+                error_reason="Event does not have callable .to_dict()",
+                original_routing_key=routing_key,
+            )
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="InvalidEvent",
+                message="Event must have .to_dict()",
+                params={"event_type": type(event).__name__, "value": raw_repr},
+            )
+            self.sent_to_dlq += 1
+            return None
+
+        try:
+            payload, schema_version = event_payload(event)
+            return payload, self.codec.encode(payload), schema_version
+        except TypeError as e:
+            bad_payload = repr(event)
+            await self._send_to_dlq(
+                bad_payload=bad_payload,
+                error_reason=f"JSON serialization failed: {str(e)}",
+                original_routing_key=routing_key,
+            )
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="SerializationError",
+                message="Failed to serialize event",
+                params={"event": bad_payload, "error": str(e)},
+            )
+            self.sent_to_dlq += 1
+            return None
+
+    def _send(
+        self,
+        message_body: bytes,
+        routing_key: str,
+        schema_version: int,
+        exchange: Optional[AbstractExchange] = None,
+        headers: Optional[dict] = None,
+    ) -> Awaitable:
+        return (exchange or self.exchange).publish(
+            aio_pika.Message(
+                body=message_body,
+                content_type=self.codec.content_type,
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                headers={SCHEMA_VERSION_HEADER: schema_version, **(headers or {})},
+            ),
+            routing_key=routing_key,
+            mandatory=True,
+        )
+
+    async def _on_confirm(
+        self, event: Any, routing_key: str, payload: dict, result: Any
+    ) -> bool:
+        """
+        Разбирает ответ брокера по одному сообщению: Ack, возврат, Nack или ошибка.
+        False — только если сообщение не дошло до брокера и его стоит повторить.
+        """
+        if isinstance(result, Basic.Ack):
+            self.published += 1
+            app_logger.info(
+                logger_class=self.__class__.__name__,
+                event="EventPublished",
+                message=f"Published {event.__class__.__name__}",
+                params={"routing_key": routing_key, "payload": payload},
+            )
+        elif isinstance(result, DeliveryError):
+            # Брокер вернул сообщение (нет привязки) — в DLQ, как и в blocking-версии
+            self.sent_to_dlq += 1
+            await self._send_to_dlq(
+                bad_payload=payload_text(payload),
+                error_reason=f"Unroutable message (returned by broker): {result}",
+                original_routing_key=routing_key,
+            )
+        elif isinstance(result, (AMQPConnectionError, ChannelInvalidStateError, ConnectionError)):
+            # Брокер недоступен: DLQ на том же брокере тоже не ответит
+            self.failed += 1
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="BrokerUnavailable",
+                message="RabbitMQ недоступен",
+                summary=str(result),
+                params={"event_type": type(event).__name__, "routing_key": routing_key},
+            )
+            return False
+        elif isinstance(result, Exception):
+            # Событие повторят (outbox), поэтому в DLQ не отправляем — только логируем
+            self.failed += 1
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="PublishFailed",
+                message="Не удалось опубликовать событие",
+                summary=str(result),
+                params={"event_type": type(event).__name__, "error": str(result)},
+            )
+            return False
+        else:
+            self.sent_to_dlq += 1
+            await self._send_to_dlq(
+                bad_payload=payload_text(payload),
+                error_reason=f"Nack from broker: {result}",
+                original_routing_key=routing_key,
+            )
+        return True
+
+    async def publish(self, event: Any, routing_key: Optional[str] = None):
+        await self._publish(event, routing_key)
+
+    async def publish_delayed(
+        self, event: Any, delay_seconds: float, routing_key: Optional[str] = None
+    ):
+        """
+        Публикует событие через очередь задержки: брокер доставит его в основной
+        exchange с тем же routing_key через delay_seconds. Задержка должна быть
+        одной из RABBITMQ_DELAY_QUEUES_MS.
+        """
+        delay_ms = delay_ms_for(delay_seconds)
+        if not self.is_connected:
+            await self.connect()
+        await self._publish(event, routing_key, self.delay_exchange, {DELAY_HEADER: delay_ms})
+
+    async def _publish(
+        self,
+        event: Any,
+        routing_key: Optional[str],
+        exchange: Optional[AbstractExchange] = None,
+        headers: Optional[dict] = None,
+    ):
+        if routing_key is None:
+            routing_key = RabbitMQPublisher._class_name_to_routing_key(event)
+
+        if not self.is_connected:
+            await self.connect()
+
+        prepared = await self._prepare(event, routing_key)
+        if prepared is None:
+            return
+        payload, message_body, schema_version = prepared
+
+        try:
+            result = await self._send(message_body, routing_key, schema_version, exchange, headers)
+        except Exception as e:
+            result = e
+        await self._on_confirm(event, routing_key, payload, result)
+        if isinstance(result, Exception) and not isinstance(result, DeliveryError):
+            raise AppError(f"Failed to publish event: {result}") from result
+
+    async def publish_many(
+        self,
+        events: Iterable[Any],
+        routing_key: Optional[str] = None,
+        window: Optional[int] = None,
+    ) -> List[bool]:
+        """
+        Публикует пачку событий, не дожидаясь подтверждения каждого:
+        до window сообщений ждут ack одновременно. В DLQ уходят только
+        вернувшиеся и отклонённые брокером; исключение наружу не бросается.
+        Возвращает по флагу на событие: False — не доставлено, стоит повторить.
+        """
+        if not self.is_connected:
+            await self.connect()
+
+        events = list(events)
+        outcomes = [False] * len(events)
+
+        async def record(index: int, on_confirm, result: Any):
+            outcomes[index] = await on_confirm(result)
+
+        tracker = ConfirmTracker(window or rabbitmq_settings.confirm_window)
+        for index, event in enumerate(events):
+            key = routing_key or RabbitMQPublisher._class_name_to_routing_key(event)
+            prepared = await self._prepare(event, key)
+            if prepared is None:
+                outcomes[index] = True  # уже в DLQ, повторять нечего
+                continue
+            payload, message_body, schema_version = prepared
+            await tracker.submit(
+                self._send(message_body, key, schema_version),
+                partial(record, index, partial(self._on_confirm, event, key, payload)),
+            )
+        await tracker.wait()
+        return outcomes
+
+    def metrics(self) -> dict:
+        return {
+            "published": self.published,
+            "sent_to_dlq": self.sent_to_dlq,
+            "failed": self.failed,
+        }
@@ -0,0 +1,206 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import pika
+from pika.adapters.blocking_connection import BlockingChannel, BlockingConnection
+
+from src.infrastructure.rabbit_and_celery.message_broker.config import (
+    DELAY_EXCHANGE,
+    DELAY_HEADER,
+    DLQ_QUEUE,
+    DLX_EXCHANGE,
+    delay_queue_arguments,
+    delay_queue_name,
+    rabbitmq_settings,
+)
+
+# Топология объявляется один раз на процесс, дальше — только пассивная проверка
+_topology_declared = False
+_topology_lock = threading.Lock()
+
+
+def declare_topology(channel: BlockingChannel):
+    """Объявляет exchange, очередь с DLX, DLX и DLQ, очереди задержки"""
+    exchange = rabbitmq_settings.exchange_name
+    queue_name = rabbitmq_settings.queue_name
+
+    # Объявляем основной exchange
+    channel.exchange_declare(exchange=exchange, exchange_type="topic", durable=True)
+    print(f"[✓] Exchange '{exchange}' готов")
+
+    # Объявляем основную очередь с DLX
+    channel.queue_declare(
+        queue=queue_name,
+        durable=True,
+        arguments={
+            "x-dead-letter-exchange": DLX_EXCHANGE,
+            "x-dead-letter-routing-key": DLQ_QUEUE,  # Можно использовать общий ключ
+        },
+    )
+    channel.queue_bind(
+        exchange=exchange,
+        queue=queue_name,
+        routing_key=rabbitmq_settings.routing_key,
+    )
+    print(f"[✓] Очередь '{queue_name}' привязана к '{rabbitmq_settings.routing_key}'")
+
+    # === Настраиваем DLX и DLQ ===
+    channel.exchange_declare(exchange=DLX_EXCHANGE, exchange_type="topic", durable=True)
+    channel.queue_declare(queue=DLQ_QUEUE, durable=True)
+    channel.queue_bind(
+        exchange=DLX_EXCHANGE,
+        queue=DLQ_QUEUE,
+        routing_key=DLQ_QUEUE,  # Простой ключ: dlq.cat_events_queue
+    )
+    print(f"[✓] DLX '{DLX_EXCHANGE}' и DLQ '{DLQ_QUEUE}' настроены")
+
+    # === Очереди задержки ===
+    channel.exchange_declare(exchange=DELAY_EXCHANGE, exchange_type="headers", durable=True)
+    for delay_ms in rabbitmq_settings.delay_queues_ms:
+        channel.queue_declare(
+            queue=delay_queue_name(delay_ms),
+            durable=True,
+            arguments=delay_queue_arguments(delay_ms),
+        )
+        channel.queue_bind(
+            exchange=DELAY_EXCHANGE,
+            queue=delay_queue_name(delay_ms),
+            arguments={"x-match": "all", DELAY_HEADER: delay_ms},
+        )
+    print(f"[✓] Очереди задержки {rabbitmq_settings.delay_queues_ms} мс настроены")
+
+
+def ensure_topology(channel: BlockingChannel):
+    global _topology_declared
+    if _topology_declared:
+        # Пассивная проверка не меняет брокер и падает, если exchange удалили
+        channel.exchange_declare(exchange=rabbitmq_settings.exchange_name, passive=True)
+        return
+    with _topology_lock:
+        if not _topology_declared:
+            declare_topology(channel)
+            _topology_declared = True
+
+
+class ChannelPool:
+    """
+    Потокобезопасный пул пар (BlockingConnection, канал).
+    Канал выдаётся одному потоку на время with-блока, confirm-режим
+    включается один раз при создании канала, топология — один раз на процесс.
+    """
+
+    def __init__(
+        self,
+        max_size: int = rabbitmq_settings.channel_pool_size,
+        timeout: float = rabbitmq_settings.channel_pool_timeout,
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle: "queue.LifoQueue[Tuple[BlockingConnection, BlockingChannel]]" = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def _create(self) -> Tuple[BlockingConnection, BlockingChannel]:
+        credentials = pika.PlainCredentials(rabbitmq_settings.username, rabbitmq_settings.password)
+        parameters = pika.ConnectionParameters(
+            host=rabbitmq_settings.host,
+            port=rabbitmq_settings.port,
+            virtual_host="/",
+            credentials=credentials,
+            connection_attempts=1,
+            socket_timeout=rabbitmq_settings.connect_timeout,
+            stack_timeout=rabbitmq_settings.connect_timeout * 2,
+        )
+        connection = pika.BlockingConnection(parameters)
+        try:
+            channel = connection.channel()
+            channel.confirm_delivery()
+            ensure_topology(channel)
+        except Exception:
+            connection.close()
+            raise
+        return connection, channel
+
+    @staticmethod
+    def _alive(pair: Tuple[BlockingConnection, BlockingChannel]) -> bool:
+        connection, channel = pair
+        if not (connection.is_open and channel.is_open):
+            return False
+        try:
+            # Обрабатываем накопившиеся heartbeat'ы простаивавшего соединения
+            connection.process_data_events(time_limit=0)
+        except Exception:
+            return False
+        return connection.is_open and channel.is_open
+
+    def _take(self) -> Tuple[BlockingConnection, BlockingChannel]:
+        while True:
+            try:
+                pair = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._alive(pair):
+                return pair
+            self._discard(pair)
+
+        with self.lock:
+            can_create = self.created < self.max_size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+
+        # Пул исчерпан — ждём, пока другой поток вернёт канал
+        try:
+            pair = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("Нет свободного канала RabbitMQ в пуле")
+        if self._alive(pair):
+            return pair
+        self._discard(pair)
+        return self._take()
+
+    def _discard(self, pair: Optional[Tuple[BlockingConnection, BlockingChannel]]):
+        with self.lock:
+            self.created -= 1
+        try:
+            if pair[0].is_open:
+                pair[0].close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def acquire(self) -> Iterator[BlockingChannel]:
+        pair = self._take()
+        try:
+            yield pair[1]
+        except (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError):
+            # Соединение или канал испорчены — в пул не возвращаем
+            self._discard(pair)
+            raise
+        except BaseException:
+            if self._alive(pair):
+                self.idle.put(pair)
+            else:
+                self._discard(pair)
+            raise
+        else:
+            self.idle.put(pair)
+
+    def close(self):
+        while True:
+            try:
+                pair = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(pair)
+
+
+channel_pool = ChannelPool()
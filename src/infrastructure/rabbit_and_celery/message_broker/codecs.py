@@ -0,0 +1,119 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import msgpack
+
+from src.domain.events.registry import EVENTS_BY_CLASS, EVENTS_BY_TYPE
+from src.infrastructure.rabbit_and_celery.message_broker.config import rabbitmq_settings
+
+SCHEMA_VERSION_HEADER = "x-schema-version"
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _epoch_us(value: datetime) -> int:
+    # Наивные datetime в проекте — это UTC (datetime.utcnow); целые микросекунды без потерь
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class JsonCodec:
+    """JSON, как раньше: время — ISO-строки"""
+
+    content_type = "application/json"
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return json.dumps(payload, default=self._default).encode("utf-8")
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return json.loads(body)
+
+
+class MsgpackCodec:
+    """msgpack: компактнее и быстрее JSON, время — целые микросекунды от эпохи"""
+
+    content_type = "application/msgpack"
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return _epoch_us(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return msgpack.packb(payload, default=self._default)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(body)
+
+
+CODECS = {"json": JsonCodec(), "msgpack": MsgpackCodec()}
+CODECS_BY_CONTENT_TYPE = {codec.content_type: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str = rabbitmq_settings.event_codec):
+    return CODECS[name]
+
+
+def codec_for_content_type(content_type: Optional[str]):
+    """Кодек по content_type сообщения; без content_type считаем, что это JSON"""
+    if not content_type:
+        return CODECS["json"]
+    try:
+        return CODECS_BY_CONTENT_TYPE[content_type]
+    except KeyError:
+        raise ValueError(f"Неизвестный content_type события: {content_type}")
+
+
+def payload_text(payload: Dict[str, Any]) -> str:
+    """Читаемый текст payload для DLQ и логов независимо от кодека"""
+    return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def event_payload(event: Any) -> Tuple[Dict[str, Any], int]:
+    """
+    Payload события и версия его схемы. Зарегистрированные события отдают
+    datetime как есть (to_payload) — формат времени выбирает кодек.
+    """
+    spec = EVENTS_BY_CLASS.get(type(event))
+    if spec is not None:
+        return event.to_payload(), spec.schema_version
+    if hasattr(event, "to_payload"):
+        # Сохранённое событие (outbox, спул) со своей версией схемы
+        return event.to_payload(), event.schema_version
+    payload = event.to_dict()
+    spec = EVENTS_BY_TYPE.get(payload.get("event_type"))
+    return payload, spec.schema_version if spec is not None else 1
+
+
+async def decode_event(msg, original_decoder=None) -> Dict[str, Any]:
+    """Декодер для FastStream: выбирает кодек по content_type сообщения"""
+    payload = codec_for_content_type(msg.content_type).decode(msg.body)
+    version = int((msg.headers or {}).get(SCHEMA_VERSION_HEADER, 1))
+    spec = EVENTS_BY_TYPE.get(payload.get("event_type"))
+    if spec is not None and version > spec.schema_version:
+        raise ValueError(
+            f"Версия схемы {payload.get('event_type')} v{version} новее поддерживаемой v{spec.schema_version}"
+        )
+    return payload
+
+
+async def decode_dead_letter(msg, original_decoder=None) -> str:
+    """
+    Декодер для мертвой очереди: читаемый текст любого сообщения.
+    Туда попадают и события в формате кодека (JSON/msgpack), и текст от
+    _send_to_dlq — падать на разборе нельзя, у DLQ нет своей мертвой очереди
+    """
+    try:
+        return payload_text(codec_for_content_type(msg.content_type).decode(msg.body))
+    except Exception:
+        return msg.body.decode("utf-8", errors="replace")
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,8 +12,83 @@ class RabbitMQSettings(BaseSettings):
     queue_name: str = "cat_queue"
     routing_key: str = "cat.*"
 
+    # Реализация publisher: blocking (pika) или aio (aio-pika, без потоков)
+    publisher_backend: str = "blocking"
+
+    # Очередь исходящих событий внутри процесса
+    outbound_queue_size: int = 10000
+    outbound_enqueue_timeout: float = 0.05  # сколько запрос ждёт места в полной очереди
+    outbound_drain_timeout: float = 10.0  # сколько досылать очередь при остановке
+
+    # Пул соединений/каналов blocking-publisher
+    channel_pool_size: int = 8
+    channel_pool_timeout: float = 5.0  # сколько ждать свободный канал
+
+    # Формат тела событий: json или msgpack (консьюмер различает их по content_type)
+    event_codec: str = "json"
+
+    # Сколько публикаций может ждать подтверждения брокера одновременно (publish_many)
+    confirm_window: int = 256
+
+    # Пока брокер недоступен, события копятся в спуле на диске
+    connect_timeout: float = 2.0  # таймаут подключения pika, секунды
+    spool_dir: str = "./spool/events"
+    spool_segment_bytes: int = 8 * 1024 * 1024
+    spool_max_bytes: int = 512 * 1024 * 1024  # старые сегменты сверх лимита удаляются
+
+    # Консьюмер: сколько сообщений брокер выдаёт без ack и сколько обрабатывается одновременно
+    consumer_prefetch: int = 64
+    consumer_concurrency: int = 16
+    # Пачки: consumer_batch_size > 1 включает режим пачек — обработчик получает
+    # до batch_size сообщений или ждёт не дольше batch_timeout_ms и подтверждает их вместе
+    consumer_batch_size: int = 0
+    consumer_batch_timeout_ms: int = 20
+
+    # Отложенная доставка средствами брокера: по очереди-накопителю с x-message-ttl
+    # на каждую задержку (мс); по истечении TTL сообщение возвращается в основной exchange
+    delay_queues_ms: List[int] = [2000]
+
+    # Circuit breaker перед RabbitMQ
+    breaker_failure_threshold: int = 3
+    breaker_reset_timeout: float = 10.0
+
+    @property
+    def url(self) -> str:
+        return f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
+
     class Config:
         env_prefix = "RABBITMQ_"
 
 
 rabbitmq_settings = RabbitMQSettings()
+
+# Имена для DLX и DLQ
+DLX_EXCHANGE = "dlx.cat.events"  # Dead-Letter Exchange
+DLQ_QUEUE = f"dlq.{rabbitmq_settings.queue_name}"  # Мертвая очередь
+
+# Отложенная доставка: headers-exchange раскладывает сообщения по очередям-накопителям
+# по заголовку DELAY_HEADER, а они по TTL возвращают их в основной exchange
+# с исходным routing key
+DELAY_EXCHANGE = f"{rabbitmq_settings.exchange_name}.delay"
+DELAY_HEADER = "x-delay-ms"
+
+
+def delay_queue_name(delay_ms: int) -> str:
+    return f"{DELAY_EXCHANGE}.{delay_ms}ms"
+
+
+def delay_queue_arguments(delay_ms: int) -> Dict[str, object]:
+    return {
+        "x-message-ttl": delay_ms,
+        "x-dead-letter-exchange": rabbitmq_settings.exchange_name,
+    }
+
+
+def delay_ms_for(delay_seconds: float) -> int:
+    """Задержка в мс; допустимы только задержки из RABBITMQ_DELAY_QUEUES_MS"""
+    delay_ms = round(delay_seconds * 1000)
+    if delay_ms not in rabbitmq_settings.delay_queues_ms:
+        raise ValueError(
+            f"Нет очереди задержки на {delay_ms} мс, доступны: {rabbitmq_settings.delay_queues_ms}"
+        )
+    return delay_ms
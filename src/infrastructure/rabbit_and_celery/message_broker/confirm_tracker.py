@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Set
+
+
+class ConfirmTracker:
+    """
+    Окно публикаций, ожидающих подтверждения брокера.
+    Сообщения отправляются, не дожидаясь ack предыдущих: одновременно
+    в полёте не больше window штук, результат каждого (Ack, Nack или
+    исключение) передаётся в on_confirm по мере прихода.
+    """
+
+    def __init__(self, window: int):
+        self.window = max(1, window)
+        self.slots = asyncio.Semaphore(self.window)
+        self.in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, publish: Awaitable, on_confirm: Callable[[Any], Awaitable]):
+        """Ждёт свободного места в окне и отправляет публикацию"""
+        await self.slots.acquire()
+        task = asyncio.ensure_future(self._track(publish, on_confirm))
+        self.in_flight.add(task)
+        task.add_done_callback(self.in_flight.discard)
+
+    async def _track(self, publish: Awaitable, on_confirm: Callable[[Any], Awaitable]):
+        try:
+            try:
+                result = await publish
+            except Exception as e:
+                result = e
+            await on_confirm(result)
+        finally:
+            self.slots.release()
+
+    async def wait(self):
+        """Дожидается подтверждений всех отправленных сообщений"""
+        if self.in_flight:
+            await asyncio.gather(*list(self.in_flight))
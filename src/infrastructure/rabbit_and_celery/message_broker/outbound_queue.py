@@ -0,0 +1,165 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, List, Optional, Tuple
+
+from src.domain.repositories.event_repository import AbstractEventPublisher
+from src.infrastructure.rabbit_and_celery.message_broker.config import rabbitmq_settings
+from src.for_logs.logging_config import setup_logger
+
+app_logger = setup_logger()
+
+
+class OutboundEventQueue:
+    """
+    Очередь исходящих событий внутри процесса.
+    Миддлвэйр только кладёт событие в asyncio.Queue, а отдельная задача
+    забирает всё накопившееся (до batch_size) и отдаёт пачкой в publish_many:
+    асинхронный publisher вызывается прямо в loop, блокирующий — в выделенном
+    потоке, так что event loop не ждёт брокера.
+    """
+
+    def __init__(
+        self,
+        publisher: AbstractEventPublisher,
+        maxsize: int = rabbitmq_settings.outbound_queue_size,
+        enqueue_timeout: float = rabbitmq_settings.outbound_enqueue_timeout,
+        drain_timeout: float = rabbitmq_settings.outbound_drain_timeout,
+        batch_size: int = rabbitmq_settings.confirm_window,
+    ):
+        self.publisher = publisher
+        self.maxsize = maxsize
+        self.enqueue_timeout = enqueue_timeout
+        self.drain_timeout = drain_timeout
+        self.batch_size = max(1, batch_size)
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        # pika.BlockingConnection не потокобезопасен — публикуем всегда из одного потока
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.accepting = False
+
+        # Метрики
+        self.enqueued = 0
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def start(self):
+        if self.worker is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rabbit-publisher")
+        self.worker = asyncio.create_task(self._run(), name="outbound-event-publisher")
+        self.accepting = True
+
+    async def enqueue(self, event: Any, routing_key: Optional[str] = None) -> bool:
+        """
+        Ставит событие в очередь. Если очередь полна, ждёт не дольше
+        enqueue_timeout (backpressure на запрос) и затем отбрасывает событие.
+        """
+        if self.worker is None:
+            await self.start()
+        if not self.accepting:
+            self.dropped += 1
+            return False
+
+        try:
+            self.queue.put_nowait((event, routing_key))
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(
+                    self.queue.put((event, routing_key)), timeout=self.enqueue_timeout
+                )
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                app_logger.warning(
+                    logger_class=self.__class__.__name__,
+                    event="OutboundQueueFull",
+                    message="Очередь исходящих событий переполнена, событие отброшено",
+                    params={"event_type": type(event).__name__, **self.metrics()},
+                )
+                return False
+
+        self.enqueued += 1
+        return True
+
+    async def _call(self, method, *args):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    async def _publish_batch(self, batch: List[Tuple[Any, Optional[str]]]):
+        if len(batch) == 1 or not hasattr(self.publisher, "publish_many"):
+            for event, routing_key in batch:
+                try:
+                    await self._call(self.publisher.publish, event, routing_key)
+                    self.published += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"[OutboundQueue] Ошибка публикации: {e}")
+            return
+
+        # Подряд идущие события с одним routing_key — одной пачкой, порядок сохраняется
+        for routing_key, group in groupby(batch, key=itemgetter(1)):
+            events = [event for event, _ in group]
+            try:
+                outcomes = await self._call(self.publisher.publish_many, events, routing_key)
+            except Exception as e:
+                self.failed += len(events)
+                print(f"[OutboundQueue] Ошибка публикации пачки: {e}")
+                continue
+            delivered = sum(outcomes)
+            self.published += delivered
+            self.failed += len(outcomes) - delivered
+            if delivered < len(outcomes):
+                print(f"[OutboundQueue] Не доставлено событий: {len(outcomes) - delivered} из {len(outcomes)}")
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._publish_batch(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def stop(self):
+        """Перестаёт принимать события и досылает очередь (не дольше drain_timeout)"""
+        if self.worker is None:
+            return
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            app_logger.warning(
+                logger_class=self.__class__.__name__,
+                event="OutboundQueueDrainTimeout",
+                message="Не все события отправлены до остановки",
+                params=self.metrics(),
+            )
+
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+        self.executor.shutdown(wait=True)
+        # Сам publisher общий и отключается в register_events последним из его пользователей
+
+    def metrics(self) -> dict:
+        return {
+            "depth": self.queue.qsize() if self.queue is not None else 0,
+            "maxsize": self.maxsize,
+            "enqueued": self.enqueued,
+            "published": self.published,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
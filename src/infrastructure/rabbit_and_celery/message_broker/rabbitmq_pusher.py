@@ -1,85 +1,69 @@
-import json
 import pika
 import re
-from typing import Any
+from typing import Any, Iterable, List, Optional
 from datetime import datetime
+from functools import lru_cache
 
+from src.domain.events.registry import routing_key_for
 from src.domain.repositories.event_repository import AbstractEventPublisher
-from src.infrastructure.rabbit_and_celery.message_broker.config import rabbitmq_settings
+from src.infrastructure.rabbit_and_celery.message_broker.config import (
+    DELAY_EXCHANGE,
+    DELAY_HEADER,
+    DLQ_QUEUE,
+    DLX_EXCHANGE,
+    delay_ms_for,
+    rabbitmq_settings,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.codecs import (
+    SCHEMA_VERSION_HEADER,
+    event_payload,
+    get_codec,
+    payload_text,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.channel_pool import (
+    ChannelPool,
+    channel_pool,
+)
 from src.for_logs.logging_config import setup_logger
 from src.application.exceptions.exceptions import AppError
 
 app_logger = setup_logger()
 
-# Имена для DLX и DLQ
-DLX_EXCHANGE = "dlx.cat.events"  # Dead-Letter Exchange
-DLQ_QUEUE = f"dlq.{rabbitmq_settings.queue_name}"  # Мертвая очередь
+
+@lru_cache(maxsize=None)
+def _routing_key_from_class_name(event_class: type) -> str:
+    """Ключ для событий вне реестра: CatCreatedEvent -> cat.created (один раз на класс)"""
+    name = event_class.__name__
+    if name.endswith("Event"):
+        name = name[:-5]
+    parts = re.findall(r"[A-Z][a-z]*", name)
+    return ".".join(p.lower() for p in parts)
 
 
 class RabbitMQPublisher(AbstractEventPublisher):
-    def __init__(self):
-        self.connection = None
-        self.channel = None
+    """
+    Blocking-publisher на pika. Соединения и каналы берутся из общего пула:
+    confirm-режим и топология настраиваются при создании канала,
+    так что публикация события — это один basic_publish.
+    """
+
+    def __init__(self, pool: ChannelPool = channel_pool):
+        self.pool = pool
         self.exchange = rabbitmq_settings.exchange_name
         self.queue_name = rabbitmq_settings.queue_name
         self.routing_key = rabbitmq_settings.routing_key
+        self.codec = get_codec()
+
+        # Метрики
+        self.published = 0
+        self.sent_to_dlq = 0
+        self.failed = 0
 
     def connect(self):
-        """Подключение и настройка exchange, очереди и DLQ"""
+        """Проверяет, что пул может выдать канал (соединение и топология готовы)"""
         try:
-            credentials = pika.PlainCredentials(
-                rabbitmq_settings.username, rabbitmq_settings.password
-            )
-            parameters = pika.ConnectionParameters(
-                host=rabbitmq_settings.host,
-                port=rabbitmq_settings.port,
-                virtual_host="/",
-                credentials=credentials,
-            )
-            self.connection = pika.BlockingConnection(parameters)
-            self.channel = self.connection.channel()
-
-            # Объявляем основной exchange
-            self.channel.exchange_declare(
-                exchange=self.exchange,
-                exchange_type="topic",
-                durable=True,
-            )
-            print(f"[✓] Exchange '{self.exchange}' готов")
-
-            # Объявляем основную очередь с DLX
-            self.channel.queue_declare(
-                queue=self.queue_name,
-                durable=True,
-                arguments={
-                    "x-dead-letter-exchange": DLX_EXCHANGE,
-                    "x-dead-letter-routing-key": DLQ_QUEUE,  # Можно использовать общий ключ
-                },
-            )
-            self.channel.queue_bind(
-                exchange=self.exchange,
-                queue=self.queue_name,
-                routing_key=self.routing_key,
-            )
-            print(f"[✓] Очередь '{self.queue_name}' привязана к '{self.routing_key}'")
-
-            # === Настраиваем DLX и DLQ ===
-            self.channel.exchange_declare(
-                exchange=DLX_EXCHANGE,
-                exchange_type="topic",
-                durable=True,
-            )
-            self.channel.queue_declare(
-                queue=DLQ_QUEUE,
-                durable=True,
-            )
-            self.channel.queue_bind(
-                exchange=DLX_EXCHANGE,
-                queue=DLQ_QUEUE,
-                routing_key=DLQ_QUEUE,  # Простой ключ: dlq.cat_events_queue
-            )
-            print(f"[✓] DLX '{DLX_EXCHANGE}' и DLQ '{DLQ_QUEUE}' настроены")
-
+            with self.pool.acquire():
+                pass
         except Exception as e:
             app_logger.error(
                 logger_class=self.__class__.__name__,
@@ -92,14 +76,14 @@ class RabbitMQPublisher(AbstractEventPublisher):
             raise
 
     def disconnect(self):
+        """Закрывает соединения пула (вызывается при остановке приложения)"""
         try:
-            if self.connection and self.connection.is_open:
-                self.connection.close()
-                app_logger.info(
-                    logger_class=self.__class__.__name__,
-                    event="Disconnected",
-                    message="RabbitMQ connection closed",
-                )
+            self.pool.close()
+            app_logger.info(
+                logger_class=self.__class__.__name__,
+                event="Disconnected",
+                message="RabbitMQ connections closed",
+            )
         except Exception as e:
             app_logger.error(
                 logger_class=self.__class__.__name__,
@@ -112,32 +96,27 @@ class RabbitMQPublisher(AbstractEventPublisher):
 
     @staticmethod
     def _class_name_to_routing_key(event: Any) -> str:
-        name = event.__class__.__name__
-        if name.endswith("Event"):
-            name = name[:-5]
-        parts = re.findall(r"[A-Z][a-z]*", name)
-        return ".".join(p.lower() for p in parts)
+        # Зарегистрированные события знают свой ключ заранее
+        return routing_key_for(event) or _routing_key_from_class_name(type(event))
 
     def _send_to_dlq(self, bad_payload: str, error_reason: str, original_routing_key: str):
         """Отправляет 'битое' сообщение в мертвую очередь как строку"""
-        if not self.channel or not self.connection or self.connection.is_closed:
-            self.connect()
-
         try:
-            self.channel.basic_publish(
-                exchange=DLX_EXCHANGE,
-                routing_key=DLQ_QUEUE,
-                body=bad_payload,  # как строка
-                properties=pika.BasicProperties(
-                    content_type="text/plain",
-                    delivery_mode=2,
-                    headers={
-                        "x-error-reason": error_reason,
-                        "original-routing-key": original_routing_key,
-                        "timestamp": datetime.now().isoformat(),
-                    },
-                ),
-            )
+            with self.pool.acquire() as channel:
+                channel.basic_publish(
+                    exchange=DLX_EXCHANGE,
+                    routing_key=DLQ_QUEUE,
+                    body=bad_payload,  # как строка
+                    properties=pika.BasicProperties(
+                        content_type="text/plain",
+                        delivery_mode=2,
+                        headers={
+                            "x-error-reason": error_reason,
+                            "original-routing-key": original_routing_key,
+                            "timestamp": datetime.now().isoformat(),
+                        },
+                    ),
+                )
             app_logger.warning(
                 logger_class=self.__class__.__name__,
                 event="SentToDLQ",
@@ -151,7 +130,7 @@ class RabbitMQPublisher(AbstractEventPublisher):
                 },
             )
         except Exception as e:
-            app_logger.critical(
+            app_logger.error(
                 logger_class=self.__class__.__name__,
                 event="DLQSendFailed",
                 message="Не удалось отправить в DLQ",
@@ -160,14 +139,22 @@ class RabbitMQPublisher(AbstractEventPublisher):
             )
 
     def publish(self, event, routing_key=None):
+        self._publish(event, routing_key, self.exchange, {})
+
+    def publish_delayed(self, event: Any, delay_seconds: float, routing_key: Optional[str] = None):
+        """
+        Публикует событие через очередь задержки: брокер доставит его в основной
+        exchange с тем же routing_key через delay_seconds. Задержка должна быть
+        одной из RABBITMQ_DELAY_QUEUES_MS.
+        """
+        delay_ms = delay_ms_for(delay_seconds)
+        self._publish(event, routing_key, DELAY_EXCHANGE, {DELAY_HEADER: delay_ms})
+
+    def _publish(self, event: Any, routing_key: Optional[str], exchange: str, headers: dict):
         # Автоматически генерируем routing_key, если не передан
         if routing_key is None:
             routing_key = self._class_name_to_routing_key(event)
 
-        # Проверка соединения
-        if not self.channel or self.connection is None or self.connection.is_closed:
-            self.connect()
-
         try:
             # Проверяем, что у события есть to_dict
             if not hasattr(event, "to_dict") or not callable(getattr(event, "to_dict")):
@@ -183,44 +170,59 @@ class RabbitMQPublisher(AbstractEventPublisher):
                     message="Event must have .to_dict()",
                     params={"event_type": type(event).__name__, "value": raw_repr},
                 )
+                self.sent_to_dlq += 1
                 return  # Не кидаем исключение, просто в DLQ
 
             # Сериализуем
-            payload = event.to_dict()
-            message_body = json.dumps(payload, default=str)
+            payload, schema_version = event_payload(event)
+            message_body = self.codec.encode(payload)
 
-            # Включаем подтверждение доставки
-            self.channel.confirm_delivery()
+            # Канал уже в confirm-режиме: basic_publish дождётся ack от брокера
+            with self.pool.acquire() as channel:
+                channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=message_body,
+                    properties=pika.BasicProperties(
+                        content_type=self.codec.content_type,
+                        delivery_mode=2,  # Устойчивое сообщение
+                        headers={SCHEMA_VERSION_HEADER: schema_version, **headers},
+                    ),
+                    mandatory=True,  # Чтобы сработало return, если некуда маршрутизировать
+                )
+            self.published += 1
 
-            # Отправляем
-            confirmation = self.channel.basic_publish(
-                exchange=self.exchange,
-                routing_key=routing_key,
-                body=message_body,
-                properties=pika.BasicProperties(
-                    content_type="application/json",
-                    delivery_mode=2,  # Устойчивое сообщение
-                ),
-                mandatory=True,  # Чтобы сработало return, если некуда маршрутизировать
+            app_logger.info(
+                logger_class=self.__class__.__name__,
+                event="EventPublished",
+                message=f"Published {event.__class__.__name__}",
+                params={"routing_key": routing_key, "payload": payload, **headers},
             )
 
-            if confirmation is None:
-                app_logger.info(
-                    logger_class=self.__class__.__name__,
-                    event="EventPublished",
-                    message=f"Published {event.__class__.__name__}",
-                    params={"routing_key": routing_key, "payload": payload},
-                )
-            else:
-                # Сообщение не было доставлено (например, нет привязки)
-                self._send_to_dlq(
-                    bad_payload=message_body,
-                    error_reason=f"Unroutable message (Nack from broker): {confirmation}",
-                    original_routing_key=routing_key,
-                )
+        except (pika.exceptions.UnroutableError, pika.exceptions.NackError) as e:
+            # Сообщение не было доставлено (например, нет привязки или nack)
+            self.sent_to_dlq += 1
+            self._send_to_dlq(
+                bad_payload=payload_text(payload),
+                error_reason=f"Unroutable message (Nack from broker): {e}",
+                original_routing_key=routing_key,
+            )
+
+        except pika.exceptions.AMQPConnectionError as e:
+            # Брокер недоступен: DLQ на том же брокере тоже не ответит, повторное подключение не пробуем
+            self.failed += 1
+            app_logger.error(
+                logger_class=self.__class__.__name__,
+                event="BrokerUnavailable",
+                message="RabbitMQ недоступен",
+                summary=str(e),
+                params={"event_type": type(event).__name__, "routing_key": routing_key},
+            )
+            raise AppError(f"Failed to publish event: {e!r}") from e
 
         except TypeError as e:
             # Ошибки сериализации JSON
+            self.sent_to_dlq += 1
             bad_payload = repr(event)
             self._send_to_dlq(
                 bad_payload=bad_payload,
@@ -235,19 +237,9 @@ class RabbitMQPublisher(AbstractEventPublisher):
             )
 
         except Exception as e:
-            # Любая другая ошибка (сеть, брокер и т.д.)
-            bad_payload = getattr(event, "__dict__", {}) if hasattr(event, "__dict__") else repr(event)
-            try:
-                bad_str = json.dumps(bad_payload, default=str)
-            except:
-                bad_str = str(bad_payload)
-
-            self._send_to_dlq(
-                bad_payload=bad_str,
-                error_reason=f"Unexpected error in publish: {type(e).__name__}: {str(e)}",
-                original_routing_key=routing_key,
-            )
-
+            # Любая другая ошибка (сеть, брокер и т.д.): событие повторят (outbox),
+            # поэтому в DLQ не отправляем — только логируем
+            self.failed += 1
             app_logger.error(
                 logger_class=self.__class__.__name__,
                 event="PublishFailed",
@@ -257,6 +249,40 @@ class RabbitMQPublisher(AbstractEventPublisher):
             )
             raise AppError(f"Failed to publish event: {e}") from e
 
+    def publish_many(self, events: Iterable[Any], routing_key: Optional[str] = None) -> List[bool]:
+        """
+        Публикует пачку событий. BlockingChannel pika ждёт подтверждение
+        каждого basic_publish, поэтому окна здесь нет — сообщения идут
+        по очереди. Конвейерные подтверждения — у aio-backend.
+        Возвращает по флагу на событие: False — не доставлено, стоит повторить.
+        После первой неудачи остаток пачки не отправляется, чтобы не ждать
+        таймаут подключения на каждом событии и не нарушать порядок.
+        """
+        events = list(events)
+        outcomes = []
+        for event in events:
+            try:
+                self.publish(event, routing_key)
+            except AppError:
+                break
+            outcomes.append(True)
+        return outcomes + [False] * (len(events) - len(outcomes))
+
+    def metrics(self) -> dict:
+        return {
+            "published": self.published,
+            "sent_to_dlq": self.sent_to_dlq,
+            "failed": self.failed,
+        }
+
+
+def get_rabbit_publisher() -> AbstractEventPublisher:
+    """Publisher по настройке RABBITMQ_PUBLISHER_BACKEND: blocking (pika) или aio (aio-pika)"""
+    if rabbitmq_settings.publisher_backend == "aio":
+        # Импорт внутри: модуль aio-publisher сам импортирует этот модуль
+        from src.infrastructure.rabbit_and_celery.message_broker.aio_rabbitmq_pusher import (
+            AioRabbitMQPublisher,
+        )
 
-def get_rabbit_publisher() -> RabbitMQPublisher:
-    return RabbitMQPublisher()
\ No newline at end of file
+        return AioRabbitMQPublisher()
+    return RabbitMQPublisher()
@@ -0,0 +1,246 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.domain.events.registry import payload_from_dict
+from src.domain.repositories.event_repository import AbstractEventPublisher
+from src.infrastructure.rabbit_and_celery.message_broker.config import rabbitmq_settings
+from src.infrastructure.rabbit_and_celery.message_broker.rabbitmq_pusher import (
+    RabbitMQPublisher,
+    get_rabbit_publisher,
+)
+from src.utils.circuit_breaker.circuit_breaker import CircuitBreaker
+from src.utils.spool.spool import DiskSpool
+from src.for_logs.logging_config import setup_logger
+from src.application.exceptions.exceptions import AppError
+
+app_logger = setup_logger()
+
+
+class SpooledEvent:
+    """Событие, прочитанное из спула: to_dict отдаёт сохранённый payload, to_payload — с datetime"""
+
+    __slots__ = ("payload", "schema_version")
+
+    def __init__(self, payload: Dict[str, Any], schema_version: int = 1):
+        self.payload = payload
+        self.schema_version = schema_version
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.payload
+
+    def to_payload(self) -> Dict[str, Any]:
+        return payload_from_dict(self.payload)
+
+
+class ResilientPublisher(AbstractEventPublisher):
+    """
+    Обёртка над publisher с circuit breaker и спулом на диске.
+    Пока брокер недоступен, breaker разомкнут и события сразу дописываются
+    в спул, без попыток подключиться. Когда breaker пропускает пробу, сначала
+    переотправляется спул — по порядку и пачками, — и только потом новые события.
+    Все методы асинхронные; блокирующий publisher вызывается в отдельном потоке.
+    """
+
+    def __init__(
+        self,
+        publisher: AbstractEventPublisher,
+        spool: DiskSpool = None,
+        breaker: CircuitBreaker = None,
+    ):
+        self.publisher = publisher
+        # Спул создаётся при первой записи, чтобы импорт модуля не трогал диск
+        self.spool = spool
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=rabbitmq_settings.breaker_failure_threshold,
+            reset_timeout=rabbitmq_settings.breaker_reset_timeout,
+        )
+        self.spool_pending: Optional[bool] = None
+        # Поток создаётся при первом вызове и закрывается в disconnect
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Спул и новые события не должны обгонять друг друга
+        self.lock = asyncio.Lock()
+
+        # Метрики
+        self.spooled = 0
+        self.replayed = 0
+        self.short_circuited = 0
+
+    def _get_spool(self) -> DiskSpool:
+        if self.spool is None:
+            self.spool = DiskSpool(
+                rabbitmq_settings.spool_dir,
+                prefix="events",
+                segment_bytes=rabbitmq_settings.spool_segment_bytes,
+                max_bytes=rabbitmq_settings.spool_max_bytes,
+            )
+        return self.spool
+
+    async def _call(self, method, *args):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rabbit-publisher")
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    async def connect(self):
+        """Не роняет старт приложения: недоступный брокер просто размыкает breaker"""
+        try:
+            await self._call(self.publisher.connect)
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"[ResilientPublisher] RabbitMQ недоступен при подключении: {e}")
+
+    async def disconnect(self):
+        await self._call(self.publisher.disconnect)
+        if self.spool is not None:
+            self.spool.seal()
+        executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def stop(self):
+        """
+        Publisher общий для очереди исходящих событий и OutboxRelay, поэтому
+        отключается только он сам — в register_events после всех, кто им пользуется
+        """
+        await self.disconnect()
+
+    async def publish(self, event: Any, routing_key: Optional[str] = None):
+        await self.publish_many([event], routing_key)
+
+    async def publish_delayed(
+        self, event: Any, delay_seconds: float, routing_key: Optional[str] = None
+    ):
+        """
+        Отложенная публикация через очереди задержки брокера. В спул не пишется:
+        при переотправке задержка потерялась бы, поэтому ошибка уходит вызывающему.
+        """
+        if not self.breaker.allow_request():
+            self.short_circuited += 1
+            raise AppError("RabbitMQ недоступен: circuit breaker разомкнут")
+        try:
+            await self._call(self.publisher.publish_delayed, event, delay_seconds, routing_key)
+        except AppError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+
+    async def publish_many(
+        self, events: Iterable[Any], routing_key: Optional[str] = None, spool: bool = True
+    ) -> List[bool]:
+        """
+        Публикует события или кладёт их в спул. Возвращает по флагу на событие:
+        True — доставлено брокеру или сохранено в спул, False — потеряно.
+        spool=False — для тех, кто сам хранит события до подтверждения (outbox):
+        True только для подтверждённых брокером, остальные — False, без записи в спул.
+        """
+        events = list(events)
+        async with self.lock:
+            if not self.breaker.allow_request():
+                self.short_circuited += len(events)
+                return self._spool(events, routing_key) if spool else [False] * len(events)
+
+            if not await self._replay():
+                return self._spool(events, routing_key) if spool else [False] * len(events)
+
+            try:
+                outcomes = await self._call(self.publisher.publish_many, events, routing_key)
+            except Exception as e:
+                print(f"[ResilientPublisher] Ошибка публикации: {e}")
+                outcomes = [False] * len(events)
+
+            if all(outcomes):
+                self.breaker.record_success()
+                return outcomes
+
+            self.breaker.record_failure()
+            if not spool:
+                return outcomes
+            undelivered = [event for event, delivered in zip(events, outcomes) if not delivered]
+            saved = iter(self._spool(undelivered, routing_key))
+            return [delivered or next(saved) for delivered in outcomes]
+
+    def _spool(self, events: List[Any], routing_key: Optional[str]) -> List[bool]:
+        records = []
+        outcomes = []
+        for event in events:
+            try:
+                records.append(
+                    {
+                        "routing_key": routing_key
+                        or RabbitMQPublisher._class_name_to_routing_key(event),
+                        "payload": event.to_dict(),
+                        "schema_version": getattr(event, "schema_version", 1),
+                    }
+                )
+                outcomes.append(True)
+            except Exception as e:
+                print(f"[ResilientPublisher] Событие нельзя сохранить в спул: {e}")
+                outcomes.append(False)
+
+        try:
+            self.spooled += self._get_spool().append(records)
+            self.spool_pending = True
+        except Exception as e:
+            print(f"[ResilientPublisher] Не удалось записать {len(records)} событий в спул: {e}")
+            return [False] * len(events)
+        return outcomes
+
+    async def _replay(self) -> bool:
+        """Переотправляет спул по сегментам; True — спул пуст и можно публиковать новое"""
+        if self.spool_pending is None:
+            self.spool_pending = self._get_spool().has_pending()
+        if not self.spool_pending:
+            return True
+
+        spool = self._get_spool()
+        spool.seal()
+        for segment in spool.sealed_segments():
+            records = spool.read(segment)
+            # Подряд идущие записи с одним routing_key — одним publish_many
+            for key, group in groupby(records, key=lambda r: r["routing_key"]):
+                group_events = [
+                    SpooledEvent(record["payload"], record.get("schema_version", 1)) for record in group
+                ]
+                try:
+                    outcomes = await self._call(self.publisher.publish_many, group_events, key)
+                except Exception as e:
+                    print(f"[ResilientPublisher] Ошибка публикации: {e}")
+                    outcomes = [False]
+                if not all(outcomes):
+                    # Сегмент останется на диске и будет отправлен целиком позже
+                    self.breaker.record_failure()
+                    app_logger.warning(
+                        logger_class=self.__class__.__name__,
+                        event="SpoolReplayFailed",
+                        message="Не удалось переотправить спул событий",
+                        params=self.metrics(),
+                    )
+                    return False
+                self.breaker.record_success()
+                self.replayed += len(group_events)
+            spool.remove(segment)
+
+        self.spool_pending = False
+        app_logger.info(
+            logger_class=self.__class__.__name__,
+            event="SpoolReplayed",
+            message="Спул событий переотправлен",
+            params=self.metrics(),
+        )
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            "breaker_state": self.breaker.state,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "short_circuited": self.short_circuited,
+            "spool_bytes": self.spool.pending_bytes() if self.spool is not None else 0,
+        }
+
+
+event_publisher = ResilientPublisher(get_rabbit_publisher())
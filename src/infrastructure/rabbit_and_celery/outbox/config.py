@@ -0,0 +1,16 @@
+from pydantic_settings import BaseSettings
+
+
+class OutboxSettings(BaseSettings):
+    batch_size: int = 256  # сколько строк outbox публикуется за проход
+    poll_interval: float = 0.2  # пауза, когда outbox пуст или breaker разомкнут
+    max_backoff: float = 30.0  # предел паузы после неудачных проходов (растёт вдвое с каждым)
+    retention_seconds: int = 86400  # сколько хранить отправленные строки
+    purge_interval: float = 60.0  # как часто удалять старые отправленные строки
+    stop_timeout: float = 10.0  # сколько ждать текущую пачку при остановке
+
+    class Config:
+        env_prefix = "OUTBOX_"
+
+
+outbox_settings = OutboxSettings()
@@ -0,0 +1,214 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import groupby
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+
+from src.domain.events.registry import payload_from_dict
+from src.domain.repositories.event_repository import AbstractEventPublisher
+from src.infrastructure.database.database import SessionLocal
+from src.infrastructure.database.models.model import OutboxModel
+from src.infrastructure.rabbit_and_celery.message_broker.resilient_publisher import (
+    ResilientPublisher,
+    event_publisher,
+)
+from src.infrastructure.rabbit_and_celery.outbox.config import outbox_settings
+from src.utils.circuit_breaker.circuit_breaker import CircuitBreaker
+from src.for_logs.logging_config import setup_logger
+
+app_logger = setup_logger()
+
+
+class OutboxMessage:
+    """
+    Строка outbox в виде события для publisher: to_dict отдаёт сохранённый payload,
+    to_payload — его же с datetime-объектами, чтобы кодек выбрал формат времени сам
+    """
+
+    __slots__ = ("id", "event_type", "routing_key", "payload", "schema_version")
+
+    def __init__(self, row: OutboxModel):
+        self.id = row.id
+        self.event_type = row.event_type
+        self.routing_key = row.routing_key
+        self.payload = json.loads(row.payload)
+        self.schema_version = row.schema_version
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.payload
+
+    def to_payload(self) -> Dict[str, Any]:
+        return payload_from_dict(self.payload)
+
+    def __repr__(self) -> str:
+        return f"OutboxMessage(id={self.id}, event_type={self.event_type})"
+
+
+class OutboxRelay:
+    """
+    Фоновая задача, которая переносит события из таблицы outbox в RabbitMQ.
+    Читает неотправленные строки пачками по порядку id, публикует через
+    publish_many с подтверждениями и отмечает sent_at. Недоставленные строки
+    остаются в outbox и уходят на следующем проходе (at-least-once). Пока breaker
+    publisher'а разомкнут, проходы пропускаются без чтения outbox; после неудачного
+    прохода пауза растёт вдвое до max_backoff.
+    """
+
+    def __init__(
+        self,
+        publisher: AbstractEventPublisher,
+        batch_size: int = outbox_settings.batch_size,
+        poll_interval: float = outbox_settings.poll_interval,
+        max_backoff: float = outbox_settings.max_backoff,
+    ):
+        self.publisher = publisher
+        # Источник правды — сам outbox: при разомкнутом breaker события не уходят в спул,
+        # строки остаются без sent_at до подтверждения брокера
+        if isinstance(publisher, ResilientPublisher):
+            self.publish_many = partial(publisher.publish_many, spool=False)
+            self.breaker: Optional[CircuitBreaker] = publisher.breaker
+        else:
+            self.publish_many = publisher.publish_many
+            self.breaker = None
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.delay = poll_interval
+
+        self.worker: Optional[asyncio.Task] = None
+        # SQLite и blocking-publisher — в одном выделенном потоке
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.running = False
+        self.last_purge = monotonic()
+
+        # Метрики
+        self.sent = 0
+        self.retried = 0
+        self.skipped = 0
+
+    async def start(self):
+        if self.worker is not None:
+            return
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox-relay")
+        self.running = True
+        self.worker = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def _call(self, method, *args):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    def _fetch(self) -> List[OutboxMessage]:
+        with SessionLocal() as db:
+            rows = db.scalars(
+                select(OutboxModel)
+                .where(OutboxModel.sent_at.is_(None))
+                .order_by(OutboxModel.id)
+                .limit(self.batch_size)
+            ).all()
+            return [OutboxMessage(row) for row in rows]
+
+    def _mark(self, sent_ids: List[int], failed_ids: List[int]):
+        with SessionLocal() as db:
+            if sent_ids:
+                db.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_(sent_ids))
+                    .values(sent_at=datetime.utcnow(), attempts=OutboxModel.attempts + 1)
+                )
+            if failed_ids:
+                db.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_(failed_ids))
+                    .values(attempts=OutboxModel.attempts + 1)
+                )
+            db.commit()
+
+    def _purge(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=outbox_settings.retention_seconds)
+        with SessionLocal() as db:
+            db.execute(delete(OutboxModel).where(OutboxModel.sent_at < cutoff))
+            db.commit()
+
+    async def relay_once(self) -> bool:
+        """Публикует одну пачку; True — пачка полная и доставлена, можно сразу брать следующую"""
+        if self.breaker is not None and self.breaker.is_refusing:
+            # Брокер заведомо недоступен: не читаем outbox и не считаем попытку
+            self.skipped += 1
+            return False
+
+        messages = await self._call(self._fetch)
+        if not messages:
+            return False
+
+        sent_ids: List[int] = []
+        failed_ids: List[int] = []
+        # Подряд идущие строки с одним routing_key — одним publish_many
+        for routing_key, group in groupby(messages, key=lambda m: m.routing_key):
+            group = list(group)
+            try:
+                outcomes = await self._call(self.publish_many, group, routing_key)
+            except Exception as e:
+                print(f"[OutboxRelay] Ошибка публикации пачки: {e}")
+                outcomes = [False] * len(group)
+            for message, delivered in zip(group, outcomes):
+                (sent_ids if delivered else failed_ids).append(message.id)
+            if failed_ids:
+                # Остаток пачки не трогаем, чтобы события не обгоняли недоставленные
+                break
+
+        await self._call(self._mark, sent_ids, failed_ids)
+        self.sent += len(sent_ids)
+        self.retried += len(failed_ids)
+        self.delay = min(self.delay * 2, self.max_backoff) if failed_ids else self.poll_interval
+        if failed_ids:
+            app_logger.warning(
+                logger_class=self.__class__.__name__,
+                event="OutboxRetry",
+                message="Часть событий outbox не доставлена, повтор на следующем проходе",
+                params={"failed": len(failed_ids), **self.metrics()},
+            )
+        return not failed_ids and len(messages) == self.batch_size
+
+    async def _run(self):
+        while self.running:
+            try:
+                more = await self.relay_once()
+            except Exception as e:
+                print(f"[OutboxRelay] Ошибка: {e}")
+                self.delay = min(self.delay * 2, self.max_backoff)
+                more = False
+            if not more:
+                if monotonic() - self.last_purge > outbox_settings.purge_interval:
+                    self.last_purge = monotonic()
+                    await self._call(self._purge)
+                await asyncio.sleep(self.delay)
+
+    async def stop(self):
+        """Даёт дослать текущую пачку и останавливает задачу"""
+        if self.worker is None:
+            return
+        self.running = False
+        try:
+            await asyncio.wait_for(self.worker, timeout=outbox_settings.stop_timeout)
+        except asyncio.TimeoutError:
+            pass  # wait_for уже отменил задачу; строки без sent_at уйдут после рестарта
+        self.worker = None
+        self.executor.shutdown(wait=True)
+        # Сам publisher общий и отключается в register_events последним из его пользователей
+
+    def metrics(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "skipped": self.skipped,
+            "delay": self.delay,
+        }
+
+
+outbox_relay = OutboxRelay(event_publisher)
@@ -1,13 +1,20 @@
 from fastapi import FastAPI
 
 from src.consumer.consumer import Consumer
-from src.infrastructure.database.database import Base, engine
-from src.infrastructure.api.routes.routes import router
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.database import Base, dispose_async_engine, engine, upgrade_schema
+from src.infrastructure.database.group_commit import db_writer
+from src.infrastructure.api.routes import async_routes, routes
 from src.for_logs.middleware_logging import LoggingMiddleware
 from src.infrastructure.rabbit_and_celery.handler.rac_handler import (
-    event_handler_middleware,
+    EventHandlerMiddleware,
+    outbound_queue,
 )
 from src.infrastructure.rabbit_and_celery.init_rac import initialization
+from src.infrastructure.rabbit_and_celery.message_broker.resilient_publisher import (
+    event_publisher,
+)
+from src.infrastructure.rabbit_and_celery.outbox.relay import outbox_relay
 from src.infrastructure.rabbit_and_celery.scheduler.scheduler import (
     start_scheduler,
 )
@@ -17,16 +24,21 @@ from src.infrastructure.rabbit_and_celery.utils.register_events import (
 
 app = FastAPI()
 
-app.include_router(router)
-app.middleware("http")(event_handler_middleware)
+# DATABASE_ASYNC_MODE=true — async-роуты на aiosqlite вместо синхронных в threadpool
+app.include_router(async_routes.router if database_settings.async_mode else routes.router)
+app.add_middleware(EventHandlerMiddleware)
 app.add_middleware(LoggingMiddleware)
 initialization()
 start_scheduler()
 
 consumer = Consumer()
 
-register_events(app, consumer)
+# Остановка в обратном порядке: очередь событий и outbox дописываются, затем
+# отключается их общий publisher, последним — писатель БД
+register_events(app, db_writer, event_publisher, consumer, outbox_relay, outbound_queue)
+app.add_event_handler("shutdown", dispose_async_engine)
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
 consumer.start()
 
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Set
+
+
+class MessageBatcher:
+    """
+    Собирает сообщения в пачки: пачка уходит в handler, как только набралось
+    size сообщений или прошло timeout секунд с первого сообщения в ней.
+    add() ждёт обработки своей пачки, поэтому консьюмер подтверждает все
+    сообщения пачки разом, сразу после handler. Одновременно обрабатывается
+    не больше concurrency пачек.
+
+    handler(items) может вернуть список результатов по одному на сообщение:
+    исключение в нём проваливает только своё сообщение, а не всю пачку.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Any],
+        size: int = 32,
+        timeout: float = 0.05,
+        concurrency: int = 1,
+    ):
+        self.handler = handler
+        self.size = size
+        self.timeout = timeout
+        self.concurrency = concurrency
+
+        self.items: List[Any] = []
+        self.waiters: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+        # Метрики
+        self.batches = 0
+        self.messages = 0
+        self.by_size = 0
+        self.by_timeout = 0
+        self.failed = 0
+
+    async def add(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.concurrency)
+
+        waiter = loop.create_future()
+        self.items.append(item)
+        self.waiters.append(waiter)
+        if len(self.items) >= self.size:
+            self.by_size += 1
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.timeout, self._flush_by_timeout)
+        return await waiter
+
+    def _flush_by_timeout(self):
+        self.timer = None
+        self.by_timeout += 1
+        self._flush()
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        items, waiters = self.items, self.waiters
+        self.items, self.waiters = [], []
+        if items:
+            task = asyncio.create_task(self._run(items, waiters))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, items: List[Any], waiters: List[asyncio.Future]):
+        async with self.slots:
+            try:
+                results = self.handler(items)
+                if asyncio.iscoroutine(results):
+                    results = await results
+            except Exception as e:
+                results = [e] * len(items)
+            if results is None:
+                results = [None] * len(items)
+
+        self.batches += 1
+        self.messages += len(items)
+        for waiter, result in zip(waiters, results):
+            if waiter.done():
+                continue
+            if isinstance(result, Exception):
+                self.failed += 1
+                waiter.set_exception(result)
+            else:
+                waiter.set_result(result)
+
+    async def stop(self):
+        """Отдаёт в обработку неполную пачку и дожидается всех пачек"""
+        self._flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "avg_batch": round(self.messages / self.batches, 1) if self.batches else 0,
+            "by_size": self.by_size,
+            "by_timeout": self.by_timeout,
+            "failed": self.failed,
+            "waiting": len(self.items),
+        }
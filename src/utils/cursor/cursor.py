@@ -0,0 +1,20 @@
+import base64
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """Непрозрачный курсор keyset-пагинации: id последней отданной записи"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """id из курсора encode_cursor; ValueError, если курсор испорчен"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except Exception as e:
+        raise ValueError(f"Некорректный курсор: {cursor}") from e
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError(f"Некорректный курсор: {cursor}")
+    return last_id
@@ -1,3 +1,4 @@
+import inspect
 from functools import wraps
 from fastapi import HTTPException
 
@@ -7,78 +8,90 @@ from src.application.exceptions.exceptions import (
     DatabaseError,
 )
 from src.for_logs.logging_config import setup_logger
+from src.for_logs.error_reporting import report_error
 
 app_logger = setup_logger()
 
 
+def _to_http_exception(e: Exception) -> HTTPException:
+    if isinstance(e, NotFoundError):
+        return HTTPException(
+            status_code=404,
+            detail={
+                "error": "NotFoundError",
+                "message": str(e),
+                "details": getattr(e, "details", {}),
+            },
+        )
+    elif isinstance(e, ValidationError):
+        return HTTPException(
+            status_code=422,
+            detail={
+                "error": "ValidationError",
+                "message": str(e),
+                "details": getattr(e, "details", {}),
+            },
+        )
+    elif isinstance(e, DatabaseError):
+        return HTTPException(
+            status_code=503,
+            detail={
+                "error": "DatabaseError",
+                "message": str(e),
+                "details": getattr(e, "details", {}),
+            },
+        )
+    else:
+        return HTTPException(
+            status_code=500,
+            detail={"error": "ServerError", "message": str(e)},
+        )
+
+
 def log_service(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        service = kwargs.get("service") or args[0] if len(args) > 0 else None
+    def before_call(args, kwargs) -> str:
+        service = kwargs.get("service") or (args[0] if len(args) > 0 else None)
         service_name = service.__class__.__name__ if service else "UnknownService"
 
         app_logger.info(
             logger_class="Route",
             event=func.__name__,
             message=f"Вызов метода {func.__name__}",
-            params={"kwargs": kwargs},
+            # Сам сервис в лог не кладём — это объект, а не параметр вызова
+            params={"kwargs": {k: v for k, v in kwargs.items() if k != "service"}},
         )
+        return service_name
 
+    def on_error(e: Exception, service_name: str) -> HTTPException:
+        # Единственный документ об ошибке: контекст сервиса уже на исключении,
+        # аргументы роута (включая сам сервис) в лог не выгружаем
+        report_error(
+            app_logger,
+            e,
+            logger_class="Route",
+            params={"route": func.__name__, "service": service_name},
+        )
+        return _to_http_exception(e)
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            service_name = before_call(args, kwargs)
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                raise on_error(e, service_name)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        service_name = before_call(args, kwargs)
         try:
             result = func(*args, **kwargs)
             return result
         except Exception as e:
-            err_class = getattr(e, "ErrClass", service_name)
-            err_method = getattr(e, "ErrMethod", func.__name__)
-
-            summary = f"Ошибка в {err_class}.{err_method}: {str(e)}"
-
-            app_logger.warning(
-                logger_class="Route",
-                event="ServerError",
-                message=str(e),
-                summary=summary,
-                params={
-                    "error_type": e.__class__.__name__,
-                    "error_message": str(e),
-                    "args": args,
-                    "kwargs": kwargs,
-                },
-                ErrClass=err_class,
-                ErrMethod=err_method,
-            )
-
-            if isinstance(e, NotFoundError):
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "error": "NotFoundError",
-                        "message": str(e),
-                        "details": getattr(e, "details", {}),
-                    },
-                )
-            elif isinstance(e, ValidationError):
-                raise HTTPException(
-                    status_code=422,
-                    detail={
-                        "error": "ValidationError",
-                        "message": str(e),
-                        "details": getattr(e, "details", {}),
-                    },
-                )
-            elif isinstance(e, DatabaseError):
-                raise HTTPException(
-                    status_code=503,
-                    detail={
-                        "error": "DatabaseError",
-                        "message": str(e),
-                        "details": getattr(e, "details", {}),
-                    },
-                )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail={"error": "ServerError", "message": str(e)},
-                )
+            raise on_error(e, service_name)
 
     return wrapper
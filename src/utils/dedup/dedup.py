@@ -0,0 +1,166 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MemoryDedupStore:
+    """
+    id обработанных событий в памяти процесса. Записи живут ttl секунд,
+    больше max_size не хранится: самые старые вытесняются первыми.
+    Порядок OrderedDict совпадает с порядком времени, поэтому вытеснение — O(1) с головы.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_size: int = 100_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, float]" = OrderedDict()
+
+        # Метрики
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def contains(self, event_id: str) -> bool:
+        seen_at = self.entries.get(event_id)
+        if seen_at is not None and time.monotonic() - seen_at < self.ttl:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, event_id: str):
+        now = time.monotonic()
+        self.entries[event_id] = now
+        self.entries.move_to_end(event_id)
+        while self.entries:
+            oldest = next(iter(self.entries.values()))
+            if now - oldest < self.ttl and len(self.entries) <= self.max_size:
+                break
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    # Асинхронный интерфейс для консьюмера: в памяти ввода-вывода нет, вызов прямой
+
+    async def seen(self, event_id: str) -> bool:
+        return self.contains(event_id)
+
+    async def mark(self, event_id: str):
+        self.add(event_id)
+
+    def close(self):
+        self.entries.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+class SqliteDedupStore:
+    """
+    id обработанных событий в SQLite: переживают рестарт консьюмера.
+    Просроченные по ttl и лишние сверх max_size записи чистятся
+    раз в purge_every добавлений, а не на каждом сообщении.
+    Консьюмер вызывает seen/mark: запросы к файлу идут в отдельном потоке,
+    а не в event loop.
+    """
+
+    def __init__(
+        self,
+        path: str = "./consumer_dedup.db",
+        ttl: float = 3600.0,
+        max_size: int = 100_000,
+        purge_every: int = 1000,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.purge_every = purge_every
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS processed_events ("
+            "event_id TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_processed_events_seen_at ON processed_events (seen_at)"
+        )
+        self.added = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dedup-sqlite")
+
+        # Метрики
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def contains(self, event_id: str) -> bool:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM processed_events WHERE event_id = ? AND seen_at > ?",
+                (event_id, time.time() - self.ttl),
+            ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, event_id: str):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO processed_events (event_id, seen_at) VALUES (?, ?)",
+                (event_id, time.time()),
+            )
+            self.added += 1
+            if self.added % self.purge_every == 0:
+                self._purge()
+
+    def _purge(self):
+        cursor = self.connection.execute(
+            "DELETE FROM processed_events WHERE seen_at <= ?", (time.time() - self.ttl,)
+        )
+        self.evicted += cursor.rowcount
+        (size,) = self.connection.execute("SELECT COUNT(*) FROM processed_events").fetchone()
+        if size > self.max_size:
+            cursor = self.connection.execute(
+                "DELETE FROM processed_events WHERE event_id IN ("
+                "SELECT event_id FROM processed_events ORDER BY seen_at LIMIT ?)",
+                (size - self.max_size,),
+            )
+            self.evicted += cursor.rowcount
+
+    async def seen(self, event_id: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.contains, event_id)
+
+    async def mark(self, event_id: str):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.add, event_id)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            self.connection.close()
+
+    def metrics(self) -> dict:
+        with self.lock:
+            (size,) = self.connection.execute("SELECT COUNT(*) FROM processed_events").fetchone()
+        return {
+            "backend": "sqlite",
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+def get_dedup_store(backend: str, ttl: float, max_size: int, path: str):
+    if backend == "sqlite":
+        return SqliteDedupStore(path, ttl=ttl, max_size=max_size)
+    return MemoryDedupStore(ttl=ttl, max_size=max_size)
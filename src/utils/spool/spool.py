@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class DiskSpool:
+    """
+    Append-only спул на локальном диске в формате NDJSON.
+    Записи дописываются в текущий сегмент, при достижении segment_bytes
+    сегмент закрывается и начинается новый. Закрытые сегменты читаются
+    и удаляются целиком в порядке записи.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "segment",
+        segment_bytes: int = 8 * 1024 * 1024,
+        max_bytes: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = self._list_segments()
+        self.next_seq = self._seq(existing[-1]) + 1 if existing else 1
+        self.current: Optional[Path] = None
+        self.current_file = None
+        self.current_size = 0
+
+        # Счётчики для диагностики
+        self.written = 0
+        self.dropped_segments = 0
+
+    # === Запись ===
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        return self.append_lines(
+            json.dumps(record, default=str, ensure_ascii=False).encode("utf-8")
+            for record in records
+        )
+
+    def append_lines(self, lines: Iterable[bytes]) -> int:
+        data = b"".join(line + b"\n" for line in lines)
+        if not data:
+            return 0
+
+        with self.lock:
+            if self.current_file is None:
+                self._open_segment()
+            self.current_file.write(data)
+            self.current_file.flush()
+            self.current_size += len(data)
+            written = data.count(b"\n")
+            self.written += written
+
+            if self.current_size >= self.segment_bytes:
+                self._close_segment()
+            self._enforce_limit()
+        return written
+
+    def seal(self):
+        """Закрывает текущий сегмент, чтобы он стал доступен для чтения"""
+        with self.lock:
+            self._close_segment()
+
+    # === Чтение ===
+
+    def sealed_segments(self) -> List[Path]:
+        with self.lock:
+            return [s for s in self._list_segments() if s != self.current]
+
+    def read(self, segment: Path) -> List[Dict[str, Any]]:
+        return [json.loads(line) for line in self.read_lines(segment)]
+
+    @staticmethod
+    def read_lines(segment: Path) -> List[bytes]:
+        with open(segment, "rb") as f:
+            return [line.rstrip(b"\n") for line in f if line.strip()]
+
+    def remove(self, segment: Path):
+        with self.lock:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    def has_pending(self) -> bool:
+        with self.lock:
+            return bool(self._list_segments())
+
+    def pending_bytes(self) -> int:
+        with self.lock:
+            return sum(s.stat().st_size for s in self._list_segments())
+
+    # === Внутреннее ===
+
+    def _list_segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{self.prefix}-*.ndjson"), key=self._seq)
+
+    @staticmethod
+    def _seq(segment: Path) -> int:
+        return int(segment.stem.rsplit("-", 1)[1])
+
+    def _open_segment(self):
+        self.current = self.directory / f"{self.prefix}-{self.next_seq:012d}.ndjson"
+        self.next_seq += 1
+        self.current_file = open(self.current, "ab")
+        self.current_size = 0
+
+    def _close_segment(self):
+        if self.current_file is not None:
+            self.current_file.flush()
+            os.fsync(self.current_file.fileno())
+            self.current_file.close()
+        self.current_file = None
+        self.current = None
+        self.current_size = 0
+
+    def _enforce_limit(self):
+        """Если спул превысил max_bytes — выбрасываем самые старые закрытые сегменты"""
+        if self.max_bytes is None:
+            return
+        segments = self._list_segments()
+        total = sum(s.stat().st_size for s in segments)
+        for segment in segments:
+            if total <= self.max_bytes or segment == self.current:
+                break
+            total -= segment.stat().st_size
+            segment.unlink()
+            self.dropped_segments += 1
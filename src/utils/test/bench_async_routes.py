@@ -0,0 +1,123 @@
+# bench_async_routes.py
+# req/sec и p99 на чтении котов: синхронные роуты (Session в threadpool Starlette, ~40 потоков)
+# против async-роутов на AsyncCatRepository (aiosqlite). Сервер и сеть не нужны:
+# запросы подаются прямо в ASGI-приложение, миддлвэйры не подключаются.
+# Запуск: python -m src.utils.test.bench_async_routes
+
+import asyncio
+import logging
+import os
+import tempfile
+from time import perf_counter
+
+# База лежит по относительному пути ./animal.db — уходим во временную папку
+os.chdir(tempfile.mkdtemp(prefix="koshki_bench_"))
+
+from fastapi import FastAPI  # noqa: E402
+
+from src.infrastructure.api.routes import async_routes, routes  # noqa: E402
+from src.infrastructure.database.database import (  # noqa: E402
+    Base,
+    SessionLocal,
+    dispose_async_engine,
+    engine,
+)
+from src.infrastructure.database.models.model import CatModel  # noqa: E402
+
+REQUESTS = 2000
+CATS = 100
+
+
+class SinkHandler(logging.Handler):
+    """Логи только сериализуются — Elasticsearch в замере не участвует"""
+
+    def emit(self, record):
+        str(record.msg)
+
+
+def build_app(router) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all(
+        CatModel(name=f"Cat{i}", age=i % 15 + 1, color="Gray", breed="Bengal", breed_id=4)
+        for i in range(CATS)
+    )
+    db.commit()
+    db.close()
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(name: str, app, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = perf_counter()
+            status = await call(app, f"/cats/{i % CATS + 1}")
+            latencies.append(perf_counter() - start)
+            return status
+
+    await asyncio.gather(*(one(i) for i in range(concurrency)))  # прогрев
+    latencies.clear()
+    start = perf_counter()
+    statuses = await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = perf_counter() - start
+    latencies.sort()
+    rate = REQUESTS / elapsed
+    ok = sum(1 for s in statuses if s == 200)
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:<8} одновременно {concurrency:>4}  {rate:>7,.0f} req/sec  p99 {p99:>7.1f} мс  ({ok}/{REQUESTS} OK)")
+    return rate
+
+
+async def main():
+    logging.getLogger("app_logger").handlers = [SinkHandler()]
+    seed()
+    sync_app = build_app(routes.router)
+    async_app = build_app(async_routes.router)
+
+    print(f"📦 {REQUESTS} запросов GET /cats/{{id}}\n")
+    for concurrency in (10, 100, 500):
+        sync_rate = await run("sync", sync_app, concurrency)
+        async_rate = await run("async", async_app, concurrency)
+        print(f"{'':<8} x{async_rate / sync_rate:.2f}\n")
+    await dispose_async_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
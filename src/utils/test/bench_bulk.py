@@ -0,0 +1,56 @@
+# bench_bulk.py
+# Загрузка CATS котов: по одному CatRepository.create (как POST /cats в цикле)
+# против CatRepository.create_many (POST /cats/bulk) — executemany кусками
+# по DATABASE_BULK_CHUNK_SIZE в одной транзакции. Каждый кот — ещё и строка outbox.
+# Запуск: python -m src.utils.test.bench_bulk
+
+import os
+import tempfile
+from time import perf_counter
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.application.dto.dto import CatDTO
+from src.domain.adapter.adapter import CatRepository
+from src.infrastructure.database.config import database_settings
+from src.infrastructure.database.database import Base
+from src.infrastructure.database.models.model import OutboxModel
+from src.infrastructure.database.storage_profile import create_storage_engine
+
+CATS = 5_000
+CAT = CatDTO(id=0, name="Барсик", age=3, color="Grey", breed="Siamese", breed_id=2)
+
+
+def run(name: str, profile: str, bulk: bool) -> float:
+    path = os.path.join(tempfile.mkdtemp(prefix="koshki_bulk_"), "animal.db")
+    engine = create_storage_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        repo = CatRepository(db)
+        start = perf_counter()
+        if bulk:
+            repo.create_many([CAT] * CATS)
+        else:
+            for _ in range(CATS):
+                repo.create(CAT)
+        total = perf_counter() - start
+        events = db.scalar(select(func.count()).select_from(OutboxModel))
+    engine.dispose()
+
+    print(f"{name:<28} {CATS / total:>10,.0f} котов/s  событий в outbox {events}")
+    return CATS / total
+
+
+def main():
+    print(f"📦 {CATS} котов, кусок {database_settings.bulk_chunk_size}\n")
+    for profile in ("wal", "wal_durable"):
+        single = run(f"{profile}: по одному", profile, bulk=False)
+        bulk = run(f"{profile}: create_many", profile, bulk=True)
+        print(f"{'':<28} x{bulk / single:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
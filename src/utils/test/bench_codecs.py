@@ -0,0 +1,93 @@
+# bench_codecs.py
+# Размер тела и скорость кодирования/декодирования событий:
+# прежний путь (json.dumps(to_dict) + fromisoformat в консьюмере) против кодеков JSON и msgpack.
+# Запуск: python -m src.utils.test.bench_codecs
+
+import json
+from datetime import datetime
+from time import perf_counter
+
+from src.domain.events.cat_event import CatCreatedEvent
+from src.domain.events.registry import event_from_dict
+from src.infrastructure.rabbit_and_celery.message_broker.codecs import (
+    event_payload,
+    get_codec,
+)
+
+EVENTS = 50_000
+
+
+def make_events():
+    return [
+        CatCreatedEvent(
+            cat_id=i,
+            name=f"Cat {i}",
+            age=i % 20,
+            color="White",
+            breed="Persian",
+            breed_id=i % 7,
+            created_at=datetime.utcnow(),
+        )
+        for i in range(EVENTS)
+    ]
+
+
+def legacy_encode(event) -> bytes:
+    return json.dumps(event.to_dict(), default=str).encode("utf-8")
+
+
+def legacy_decode(body: bytes):
+    message = json.loads(body)
+    created_at = message["created_at"]
+    if created_at.endswith("Z"):
+        created_at = created_at.replace("Z", "+00:00")
+    return CatCreatedEvent(
+        cat_id=message["cat_id"],
+        name=message["name"],
+        age=message["age"],
+        breed=message["breed"],
+        breed_id=message["breed_id"],
+        color=message["color"],
+        created_at=datetime.fromisoformat(created_at),
+    )
+
+
+def run(name: str, encode, decode, events):
+    start = perf_counter()
+    bodies = [encode(event) for event in events]
+    encode_time = perf_counter() - start
+
+    start = perf_counter()
+    for body in bodies:
+        decode(body)
+    decode_time = perf_counter() - start
+
+    size = sum(len(body) for body in bodies) / len(bodies)
+    print(
+        f"{name:<22} {size:>6.0f} байт  "
+        f"encode {EVENTS / encode_time:>9,.0f}/s  decode {EVENTS / decode_time:>9,.0f}/s"
+    )
+    return size, encode_time + decode_time
+
+
+def main():
+    events = make_events()
+    print(f"📦 {EVENTS} событий CatCreatedEvent\n")
+
+    legacy = run("Прежний JSON", legacy_encode, legacy_decode, events)
+    results = {}
+    for name in ("json", "msgpack"):
+        codec = get_codec(name)
+        results[name] = run(
+            f"Кодек {name}",
+            lambda event, codec=codec: codec.encode(event_payload(event)[0]),
+            lambda body, codec=codec: event_from_dict(codec.decode(body)),
+            events,
+        )
+
+    size, total = results["msgpack"]
+    print(f"\n⚡ msgpack против прежнего JSON: тело x{legacy[0] / size:.2f} меньше, CPU x{legacy[1] / total:.2f} быстрее")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_consumer.py
+# Пропускная способность и задержка консьюмера FastStream на брокере в памяти (TestRabbitBroker):
+# по одному сообщению (как раньше), с prefetch и параллельными обработчиками, пачками.
+# Обработчик имитирует ввод-вывод: IO_COST на вызов (запрос в БД, сеть) плюс ITEM_COST на сообщение,
+# поэтому пачка платит IO_COST один раз. prefetch имитируется числом сообщений в полёте.
+# Сам TestRabbitBroker тратит ~2-5 мс CPU на сообщение (mock-объекты), это потолок замера.
+# Запуск: python -m src.utils.test.bench_consumer
+
+import asyncio
+from time import perf_counter
+from typing import Dict, List
+
+from faststream.rabbit import RabbitBroker, RabbitQueue, TestRabbitBroker
+
+from src.utils.batcher.batcher import MessageBatcher
+
+MESSAGES = 1_000
+IO_COST = 0.02
+ITEM_COST = 0.00002
+
+
+async def run(name: str, prefetch: int, concurrency: int, batch_size: int = 0, batch_timeout: float = 0.02):
+    broker = RabbitBroker(logger=None)
+    queue = RabbitQueue("bench_queue")
+    slots = asyncio.Semaphore(concurrency)
+
+    async def handle_batch(messages: List[Dict]):
+        await asyncio.sleep(IO_COST + ITEM_COST * len(messages))
+
+    batcher = MessageBatcher(handle_batch, size=batch_size, timeout=batch_timeout, concurrency=concurrency)
+
+    if batch_size > 1:
+        @broker.subscriber(queue)
+        async def consume(message: Dict):
+            await batcher.add(message)
+    else:
+        @broker.subscriber(queue)
+        async def consume(message: Dict):
+            async with slots:
+                await asyncio.sleep(IO_COST + ITEM_COST)
+
+    in_flight = asyncio.Semaphore(prefetch)
+    latencies = []
+
+    async with TestRabbitBroker(broker) as test_broker:
+        async def deliver(i: int):
+            async with in_flight:
+                start = perf_counter()
+                await test_broker.publish({"cat_id": i}, queue)
+                latencies.append(perf_counter() - start)
+
+        start = perf_counter()
+        await asyncio.gather(*(deliver(i) for i in range(MESSAGES)))
+        total = perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:<34} {MESSAGES / total:>8,.0f} msg/s  p50 {p50:>6.1f} мс  p99 {p99:>6.1f} мс")
+    return MESSAGES / total
+
+
+async def main():
+    print(f"📦 {MESSAGES} сообщений, обработчик {IO_COST * 1000:.0f} мс на вызов\n")
+    legacy = await run("по одному, prefetch=1", prefetch=1, concurrency=1)
+    for prefetch, concurrency in ((16, 4), (64, 16), (256, 64)):
+        await run(f"prefetch={prefetch}, concurrency={concurrency}", prefetch, concurrency)
+    best = 0.0
+    for batch_size, timeout_ms in ((16, 20), (32, 20), (64, 50)):
+        rate = await run(
+            f"пачки {batch_size} / {timeout_ms} мс, prefetch={max(64, batch_size)}",
+            prefetch=max(64, batch_size),
+            concurrency=16,
+            batch_size=batch_size,
+            batch_timeout=timeout_ms / 1000,
+        )
+        best = max(best, rate)
+    print(f"\n⚡ Пачки против обработки по одному: x{best / legacy:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+# bench_dedup.py
+# Шторм повторных доставок: каждое событие приходит REDELIVERIES раз.
+# Без дедупликации каждая доставка обрабатывается целиком (разбор события + HANDLER_COST ввода-вывода),
+# с хранилищем event_id повтор стоит одного поиска.
+# Запуск: python -m src.utils.test.bench_dedup
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+from src.domain.events.cat_event import CatCreatedEvent
+from src.domain.events.registry import event_from_dict
+from src.utils.dedup.dedup import MemoryDedupStore, SqliteDedupStore
+
+EVENTS = 2_000
+REDELIVERIES = 5
+HANDLER_COST = 0.001
+
+
+def make_messages():
+    messages = []
+    for i in range(EVENTS):
+        payload = CatCreatedEvent(
+            cat_id=i, name=f"Cat {i}", age=3, color="White", breed="Persian", breed_id=1,
+            created_at=datetime.utcnow(),
+        ).to_dict()
+        messages.extend([payload] * REDELIVERIES)
+    return messages
+
+
+async def run(name: str, store, messages):
+    processed = 0
+    start = perf_counter()
+    for message in messages:
+        event_id = message["event_id"]
+        if store is not None and await store.seen(event_id):
+            continue
+        event_from_dict(message)
+        await asyncio.sleep(HANDLER_COST)
+        processed += 1
+        if store is not None:
+            await store.mark(event_id)
+    total = perf_counter() - start
+    metrics = store.metrics() if store is not None else {}
+    print(
+        f"{name:<16} {len(messages) / total:>9,.0f} доставок/s  обработано {processed:>6}  "
+        f"hits {metrics.get('hits', 0):>6}  misses {metrics.get('misses', 0):>6}"
+    )
+    return total
+
+
+async def main():
+    messages = make_messages()
+    print(f"📦 {EVENTS} событий x {REDELIVERIES} доставок, обработка {HANDLER_COST * 1000:.0f} мс\n")
+    legacy = await run("Без дедупликации", None, messages)
+    memory = await run("memory", MemoryDedupStore(), messages)
+
+    path = os.path.join(tempfile.mkdtemp(), "dedup.db")
+    sqlite_store = SqliteDedupStore(path)
+    sqlite = await run("sqlite", sqlite_store, messages)
+    sqlite_store.close()
+    os.remove(path)
+
+    print(f"\n⚡ memory x{legacy / memory:.1f}, sqlite x{legacy / sqlite:.1f} быстрее, чем без дедупликации")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+# bench_delay.py
+# Отложенные задачи консьюмера: прежний путь (APScheduler add_job с date-триггером
+# на пул из 5 потоков) против колеса таймеров на asyncio.
+# Замеряется скорость постановки и время, за которое срабатывают все задачи.
+# Запуск: python -m src.utils.test.bench_delay
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from src.utils.timing_wheel.timing_wheel import TimingWheel
+
+TASKS = 20_000
+DELAY = 1.0
+
+
+async def bench_apscheduler() -> float:
+    scheduler = AsyncIOScheduler(executors={"default": ThreadPoolExecutor(5)}, timezone="UTC")
+    scheduler.start()
+    done = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    fired = 0
+
+    def job(payload):
+        nonlocal fired
+        fired += 1
+        if fired == TASKS:
+            loop.call_soon_threadsafe(done.set)
+
+    start = perf_counter()
+    for i in range(TASKS):
+        scheduler.add_job(
+            func=job,
+            trigger="date",
+            run_date=datetime.now(timezone.utc) + timedelta(seconds=DELAY),
+            args=[{"cat_id": i}],
+            id=f"cat_created_delay_{i}",
+            replace_existing=True,
+        )
+    scheduled = perf_counter() - start
+    await done.wait()
+    total = perf_counter() - start
+    scheduler.shutdown(wait=False)
+    print(f"{'APScheduler':<16} постановка {TASKS / scheduled:>10,.0f}/s  все сработали за {total:.2f} с")
+    return scheduled
+
+
+async def bench_wheel() -> float:
+    wheel = TimingWheel()
+    done = asyncio.Event()
+    fired = 0
+
+    def job(payload):
+        nonlocal fired
+        fired += 1
+        if fired == TASKS:
+            done.set()
+
+    start = perf_counter()
+    for i in range(TASKS):
+        await wheel.schedule(DELAY, job, {"cat_id": i}, key=f"cat_created_delay_{i}")
+    scheduled = perf_counter() - start
+    await done.wait()
+    total = perf_counter() - start
+    print(f"{'Колесо таймеров':<16} постановка {TASKS / scheduled:>10,.0f}/s  все сработали за {total:.2f} с")
+    print(f"                 {wheel.metrics()}")
+    await wheel.stop()
+    return scheduled
+
+
+async def check_replace_under_backpressure():
+    """Два schedule с одним key, пока колесо заполнено: срабатывает только последний"""
+    wheel = TimingWheel(tick=0.01, max_pending=1)
+    fired = []
+    await wheel.schedule(0.05, fired.append, "x")
+    first = asyncio.create_task(wheel.schedule(0.05, fired.append, "y1", key="dup"))
+    second = asyncio.create_task(wheel.schedule(0.05, fired.append, "y2", key="dup"))
+    await asyncio.gather(first, second)
+    await asyncio.sleep(0.2)
+    metrics = wheel.metrics()
+    await wheel.stop()
+    assert fired == ["x", "y2"] and metrics["replaced"] == 1, (fired, metrics)
+    print("✓ Замена по key при заполненном колесе: сработал только последний таймер\n")
+
+
+async def main():
+    await check_replace_under_backpressure()
+    print(f"📦 {TASKS} задач с задержкой {DELAY} с\n")
+    legacy = await bench_apscheduler()
+    wheel = await bench_wheel()
+    print(f"\n⚡ Постановка быстрее в x{legacy / wheel:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+# bench_group_commit.py
+# Запись котов из THREADS потоков: каждый запрос коммитит сам (как раньше)
+# против одного потока-писателя с групповым коммитом (group_commit.py).
+# Каждая запись — кот и строка outbox, как в CatRepository.create.
+# Запуск: python -m src.utils.test.bench_group_commit
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from sqlalchemy.orm import sessionmaker
+
+from src.application.dto.dto import CatDTO
+from src.domain.adapter.adapter import CatRepository
+from src.infrastructure.database.database import Base
+from src.infrastructure.database.group_commit import GroupCommitWriter
+from src.infrastructure.database.storage_profile import create_storage_engine
+
+WRITES = 2_000
+CAT = CatDTO(id=0, name="Барсик", age=3, color="Grey", breed="Siamese", breed_id=2)
+
+
+def run(name: str, profile: str, threads: int, group_commit: bool) -> float:
+    path = os.path.join(tempfile.mkdtemp(prefix="koshki_writer_"), "animal.db")
+    engine = create_storage_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    writer = GroupCommitWriter(Session) if group_commit else None
+    errors = 0
+
+    def create(_):
+        db = Session()
+        try:
+            CatRepository(db, writer).create(CAT)
+            return 0
+        except Exception:
+            db.rollback()
+            return 1
+        finally:
+            db.close()
+
+    start = perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        errors = sum(pool.map(create, range(WRITES)))
+    total = perf_counter() - start
+    metrics = writer.metrics() if writer is not None else {}
+    if writer is not None:
+        writer.stop()
+    engine.dispose()
+
+    group = f"  группа в среднем {metrics['avg_group']}" if metrics else ""
+    print(f"{name:<30} потоков {threads:>3}  {WRITES / total:>8,.0f} записей/s  ошибок {errors:>3}{group}")
+    return WRITES / total
+
+
+def main():
+    print(f"📦 {WRITES} записей (кот + outbox)\n")
+    for profile in ("wal", "wal_durable"):
+        for threads in (1, 8, 32):
+            legacy = run(f"{profile}: коммит на запрос", profile, threads, group_commit=False)
+            grouped = run(f"{profile}: групповой коммит", profile, threads, group_commit=True)
+            print(f"{'':<30} x{grouped / legacy:.1f}\n")
+
+
+if __name__ == "__main__":
+    main()
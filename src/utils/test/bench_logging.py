@@ -0,0 +1,103 @@
+# bench_logging.py
+# Микробенчмарк сборки и сериализации лог-документов AppLogger.
+# Запуск: python -m src.utils.test.bench_logging
+
+import inspect
+import json
+import logging
+from datetime import datetime
+from time import perf_counter
+
+from src.for_logs.logging_config import AppLogger
+
+RECORDS = 100_000
+
+PARAMS = {
+    "id": 42,
+    "name": "Fluffy",
+    "age": 2,
+    "color": "White",
+    "breed": "Persian",
+    "breed_id": 1,
+    "created_at": datetime.utcnow(),  # несериализуемое стандартным json
+}
+
+
+class LegacyLogger:
+    """Копия прежнего пути: inspect + json.dumps каждого параметра + json.dumps документа"""
+
+    def _make_log_entry(self, level, logger_class, event, message, params=None):
+        frame = inspect.currentframe()
+        try:
+            outer_frame = frame.f_back.f_back
+            method_name = outer_frame.f_code.co_name
+            self_obj = outer_frame.f_locals.get("self")
+            class_name = self_obj.__class__.__name__ if self_obj else logger_class
+        finally:
+            del frame
+        safe_params = {}
+        for k, v in (params or {}).items():
+            try:
+                json.dumps(v)
+                safe_params[k] = v
+            except TypeError:
+                safe_params[k] = str(v)
+        return {
+            "@timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": level,
+            "logger_class": logger_class,
+            "event": event,
+            "message": message,
+            "summary": "No summary provided",
+            "ErrClass": class_name,
+            "ErrMethod": method_name,
+            "params": safe_params,
+        }
+
+    def info(self, logger_class, event, message, params=None):
+        entry = self._make_log_entry("INFO", logger_class, event, message, params)
+        # Клиент Elasticsearch сериализовал документ ещё раз
+        json.dumps(entry)
+
+
+class SinkHandler(logging.Handler):
+    """Хэндлер-заглушка: только сериализует документ, как это делает ElasticsearchHandler"""
+
+    def emit(self, record):
+        record.msg.encoded
+
+
+def make_fast_logger(level=logging.INFO) -> AppLogger:
+    logger = logging.getLogger("bench_logger")
+    logger.handlers = [SinkHandler()]
+    app_logger = AppLogger("bench_logger")
+    app_logger.logger.setLevel(level)
+    return app_logger
+
+
+class CatService:
+    """Имитирует вызов логгера из метода сервиса"""
+
+    def __init__(self, app_logger):
+        self.app_logger = app_logger
+
+    def reg_new(self):
+        self.app_logger.info("CatService", "CatCreated", "Кошка создана", params=PARAMS)
+
+
+def run(name: str, service: CatService) -> float:
+    start = perf_counter()
+    for _ in range(RECORDS):
+        service.reg_new()
+    elapsed = perf_counter() - start
+    rate = RECORDS / elapsed
+    print(f"{name:<28} {rate:>12,.0f} записей/сек")
+    return rate
+
+
+if __name__ == "__main__":
+    print(f"📦 {RECORDS} записей на прогон\n")
+    legacy = run("Старый путь (inspect+json)", CatService(LegacyLogger()))
+    fast = run("Новый путь (orjson)", CatService(make_fast_logger()))
+    disabled = run("Уровень выключен", CatService(make_fast_logger(logging.ERROR)))
+    print(f"\n⚡ Ускорение: x{fast / legacy:.1f} (x{disabled / legacy:.1f} при выключенном уровне)")
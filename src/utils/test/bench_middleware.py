@@ -0,0 +1,179 @@
+# bench_middleware.py
+# Сравнение req/sec на /cats для старого стека миддлвэйров (BaseHTTPMiddleware +
+# app.middleware("http")) и нового на чистом ASGI. Сервер и сеть не нужны:
+# запросы подаются прямо в ASGI-приложение.
+# Запуск: python -m src.utils.test.bench_middleware
+
+import asyncio
+import logging
+import os
+import tempfile
+from time import perf_counter
+
+# База лежит по относительному пути ./animal.db — уходим во временную папку
+os.chdir(tempfile.mkdtemp(prefix="koshki_bench_"))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from src.for_logs.error_reporting import REQUEST_ID_HEADER, start_request  # noqa: E402
+from src.for_logs.middleware_logging import LoggingMiddleware, app_logger  # noqa: E402
+from src.infrastructure.api.routes.routes import router  # noqa: E402
+from src.infrastructure.database.database import Base, SessionLocal, engine  # noqa: E402
+from src.infrastructure.database.models.model import CatModel  # noqa: E402
+from src.infrastructure.rabbit_and_celery.handler import rac_handler  # noqa: E402
+from src.infrastructure.rabbit_and_celery.handler.rac_handler import (  # noqa: E402
+    EventHandlerMiddleware,
+)
+
+REQUESTS = 3000
+CONCURRENCY = 50
+CATS = 100
+PATHS = ["/cats", "/cats/1", f"/cats/{CATS // 2}"]
+
+
+class SinkHandler(logging.Handler):
+    """Логи только сериализуются — Elasticsearch в замере не участвует"""
+
+    def emit(self, record):
+        str(record.msg)
+
+
+class NullPublisher:
+    """Брокер в замере не участвует"""
+
+    def publish(self, event, routing_key=None):
+        pass
+
+    def disconnect(self):
+        pass
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Копия прежнего LoggingMiddleware на BaseHTTPMiddleware (путь без исключений)"""
+
+    async def dispatch(self, request: Request, call_next):
+        ctx = start_request(request.headers.get(REQUEST_ID_HEADER))
+        app_logger.info(
+            logger_class="LoggingMiddleware",
+            event="IncomingRequest",
+            message="Received HTTP request",
+            params={
+                "method": request.method,
+                "path": request.url.path,
+                "headers": dict(request.headers),
+                "action": request.method,
+            },
+        )
+        response = await call_next(request)
+        response.headers[REQUEST_ID_HEADER] = ctx["request_id"]
+        app_logger.info(
+            logger_class="LoggingMiddleware",
+            event="OutgoingResponse",
+            message="Sent HTTP response",
+            params={
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "action": request.method,
+                "result": response.status_code,
+            },
+        )
+        return response
+
+
+async def legacy_event_handler_middleware(request: Request, call_next):
+    response = await call_next(request)
+    service = getattr(request.state, "cat_service", None)
+    if service is not None and getattr(service, "event", None) is not None:
+        rac_handler.publisher.publish(service.event, routing_key="cat.created")
+        service.event = None
+    return response
+
+
+def build_legacy_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.middleware("http")(legacy_event_handler_middleware)
+    app.add_middleware(LegacyLoggingMiddleware)
+    return app
+
+
+def build_asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(EventHandlerMiddleware)
+    app.add_middleware(LoggingMiddleware)
+    return app
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all(
+        CatModel(name=f"Cat{i}", age=i % 15 + 1, color="Gray", breed="Bengal", breed_id=4)
+        for i in range(CATS)
+    )
+    db.commit()
+    db.close()
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(name: str, app) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i):
+        async with semaphore:
+            return await call(app, PATHS[i % len(PATHS)])
+
+    await asyncio.gather(*(one(i) for i in range(CONCURRENCY)))  # прогрев
+    start = perf_counter()
+    statuses = await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    elapsed = perf_counter() - start
+    rate = REQUESTS / elapsed
+    ok = sum(1 for s in statuses if s == 200)
+    print(f"{name:<34} {rate:>8,.0f} req/sec  ({ok}/{REQUESTS} OK)")
+    return rate
+
+
+async def main():
+    logging.getLogger("app_logger").handlers = [SinkHandler()]
+    rac_handler.publisher = NullPublisher()
+    rac_handler.outbound_queue.publisher = rac_handler.publisher
+    seed()
+
+    print(f"📦 {REQUESTS} запросов, {CONCURRENCY} одновременно, пути: {PATHS}\n")
+    legacy = await run("BaseHTTPMiddleware + http-миддлвэйр", build_legacy_app())
+    asgi = await run("Чистый ASGI", build_asgi_app())
+    print(f"\n⚡ Разница: x{asgi / legacy:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+# bench_pagination.py
+# GET /cats на таблице из CATS котов: прежний get_all (вся таблица, CatDTO на строку,
+# сериализация списка) против keyset-страниц get_page — первой, из конца таблицы
+# и с fields=name. Время — сервис плюс сериализация ответа в JSON.
+# Запуск: python -m src.utils.test.bench_pagination
+
+import os
+import tempfile
+from time import perf_counter
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from src.application.dto.dto import CatDTO
+from src.application.services.services import CatService
+from src.domain.adapter.adapter import CatRepository
+from src.infrastructure.database.database import Base
+from src.infrastructure.database.storage_profile import create_storage_engine
+from src.utils.cursor.cursor import encode_cursor
+
+CATS = 100_000
+ROUNDS = 20
+CAT = CatDTO(id=0, name="Барсик", age=3, color="Grey", breed="Siamese", breed_id=2)
+cat_list = TypeAdapter(List[CatDTO])
+
+
+def timed(name: str, call) -> float:
+    call()  # прогрев
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        size = len(call())
+    ms = (perf_counter() - start) / ROUNDS * 1000
+    print(f"{name:<36} {ms:>9.2f} ms  ответ {size / 1024:>9.1f} КБ")
+    return ms
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(prefix="koshki_page_"), "animal.db")
+    engine = create_storage_engine(f"sqlite:///{path}", "wal")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        service = CatService(CatRepository(db))
+        service.repository.create_many([CAT] * CATS)
+        print(f"📦 {CATS} котов, среднее по {ROUNDS} запросам\n")
+
+        full = timed("get_all: вся таблица", lambda: cat_list.dump_json(service.get_all()))
+        first = timed(
+            "get_page: первые 100",
+            lambda: service.get_page(limit=100).model_dump_json(),
+        )
+        timed(
+            "get_page: 100 после id=99 000",
+            lambda: service.get_page(limit=100, after=encode_cursor(99_000)).model_dump_json(),
+        )
+        timed(
+            "get_page: первые 100, fields=name",
+            lambda: service.get_page(limit=100, fields="name").model_dump_json(),
+        )
+        timed(
+            "get_page: первые 1000",
+            lambda: service.get_page(limit=1000).model_dump_json(),
+        )
+        print(f"\n{'':<36} x{full / first:.0f} на первой странице")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
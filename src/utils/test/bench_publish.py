@@ -0,0 +1,86 @@
+# bench_publish.py
+# События в секунду при публикации с подтверждениями: blocking-publisher
+# (ack каждого сообщения по очереди) и aio publish_many с растущим окном.
+# Нужен запущенный RabbitMQ (настройки RABBITMQ_*). Сообщения идут в отдельный
+# временный exchange и очередь, которые удаляются после замера.
+# Запуск: python -m src.utils.test.bench_publish
+
+import asyncio
+import logging
+from time import perf_counter
+
+import aio_pika
+
+from src.infrastructure.rabbit_and_celery.message_broker.aio_rabbitmq_pusher import (
+    AioRabbitMQPublisher,
+)
+from src.infrastructure.rabbit_and_celery.message_broker.rabbitmq_pusher import (
+    RabbitMQPublisher,
+)
+
+EVENTS = 5000
+BLOCKING_EVENTS = 1000
+WINDOWS = [1, 8, 32, 128, 512]
+BENCH_EXCHANGE = "bench_events"
+BENCH_QUEUE = "bench_events_queue"
+ROUTING_KEY = "bench.publish"
+
+
+class SinkHandler(logging.Handler):
+    """Логи в замере не участвуют"""
+
+    def emit(self, record):
+        pass
+
+
+class BenchEvent:
+    def __init__(self, i: int):
+        self.i = i
+
+    def to_dict(self):
+        return {"id": self.i, "name": f"Cat {self.i}", "age": self.i % 20, "color": "White"}
+
+
+def bench_blocking() -> float:
+    publisher = RabbitMQPublisher()
+    publisher.exchange = BENCH_EXCHANGE
+    events = [BenchEvent(i) for i in range(BLOCKING_EVENTS)]
+    start = perf_counter()
+    publisher.publish_many(events, ROUTING_KEY)
+    elapsed = perf_counter() - start
+    publisher.disconnect()
+    rate = BLOCKING_EVENTS / elapsed
+    print(f"{'blocking (ack на каждое)':<26} {rate:>9,.0f} events/sec  {publisher.metrics()}")
+    return rate
+
+
+async def main():
+    logging.getLogger("app_logger").handlers = [SinkHandler()]
+
+    publisher = AioRabbitMQPublisher()
+    await publisher.connect()
+    publisher.exchange = await publisher.channel.declare_exchange(
+        BENCH_EXCHANGE, aio_pika.ExchangeType.TOPIC, auto_delete=True
+    )
+    queue = await publisher.channel.declare_queue(BENCH_QUEUE, auto_delete=True)
+    await queue.bind(publisher.exchange, routing_key="bench.#")
+
+    print(f"📦 {EVENTS} событий на замер (blocking — {BLOCKING_EVENTS})\n")
+    await asyncio.get_running_loop().run_in_executor(None, bench_blocking)
+
+    for window in WINDOWS:
+        events = [BenchEvent(i) for i in range(EVENTS)]
+        before = publisher.metrics()
+        start = perf_counter()
+        await publisher.publish_many(events, ROUTING_KEY, window=window)
+        elapsed = perf_counter() - start
+        published = publisher.published - before["published"]
+        print(f"{f'aio, окно {window}':<26} {EVENTS / elapsed:>9,.0f} events/sec  ({published}/{EVENTS} ack)")
+        await queue.purge()
+
+    await queue.delete(if_unused=False, if_empty=False)
+    await publisher.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
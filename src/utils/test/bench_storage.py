@@ -0,0 +1,74 @@
+# bench_storage.py
+# Смешанная нагрузка на SQLite при разных профилях хранения (storage_profile.py):
+# THREADS потоков, как threadpool FastAPI, каждый делает OPS операций — 80% чтений кота
+# по id, 20% вставок с коммитом. Считаются операции в секунду и ошибки
+# (database is locked, таймаут пула).
+# Запуск: python -m src.utils.test.bench_storage
+
+import os
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.database.database import Base
+from src.infrastructure.database.models.model import CatModel
+from src.infrastructure.database.storage_profile import PROFILES, create_storage_engine
+
+THREADS = 16
+OPS = 400
+WRITE_SHARE = 0.2
+CATS = 1_000
+
+
+def worker(Session, seed: int):
+    rng = random.Random(seed)
+    errors = 0
+    for _ in range(OPS):
+        db = Session()
+        try:
+            if rng.random() < WRITE_SHARE:
+                db.add(CatModel(name="Барсик", age=rng.randint(1, 15), color="Grey", breed="Siamese", breed_id=2))
+                db.commit()
+            else:
+                db.query(CatModel).filter(CatModel.id == rng.randint(1, CATS)).first()
+        except SQLAlchemyError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    return errors
+
+
+def run(profile_name: str) -> float:
+    path = os.path.join(tempfile.mkdtemp(prefix="koshki_storage_"), "animal.db")
+    engine = create_storage_engine(f"sqlite:///{path}", profile_name)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        db.add_all(CatModel(name=f"Cat {i}", age=i % 20, color="White", breed="Persian", breed_id=1) for i in range(CATS))
+        db.commit()
+
+    start = perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        errors = sum(pool.map(lambda seed: worker(Session, seed), range(THREADS)))
+    total = perf_counter() - start
+    engine.dispose()
+
+    rate = THREADS * OPS / total
+    print(f"{profile_name:<12} {rate:>9,.0f} оп/s  ошибок {errors:>4}  за {total:.2f} с")
+    return rate
+
+
+def main():
+    print(f"📦 {THREADS} потоков x {OPS} операций, записей {WRITE_SHARE:.0%}\n")
+    rates = {name: run(name) for name in ("legacy", *[name for name in PROFILES if name != "legacy"])}
+    print(f"\n⚡ wal против legacy: x{rates['wal'] / rates['legacy']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import asyncio
+from time import monotonic
+from typing import Any, Callable, Coroutine, Dict, Hashable, List, Optional, Set
+
+
+class Timer:
+    __slots__ = ("rounds", "callback", "args", "key", "cancelled")
+
+    def __init__(self, rounds: int, callback: Callable, args: tuple, key: Optional[Hashable]):
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.cancelled = False
+
+
+class TimingWheel:
+    """
+    Хешированное колесо таймеров на asyncio.
+    Колесо из slots ячеек проворачивается на одну ячейку раз в tick секунд;
+    таймер кладётся в ячейку за O(1), а задержки длиннее оборота ждут
+    нужное число оборотов (rounds). На каждом тике срабатывает вся ячейка
+    пачкой. Размер ограничен max_pending: schedule ждёт места, и это
+    давление доходит до брокера (сообщение не подтверждается, пока ждёт).
+    Корутины сработавших таймеров выполняются отдельными задачами, не больше
+    max_running одновременно: тики не ждут медленные обработчики. Таймер
+    занимает место в max_pending, пока его корутина не завершится.
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.05,
+        slots: int = 512,
+        max_pending: int = 100_000,
+        max_running: int = 256,
+    ):
+        self.tick = tick
+        self.slots = slots
+        self.max_pending = max_pending
+        self.max_running = max_running
+
+        self.wheel: List[List[Timer]] = [[] for _ in range(slots)]
+        self.cursor = 0
+        self.keys: Dict[Hashable, Timer] = {}
+        self.pending = 0
+        self.space: Optional[asyncio.Condition] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.running: Set[asyncio.Task] = set()
+        self.running_slots: Optional[asyncio.Semaphore] = None
+
+        # Метрики
+        self.scheduled = 0
+        self.fired = 0
+        self.replaced = 0
+        self.failed = 0
+        self.max_lag = 0.0
+
+    async def start(self):
+        if self.worker is not None:
+            return
+        self.space = asyncio.Condition()
+        self.running_slots = asyncio.Semaphore(self.max_running)
+        self.worker = asyncio.create_task(self._run(), name="timing-wheel")
+
+    async def schedule(self, delay: float, callback: Callable, *args: Any, key: Optional[Hashable] = None):
+        """
+        Вызывает callback(*args) через delay секунд (с точностью до tick).
+        Таймер с тем же key заменяет предыдущий. Если колесо заполнено — ждёт места.
+        """
+        if self.worker is None:
+            await self.start()
+
+        # Замена таймера с тем же key освобождает место, так что её можно не ждать
+        if self.pending >= self.max_pending:
+            async with self.space:
+                await self.space.wait_for(
+                    lambda: self.pending < self.max_pending or key in self.keys
+                )
+        # Заменяем прямо перед вставкой: пока ждали места, таймер с тем же key
+        # мог поставить другой вызов
+        if key is not None and key in self.keys:
+            self._cancel(key)
+
+        ticks = max(1, round(delay / self.tick))
+        rounds, offset = divmod(ticks - 1, self.slots)
+        timer = Timer(rounds, callback, args, key)
+        self.wheel[(self.cursor + 1 + offset) % self.slots].append(timer)
+        if key is not None:
+            self.keys[key] = timer
+        self.pending += 1
+        self.scheduled += 1
+
+    def _cancel(self, key: Hashable):
+        self.keys.pop(key).cancelled = True
+        self.pending -= 1
+        self.replaced += 1
+
+    async def _run(self):
+        next_tick = monotonic() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - monotonic()))
+            # Если loop был занят, догоняем пропущенные тики
+            now = monotonic()
+            self.max_lag = max(self.max_lag, now - next_tick)
+            while next_tick <= now:
+                self.cursor = (self.cursor + 1) % self.slots
+                await self._fire(self.cursor)
+                next_tick += self.tick
+
+    async def _fire(self, index: int):
+        bucket = self.wheel[index]
+        if not bucket:
+            return
+
+        due: List[Timer] = []
+        waiting: List[Timer] = []
+        for timer in bucket:
+            if timer.cancelled:
+                continue
+            if timer.rounds:
+                timer.rounds -= 1
+                waiting.append(timer)
+            else:
+                due.append(timer)
+        self.wheel[index] = waiting
+        if not due:
+            return
+
+        for timer in due:
+            if timer.key is not None:
+                self.keys.pop(timer.key, None)
+
+        finished = 0
+        for timer in due:
+            try:
+                result = timer.callback(*timer.args)
+            except Exception as e:
+                self.failed += 1
+                finished += 1
+                print(f"[TimingWheel] Ошибка в отложенной задаче: {e}")
+                continue
+            if asyncio.iscoroutine(result):
+                task = asyncio.create_task(self._execute(result))
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+            else:
+                finished += 1
+        self.fired += len(due)
+        if finished:
+            await self._release(finished)
+
+    async def _execute(self, coroutine: Coroutine):
+        try:
+            async with self.running_slots:
+                await coroutine
+        except Exception as e:
+            self.failed += 1
+            print(f"[TimingWheel] Ошибка в отложенной задаче: {e}")
+        finally:
+            coroutine.close()  # если задачу отменили до запуска корутины
+            await self._release(1)
+
+    async def _release(self, count: int):
+        self.pending -= count
+        async with self.space:
+            self.space.notify_all()
+
+    async def stop(self):
+        """Останавливает колесо; несработавшие таймеры отбрасываются"""
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+        # Уже сработавшие обработчики дорабатывают
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+        if self.pending:
+            print(f"[TimingWheel] Остановлено, отброшено отложенных задач: {self.pending}")
+        self.wheel = [[] for _ in range(self.slots)]
+        self.keys.clear()
+        self.pending = 0
+
+    def metrics(self) -> dict:
+        return {
+            "pending": self.pending,
+            "running": len(self.running),
+            "max_pending": self.max_pending,
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+            "replaced": self.replaced,
+            "failed": self.failed,
+            "max_lag": round(self.max_lag, 4),
+        }